@@ -1,13 +1,12 @@
 """Alias commands"""
-from typing import Optional
+from typing import Optional, Tuple
 
 import click
 from click import Abort
 from reduct_cli.utils.error import error_handle
 
-from reduct_cli.config import Config, read_config, write_config, Alias
+from reduct_cli.config import Config, read_config, write_config, Alias, get_alias
 from reduct_cli.utils.consoles import console, error_console
-from reduct_cli.utils.helpers import get_alias
 
 
 @click.group()
@@ -33,6 +32,12 @@ def show(ctx, name: str, token: bool):
     """Show alias configuration"""
     alias_: Alias = get_alias(ctx.obj["config_path"], name)
     console.print(f"[bold]URL[/bold]:\t\t{alias_.url}")
+    if alias_.max_connections is not None:
+        console.print(f"[bold]Max. Connections[/bold]:\t{alias_.max_connections}")
+    if alias_.keepalive is not None:
+        console.print(f"[bold]Keep-Alive[/bold]:\t{alias_.keepalive} s")
+    if alias_.pool_timeout is not None:
+        console.print(f"[bold]Pool Timeout[/bold]:\t{alias_.pool_timeout} s")
     if token:
         console.print(f"[bold]Token[/bold]:\t\t{alias_.token}")
 
@@ -43,8 +48,27 @@ def show(ctx, name: str, token: bool):
     "--url", "-L", help="Server URL must be in format http(s)://example.com[:port]"
 )
 @click.option("--token", "-t", help="API token")
+@click.option(
+    "--max-connections", help="Max. number of HTTP connections to the server", type=int
+)
+@click.option(
+    "--keepalive",
+    help="Seconds to keep idle HTTP connections open, 0 disables keep-alive",
+    type=float,
+)
+@click.option(
+    "--pool-timeout", help="Seconds to wait for a free HTTP connection", type=float
+)
 @click.pass_context
-def add(ctx, name: str, url: Optional[str], token: Optional[str]):
+def add(
+    ctx,
+    name: str,
+    url: Optional[str],
+    token: Optional[str],
+    max_connections: Optional[int],
+    keepalive: Optional[float],
+    pool_timeout: Optional[float],
+):  # pylint: disable=too-many-arguments
     """Add a new alias with NAME"""
     conf: Config = ctx.obj["conf"]
     if name in conf.aliases:
@@ -57,7 +81,13 @@ def add(ctx, name: str, url: Optional[str], token: Optional[str]):
         token = click.prompt("API Token", type=str, default="")
 
     with error_handle():
-        entry = Alias(url=url, token=token)
+        entry = Alias(
+            url=url,
+            token=token,
+            max_connections=max_connections,
+            keepalive=keepalive,
+            pool_timeout=pool_timeout,
+        )
 
         conf.aliases[name] = entry
         write_config(ctx.obj["config_path"], conf)
@@ -76,3 +106,48 @@ def rm(ctx, name: str):
 
     conf.aliases.pop(name)
     write_config(ctx.obj["config_path"], conf)
+
+
+@alias.group()
+def group():
+    """Commands to manage groups of aliases
+
+    A group is used as @NAME instead of an alias, e.g. 'rcli server status @fleet'
+    """
+
+
+@group.command("ls")
+@click.pass_context
+def group_ls(ctx):
+    """Print list of groups with their members"""
+    for name, members in ctx.obj["conf"].groups.items():
+        console.print(f"{name}: {', '.join(members)}")
+
+
+@group.command("add")
+@click.argument("name")
+@click.argument("members", nargs=-1, required=True)
+@click.pass_context
+def group_add(ctx, name: str, members: Tuple[str, ...]):
+    """Add a new group with NAME of aliases or globs of aliases MEMBERS"""
+    conf: Config = ctx.obj["conf"]
+    if name in conf.groups:
+        error_console.print(f"Group '{name}' already exists")
+        raise Abort()
+
+    conf.groups[name] = list(members)
+    write_config(ctx.obj["config_path"], conf)
+
+
+@group.command("rm")
+@click.argument("name")
+@click.pass_context
+def group_rm(ctx, name: str):
+    """Remove group with NAME, its aliases aren't removed"""
+    conf: Config = ctx.obj["conf"]
+    if name not in conf.groups:
+        error_console.print(f"Group '{name}' doesn't exist")
+        raise Abort()
+
+    conf.groups.pop(name)
+    write_config(ctx.obj["config_path"], conf)
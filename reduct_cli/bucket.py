@@ -1,20 +1,33 @@
 """Bucket commands"""
-from asyncio import new_event_loop as loop
-from typing import List, Optional
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar, Union
 
 import click
-from reduct import BucketInfo, BucketSettings, QuotaType, Bucket
+from reduct import BucketFullInfo, BucketInfo, BucketSettings, QuotaType, Bucket
 from rich.layout import Layout
 from rich.panel import Panel
+from rich.progress import Progress
 from rich.table import Table
-
-from reduct_cli.utils.consoles import console
-from reduct_cli.utils.error import error_handle
-from reduct_cli.utils.helpers import parse_path, build_client, filter_entries
+from rich.text import Text
+
+from reduct_cli.config import is_alias_pattern, resolve_aliases
+from reduct_cli.utils.consoles import console, error_console
+from reduct_cli.utils.error import error_handle, format_error
+from reduct_cli.utils.fleet import alias_timeout_option, for_each_alias
+from reduct_cli.utils.helpers import (
+    parse_path,
+    build_client,
+    filter_entries,
+    to_timestamp,
+    extract_key_values,
+)
 from reduct_cli.utils.humanize import pretty_size, print_datetime, parse_ci_size
 from reduct_cli.utils.humanize import pretty_time_interval
+from reduct_cli.utils.loop import run
+from reduct_cli.utils.options import entries_option, include_option, exclude_option
+from reduct_cli.utils.pool import PooledClient
 
-run = loop().run_until_complete
+T = TypeVar("T")
 
 
 async def _get_bucket_by_path(ctx, path):
@@ -26,74 +39,260 @@ async def _get_bucket_by_path(ctx, path):
     return await client.get_bucket(bucket_name)
 
 
+async def _get_full_info_by_path(ctx, path) -> BucketFullInfo:
+    alias_name, bucket_name = parse_path(path)
+    client = build_client(
+        ctx.obj["config_path"], alias_name, timeout=ctx.obj["timeout"]
+    )
+
+    return await client.get_bucket_full_info(bucket_name)
+
+
 @click.group()
 def bucket():
     """Commands to manage buckets"""
 
 
+def _time_range(infos) -> Tuple[Optional[int], Optional[int]]:
+    """Oldest and latest records of buckets or entries which have data"""
+    infos = [info for info in infos if info.size > 0]
+    if not infos:
+        return None, None
+    return (
+        min(info.oldest_record for info in infos),
+        max(info.latest_record for info in infos),
+    )
+
+
+def _print_buckets(buckets: List[BucketInfo]):
+    table = Table()
+    table.add_column("Name", justify="right", style="green")
+    table.add_column("Entry Count")
+    table.add_column("Size")
+    table.add_column("Oldest Record (UTC)")
+    table.add_column("Latest Record (UTC)")
+
+    for bucket_info in buckets:
+        has_data = bucket_info.size > 0
+        table.add_row(
+            bucket_info.name,
+            str(bucket_info.entry_count),
+            pretty_size(bucket_info.size),
+            print_datetime(bucket_info.oldest_record, has_data),
+            print_datetime(bucket_info.latest_record, has_data),
+        )
+
+    oldest_record, latest_record = _time_range(buckets)
+    table.add_section()
+    table.add_row(
+        f"Total for {len(buckets)} buckets",
+        str(sum(bucket_info.entry_count for bucket_info in buckets)),
+        pretty_size(sum(bucket_info.size for bucket_info in buckets)),
+        print_datetime(oldest_record, oldest_record),
+        print_datetime(latest_record, oldest_record),
+    )
+
+    console.print(table)
+
+
+def _print_quota(settings: BucketSettings) -> str:
+    if settings.quota_type is None or settings.quota_type == QuotaType.NONE:
+        return "NONE"
+    return f"{settings.quota_type.name} {pretty_size(settings.quota_size)}"
+
+
+def _print_buckets_with_entries(buckets: List[BucketFullInfo]):
+    table = Table()
+    table.add_column("Bucket", justify="right", style="green")
+    table.add_column("Entry", style="green")
+    table.add_column("Records")
+    table.add_column("Size")
+    table.add_column("Oldest Record (UTC)")
+    table.add_column("Latest Record (UTC)")
+    table.add_column("Quota")
+
+    for full_info in buckets:
+        info = full_info.info
+        for entry in full_info.entries:
+            table.add_row(
+                info.name,
+                entry.name,
+                str(entry.record_count),
+                pretty_size(entry.size),
+                print_datetime(entry.oldest_record, entry.size > 0),
+                print_datetime(entry.latest_record, entry.size > 0),
+                "",
+            )
+        table.add_row(
+            info.name,
+            f"{info.entry_count} entries",
+            str(sum(entry.record_count for entry in full_info.entries)),
+            pretty_size(info.size),
+            print_datetime(info.oldest_record, info.size > 0),
+            print_datetime(info.latest_record, info.size > 0),
+            _print_quota(full_info.settings),
+            style="bold",
+        )
+        table.add_section()
+
+    infos = [full_info.info for full_info in buckets]
+    oldest_record, latest_record = _time_range(infos)
+    table.add_row(
+        f"Total for {len(buckets)} buckets",
+        f"{sum(info.entry_count for info in infos)} entries",
+        str(
+            sum(
+                entry.record_count
+                for full_info in buckets
+                for entry in full_info.entries
+            )
+        ),
+        pretty_size(sum(info.size for info in infos)),
+        print_datetime(oldest_record, oldest_record),
+        print_datetime(latest_record, oldest_record),
+        "",
+    )
+
+    console.print(table)
+
+
+async def _get_full_info(
+    client: PooledClient, names: List[str], parallel: int
+) -> List[BucketFullInfo]:
+    """Get information, settings and entries of buckets concurrently"""
+    sem = asyncio.Semaphore(parallel)
+
+    async def get(name: str) -> BucketFullInfo:
+        async with sem:
+            return await client.get_bucket_full_info(name)
+
+    return list(await asyncio.gather(*(get(name) for name in names)))
+
+
+async def _list_buckets(
+    client: PooledClient, entries: bool, parallel: int
+) -> Union[List[BucketInfo], List[BucketFullInfo]]:
+    """List buckets, with their settings and entries if entries is True
+
+    The requests share the connection pool of the client.
+    """
+    async with client:
+        buckets: List[BucketInfo] = await client.list()
+        if not entries:
+            return buckets
+        return await _get_full_info(
+            client, [bucket_info.name for bucket_info in buckets], parallel
+        )
+
+
 @bucket.command()
 @click.argument("alias")
 @click.option("--full/--no-full", help="Print full information", default=False)
+@click.option(
+    "--entries/--no-entries",
+    help="Print entries and quotas of buckets with --full. "
+    "The buckets are requested concurrently with the global --parallel limit",
+    default=False,
+)
+@alias_timeout_option
 @click.pass_context
-def ls(ctx, alias: str, full: bool):
+def ls(ctx, alias: str, full: bool, entries: bool, alias_timeout: Optional[float]):
     """
     List buckets
+
+    ALIAS can be a glob of aliases (e.g. 'edge-*') or a group of aliases
+    (e.g. @fleet) to list the buckets of several servers together
     """
-    client = build_client(ctx.obj["config_path"], alias, timeout=ctx.obj["timeout"])
+    if entries and not full:
+        raise click.UsageError("--entries can be used only with --full")
 
-    with error_handle():
-        buckets: List[BucketInfo] = run(client.list())
-        if full:
-            table = Table()
-            table.add_column("Name", justify="right", style="green")
-            table.add_column("Entry Count")
-            table.add_column("Size")
-            table.add_column("Oldest Record (UTC)")
-            table.add_column("Latest Record (UTC)")
+    if is_alias_pattern(alias):
+        if entries:
+            raise click.UsageError("--entries can't be used with several aliases")
+        _list_buckets_of_aliases(ctx, alias, full, alias_timeout)
+        return
 
-            total_size = 0
-            total_entry_count = 0
-            oldest_record = None
-            latest_record = None
+    client = build_client(
+        ctx.obj["config_path"],
+        alias,
+        timeout=ctx.obj["timeout"],
+        default_max_connections=ctx.obj["parallel"],
+    )
 
+    with error_handle():
+        buckets = run(_list_buckets(client, entries, ctx.obj["parallel"]))
+        if entries:
+            _print_buckets_with_entries(buckets)
+        elif full:
+            _print_buckets(buckets)
+        else:
             for bucket_info in buckets:
-                total_size += bucket_info.size
-                total_entry_count += bucket_info.entry_count
-                has_data = bucket_info.size > 0
-
-                if has_data:
-                    oldest_record = (
-                        min(oldest_record, bucket_info.oldest_record)
-                        if oldest_record
-                        else bucket_info.oldest_record
-                    )
-                    latest_record = (
-                        max(latest_record, bucket_info.latest_record)
-                        if latest_record
-                        else bucket_info.latest_record
-                    )
+                console.print(bucket_info.name)
 
-                table.add_row(
-                    bucket_info.name,
-                    str(bucket_info.entry_count),
-                    pretty_size(bucket_info.size),
-                    print_datetime(bucket_info.oldest_record, has_data),
-                    print_datetime(bucket_info.latest_record, has_data),
-                )
 
-            table.add_section()
+def _list_buckets_of_aliases(
+    ctx, pattern: str, full: bool, alias_timeout: Optional[float]
+):
+    aliases = resolve_aliases(ctx.obj["config_path"], pattern)
+    results: Dict[str, Union[List[BucketInfo], Exception]] = run(
+        for_each_alias(ctx.obj, aliases, lambda client: client.list(), alias_timeout)
+    )
+
+    if full:
+        _print_buckets_of_aliases(results)
+    else:
+        for alias, buckets in results.items():
+            if isinstance(buckets, Exception):
+                error_console.print(f"{alias}: {format_error(buckets)}")
+            else:
+                for bucket_info in buckets:
+                    console.print(f"{alias}/{bucket_info.name}")
+
+    if any(isinstance(buckets, Exception) for buckets in results.values()):
+        ctx.exit(1)
+
+
+def _print_buckets_of_aliases(results: Dict[str, Union[List[BucketInfo], Exception]]):
+    table = Table()
+    table.add_column("Alias", justify="right", style="green")
+    table.add_column("Name", style="green")
+    table.add_column("Entry Count")
+    table.add_column("Size")
+    table.add_column("Oldest Record (UTC)")
+    table.add_column("Latest Record (UTC)")
+
+    all_buckets = []
+    for alias, buckets in results.items():
+        if isinstance(buckets, Exception):
             table.add_row(
-                f"Total for {len(buckets)} buckets",
-                str(total_entry_count),
-                pretty_size(total_size),
-                print_datetime(oldest_record, oldest_record),
-                print_datetime(latest_record, oldest_record),
+                alias, Text(format_error(buckets), style="red"), "", "", "", ""
             )
+            continue
 
-            console.print(table)
-        else:
-            for bucket_info in buckets:
-                console.print(bucket_info.name)
+        all_buckets += buckets
+        for bucket_info in buckets:
+            has_data = bucket_info.size > 0
+            table.add_row(
+                alias,
+                bucket_info.name,
+                str(bucket_info.entry_count),
+                pretty_size(bucket_info.size),
+                print_datetime(bucket_info.oldest_record, has_data),
+                print_datetime(bucket_info.latest_record, has_data),
+            )
+
+    oldest_record, latest_record = _time_range(all_buckets)
+    table.add_section()
+    table.add_row(
+        f"Total for {len(results)} aliases",
+        f"{len(all_buckets)} buckets",
+        str(sum(bucket_info.entry_count for bucket_info in all_buckets)),
+        pretty_size(sum(bucket_info.size for bucket_info in all_buckets)),
+        print_datetime(oldest_record, oldest_record),
+        print_datetime(latest_record, oldest_record),
+    )
+
+    console.print(table)
 
 
 @bucket.command()
@@ -108,9 +307,13 @@ def show(ctx, path: str, full: bool):
     """
 
     with error_handle():
-        bucket_ = run(_get_bucket_by_path(ctx, path))
-
-        info: BucketInfo = run(bucket_.info())
+        if full:
+            # one request for the information, settings and entries of the bucket
+            full_info = run(_get_full_info_by_path(ctx, path))
+            info = full_info.info
+        else:
+            bucket_ = run(_get_bucket_by_path(ctx, path))
+            info = run(bucket_.info())
         history_interval = (info.latest_record - info.oldest_record) / 1000000
 
         info_txt = "\n".join(
@@ -126,9 +329,7 @@ def show(ctx, path: str, full: bool):
         if not full:
             console.print(info_txt)
         else:
-            # TODO: Fix when https://github.com/reduct-storage/reduct-py/issues/48 is done
-
-            settings: BucketSettings = run(bucket_.get_settings())
+            settings: BucketSettings = full_info.settings
             settings_txt = "\n".join(
                 [
                     f"Quota Type:         {settings.quota_type.name}",
@@ -147,7 +348,7 @@ def show(ctx, path: str, full: bool):
             table.add_column("Latest Record (UTC)")
             table.add_column("History")
 
-            for entry in run(bucket_.get_entry_list()):
+            for entry in full_info.entries:
                 table.add_row(
                     entry.name,
                     str(entry.record_count),
@@ -234,54 +435,199 @@ def update(
         console.print(f"Bucket '{bucket_.name}' was updated")
 
 
+async def _for_each_entry(
+    names: List[str],
+    func: Callable[[str], Awaitable[T]],
+    parallel: int,
+    description: str,
+) -> Dict[str, Union[T, Exception]]:
+    """Call coroutine function for entries concurrently with a progress bar
+
+    Returns:
+        Dict[str, Union[T, Exception]]: result or error of each entry
+            in the order of the names
+    """
+    sem = asyncio.Semaphore(parallel)
+    results = {}
+
+    # progress bars are shown only in a terminal to keep output of scripts clean
+    progress = Progress(console=console, transient=True)
+    task = progress.add_task(description, total=len(names))
+
+    async def call(name: str):
+        async with sem:
+            try:
+                results[name] = await func(name)
+            except Exception as err:  # pylint: disable=broad-except
+                results[name] = err
+            progress.advance(task)
+
+    if console.is_terminal:
+        progress.start()
+    try:
+        await asyncio.gather(*(call(name) for name in names))
+    finally:
+        if console.is_terminal:
+            progress.stop()
+
+    return {name: results[name] for name in names}
+
+
+def _print_entry_errors(errors: Dict[str, Exception], total: int):
+    error_console.print(f"Failed to remove {len(errors)} of {total} entries:")
+    for name, err in errors.items():
+        error_console.print(f"{name}: {format_error(err)}")
+
+
 @bucket.command()
 @click.argument("path")
 @click.option(
     "--only-entries", "-e", help="Don't remove a bucket but only selected entries"
 )
+@click.option("--yes", "-y", is_flag=True, help="Don't ask for confirmation")
 @click.pass_context
-def rm(ctx, path: str, only_entries: Optional[str]):
+def rm(ctx, path: str, only_entries: Optional[str], yes: bool):
     """
     Remove bucket
 
-    PATH should contain alias name and bucket name - ALIAS/BUCKET_NAME
+    PATH should contain alias name and bucket name - ALIAS/BUCKET_NAME.
+    The entries are removed concurrently with the global --parallel limit
     """
 
-    async def remove_bucket(bkt: Bucket):
+    async def remove_bucket(bkt: Bucket) -> bool:
         console.print(f"All data in bucket [b]'{bkt.name}'[/b] will be [b]REMOVED[/b].")
-        if click.confirm("Do you want to continue?"):
+        if yes or click.confirm("Do you want to continue?"):
             await bkt.remove()
             console.print(f"Bucket '{bkt.name}' was removed")
         else:
             console.print("Canceled")
+        return True
 
-    async def remove_entries(bkt: Bucket):
+    async def remove_entries(bkt: Bucket) -> bool:
         entries = await bkt.get_entry_list()
         entries = filter_entries(entries, only_entries.split(","))
         if not entries:
             console.print("No entries found")
-            return
+            return True
 
+        names = [entry.name for entry in entries]
         console.print(
-            f"All data in entries [b]'"
-            f"{', '.join([entry.name for entry in entries])}'"
-            f"[/b] will be [b]REMOVED[/b]."
+            f"All data in entries [b]'{', '.join(names)}'[/b] will be [b]REMOVED[/b]."
         )
-        if click.confirm("Do you want to continue?"):
-            for entry in entries:
-                await bkt.remove_entry(entry.name)
-            console.print(
-                f"Entries '{', '.join([entry.name for entry in entries])}' were removed"
-            )
-        else:
+        if not yes and not click.confirm("Do you want to continue?"):
             console.print("Canceled")
+            return True
 
-    async def cmd():
+        results = await _for_each_entry(
+            names, bkt.remove_entry, ctx.obj["parallel"], "Removing entries"
+        )
+        errors = {
+            name: err for name, err in results.items() if isinstance(err, Exception)
+        }
+        removed = [name for name in names if name not in errors]
+        if removed:
+            console.print(f"Entries '{', '.join(removed)}' were removed")
+        if errors:
+            _print_entry_errors(errors, len(names))
+        return not errors
+
+    async def cmd() -> bool:
         bucket_ = await _get_bucket_by_path(ctx, path)
         if not only_entries:
-            await remove_bucket(bucket_)
-        else:
-            await remove_entries(bucket_)
+            return await remove_bucket(bucket_)
+        return await remove_entries(bucket_)
+
+    with error_handle():
+        succeeded = run(cmd())
+    if not succeeded:
+        ctx.exit(1)
+
+
+@bucket.command()
+@click.argument("path")
+@click.option(
+    "--start",
+    help="Remove records with timestamps newer than this time point in ISO format"
+    " or Unix timestamp in microseconds",
+)
+@click.option(
+    "--stop",
+    help="Remove records with timestamps older than this time point in ISO format"
+    " or Unix timestamp in microseconds",
+)
+@entries_option
+@include_option
+@exclude_option
+@click.option("--yes", "-y", is_flag=True, help="Don't ask for confirmation")
+@click.pass_context
+def prune(
+    ctx,
+    path: str,
+    start: Optional[str],
+    stop: Optional[str],
+    entries: str,
+    include: str,
+    exclude: str,
+    yes: bool,
+):  # pylint: disable=too-many-arguments
+    """
+    Remove records in a time range from entries of bucket
+
+    PATH should contain alias name and bucket name - ALIAS/BUCKET_NAME.
+    The records are removed by the server with one request for each entry,
+    the entries are processed concurrently with the global --parallel limit
+    """
+    if not start and not stop:
+        raise click.UsageError(
+            "--start or --stop is required, use 'bucket rm --only-entries' "
+            "to remove whole entries"
+        )
+
+    async def cmd() -> bool:
+        bucket_ = await _get_bucket_by_path(ctx, path)
+        names = [
+            entry.name
+            for entry in filter_entries(
+                await bucket_.get_entry_list(), entries.split(",")
+            )
+        ]
+        if not names:
+            console.print("No entries found")
+            return True
+
+        console.print(
+            f"Records in entries [b]'{', '.join(names)}'[/b] will be [b]REMOVED[/b]."
+        )
+        console.print(
+            f"Time range: {start or 'oldest record'} - {stop or 'latest record'}"
+        )
+        if not yes and not click.confirm("Do you want to continue?"):
+            console.print("Canceled")
+            return True
+
+        results = await _for_each_entry(
+            names,
+            lambda name: bucket_.remove_query(name, **params),
+            ctx.obj["parallel"],
+            "Removing records",
+        )
+        errors = {}
+        for name, removed in results.items():
+            if isinstance(removed, Exception):
+                errors[name] = removed
+            else:
+                console.print(f"Entry '{name}': {removed} records removed")
+        if errors:
+            _print_entry_errors(errors, len(names))
+        return not errors
 
     with error_handle():
-        run(cmd())
+        params = {
+            "start": to_timestamp(start) if start else None,
+            "stop": to_timestamp(stop) if stop else None,
+            "include": extract_key_values(include.split(",")),
+            "exclude": extract_key_values(exclude.split(",")),
+        }
+        succeeded = run(cmd())
+    if not succeeded:
+        ctx.exit(1)
@@ -1,22 +1,39 @@
 """Main module"""
-from importlib import metadata
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
 
 import click
 
 from reduct_cli.config import write_config, Config
-from reduct_cli.alias import alias
-from reduct_cli.bucket import bucket
-from reduct_cli.replication import replication
-from reduct_cli.server import server
-from reduct_cli.token import token
-from reduct_cli.export import export
-from reduct_cli.mirror import mirror
+from reduct_cli.utils.lazy import LazyGroup
 
+# the commands are imported when they are invoked to start the CLI faster
+COMMANDS = {
+    "alias": "reduct_cli.alias:alias",
+    "bucket": "reduct_cli.bucket:bucket",
+    "server": "reduct_cli.server:server",
+    "token": "reduct_cli.token:token",
+    "export": "reduct_cli.export:export",
+    "import": "reduct_cli.import_:import_",
+    "mirror": "reduct_cli.mirror:mirror",
+    "replication": "reduct_cli.replication:replication",
+}
 
-@click.group()
-@click.version_option(metadata.version("reduct-cli"))
+
+def _parse_parallel(_ctx, _param, value: Optional[str]) -> Optional[Union[int, str]]:
+    if value is None or value == "auto":
+        return value
+    try:
+        parallel = int(value)
+    except ValueError:
+        parallel = 0
+    if parallel < 1:
+        raise click.BadParameter("must be a positive integer or 'auto'")
+    return parallel
+
+
+@click.group(cls=LazyGroup, lazy_commands=COMMANDS)
+@click.version_option(package_name="reduct-cli")
 @click.option(
     "--config",
     "-c",
@@ -32,16 +49,31 @@ from reduct_cli.mirror import mirror
 @click.option(
     "--parallel",
     "-p",
-    type=int,
-    help="Number of parallel tasks to use, defaults to 10",
+    help="Number of parallel tasks to use, defaults to 10. "
+    "'auto' adjusts it by latency and errors of requests in export commands",
+    callback=_parse_parallel,
+)
+@click.option(
+    "--min-parallel",
+    type=click.IntRange(min=1),
+    help="Min. number of parallel tasks for --parallel auto. Default 1",
+    default=1,
+)
+@click.option(
+    "--max-parallel",
+    type=click.IntRange(min=1),
+    help="Max. number of parallel tasks for --parallel auto. Default 64",
+    default=64,
 )
 @click.pass_context
 def cli(
     ctx,
     config: Optional[Path] = None,
     timeout: Optional[int] = None,
-    parallel: Optional[int] = None,
-):
+    parallel: Optional[Union[int, str]] = None,
+    min_parallel: int = 1,
+    max_parallel: int = 64,
+):  # pylint: disable=too-many-arguments
     """CLI admin tool for ReductStore"""
     if config is None:
         config = Path.home() / ".reduct-cli" / "config.toml"
@@ -49,6 +81,13 @@ def cli(
     if timeout is None:
         timeout = 60
 
+    ctx.obj["parallel_bounds"] = None
+    if parallel == "auto":
+        if min_parallel > max_parallel:
+            raise click.UsageError("--min-parallel must not exceed --max-parallel")
+        ctx.obj["parallel_bounds"] = (min_parallel, max_parallel)
+        parallel = None
+
     if parallel is None:
         parallel = 10
 
@@ -58,12 +97,3 @@ def cli(
     ctx.obj["config_path"] = config
     ctx.obj["timeout"] = timeout
     ctx.obj["parallel"] = parallel
-
-
-cli.add_command(alias, "alias")
-cli.add_command(bucket, "bucket")
-cli.add_command(server, "server")
-cli.add_command(token, "token")
-cli.add_command(export, "export")
-cli.add_command(mirror, "mirror")
-cli.add_command(replication, "replication")
@@ -1,13 +1,17 @@
 """Configuration"""
+import json
 import os
+from fnmatch import fnmatchcase
 from pathlib import Path
-from typing import Dict, Annotated
+from typing import Dict, Annotated, Optional, List, Any
 
-import tomlkit as toml
+from click import Abort
 from pydantic import HttpUrl, BaseModel
 from pydantic.functional_validators import BeforeValidator
 from pydantic.type_adapter import TypeAdapter
 
+from reduct_cli.utils.consoles import error_console
+
 Url = Annotated[
     str, BeforeValidator(lambda value: str(TypeAdapter(HttpUrl).validate_python(value)))
 ]
@@ -18,23 +22,150 @@ class Alias(BaseModel):
 
     url: Url
     token: str
+    max_connections: Optional[int] = None
+    keepalive: Optional[float] = None
+    pool_timeout: Optional[float] = None
 
 
 class Config(BaseModel):
     """Configuration as a dict"""
 
     aliases: Dict[str, Alias] = {}
+    groups: Dict[str, List[str]] = {}
+
+
+CACHE_VERSION = 2
 
 
 def write_config(path: Path, config: Config):
-    """Write config to TOML file"""
+    """Write config to TOML file and update its cache"""
+    # tomlkit is slow to import, and it isn't needed if the cache is valid
+    import tomlkit as toml  # pylint: disable=import-outside-toplevel
+
     if not Path.exists(path):
         os.makedirs(path.parent, exist_ok=True)
     with open(path, "w", encoding="utf8") as config_file:
-        toml.dump(config.model_dump(), config_file)
+        data = config.model_dump(exclude_none=True)
+        if not data["groups"]:
+            del data["groups"]
+        toml.dump(data, config_file)
+    _write_cache(path, config)
 
 
 def read_config(path: Path) -> Config:
-    """Read config from TOML file"""
+    """Read config from TOML file
+
+    The validated config is cached in a JSON file next to the TOML file.
+    The cache is used without parsing and validation, while the modification
+    time and the size of the TOML file are the same.
+    """
+    cached = _read_cache(path)
+    if cached is not None:
+        return cached
+
+    import tomlkit as toml  # pylint: disable=import-outside-toplevel
+
     with open(path, "r", encoding="utf8") as config_file:
-        return Config.model_validate(toml.load(config_file))
+        config = Config.model_validate(toml.load(config_file))
+    _write_cache(path, config)
+    return config
+
+
+def _cache_path(path: Path) -> Path:
+    return path.with_name(f".{path.name}.cache.json")
+
+
+def _cache_key(path: Path) -> List[Any]:
+    stat = path.stat()
+    return [CACHE_VERSION, stat.st_mtime_ns, stat.st_size]
+
+
+def _read_cache(path: Path) -> Optional[Config]:
+    try:
+        with open(_cache_path(path), "r", encoding="utf8") as cache_file:
+            cache = json.load(cache_file)
+        if cache["key"] != _cache_key(path):
+            return None
+        return Config.model_construct(
+            aliases={
+                name: Alias.model_construct(**alias)
+                for name, alias in cache["aliases"].items()
+            },
+            groups=cache["groups"],
+        )
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def _write_cache(path: Path, config: Config):
+    cache_path = _cache_path(path)
+    tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+    try:
+        # the cache keeps the tokens, so only the owner can read it
+        tmp_path.unlink(missing_ok=True)
+        flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL
+        with open(os.open(tmp_path, flags, 0o600), "w", encoding="utf8") as cache_file:
+            json.dump(
+                {
+                    "key": _cache_key(path),
+                    **config.model_dump(exclude_none=True),
+                },
+                cache_file,
+            )
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        # the cache is optional, e.g. the folder may be read-only
+        pass
+
+
+def get_alias(config_path: Path, name: str) -> Alias:
+    """Helper method to parse alias from config"""
+    conf = read_config(config_path)
+
+    if name.split("/")[0] not in conf.aliases:
+        error_console.print(f"Alias '{name}' doesn't exist")
+        raise Abort()
+    alias_: Alias = conf.aliases[name]
+    return alias_
+
+
+def is_alias_pattern(name: str) -> bool:
+    """Check if name is a glob of aliases or a reference to a group"""
+    return name.startswith("@") or any(char in name for char in "*?[")
+
+
+def resolve_aliases(config_path: Path, pattern: str) -> List[str]:
+    """Resolve alias name, glob of alias names or @group into names of aliases
+
+    The members of a group can be globs too. The aliases are returned
+    in the order of the config without duplicates.
+
+    Examples:
+        >>> resolve_aliases(config_path, "edge-*")
+        ['edge-1', 'edge-2']
+        >>> resolve_aliases(config_path, "@fleet")
+        ['edge-1', 'edge-2', 'cloud']
+    """
+    conf = read_config(config_path)
+    patterns = [pattern]
+    if pattern.startswith("@"):
+        if pattern[1:] not in conf.groups:
+            error_console.print(f"Group '{pattern[1:]}' doesn't exist")
+            raise Abort()
+        patterns = conf.groups[pattern[1:]]
+
+    names = []
+    for item in patterns:
+        if is_alias_pattern(item):
+            matched = [name for name in conf.aliases if fnmatchcase(name, item)]
+        elif item in conf.aliases:
+            matched = [item]
+        else:
+            error_console.print(f"Alias '{item}' doesn't exist")
+            raise Abort()
+        names += [name for name in matched if name not in names]
+
+    if not names:
+        error_console.print(f"No aliases match '{pattern}'")
+        raise Abort()
+    return names
@@ -1,56 +1,164 @@
 """Export Command"""
-from asyncio import new_event_loop as loop
-from typing import Optional
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
+from typing import Optional, Dict, Any, Tuple, Iterator, FrozenSet
 
 import click
 
 from reduct_cli.export_impl.bucket import export_to_bucket
 from reduct_cli.export_impl.folder import export_to_folder
+from reduct_cli.export_impl.workers import export_with_workers
+from reduct_cli.utils.concurrency import AdaptiveConcurrency
+from reduct_cli.utils.consoles import console
 from reduct_cli.utils.error import error_handle
 from reduct_cli.utils.helpers import (
     parse_path,
     build_client,
 )
+from reduct_cli.utils.humanize import parse_ci_size
+from reduct_cli.utils.limiter import RateLimiter
+from reduct_cli.utils.loop import run
+from reduct_cli.utils.options import (
+    PositiveSize,
+    start_option,
+    stop_option,
+    entries_option,
+    include_option,
+    exclude_option,
+    when_option,
+    quiet_option,
+    batch_size_option,
+    batch_records_option,
+    max_connections_option,
+    keepalive_option,
+    pool_timeout_option,
+)
+from reduct_cli.utils.pool import print_pool_summary, print_pool_stats
+from reduct_cli.utils.retry import RetryPolicy, TRANSIENT_STATUSES
+from reduct_cli.utils.stats import ExportStats
+from reduct_cli.utils.when import supports_conditional_query
 
-run = loop().run_until_complete
 
-start_option = click.option(
-    "--start",
-    help="Export records with timestamps newer than this time point in ISO format"
-    " or Unix timestamp in microseconds",
+limit_option = click.option(
+    "--limit", "-l", help="Limit the number of records to export"
 )
 
-stop_option = click.option(
-    "--stop",
-    help="Export records  with timestamps older than this time point in ISO format"
-    " or Unix timestamp in microseconds",
+checkpoint_option = click.option(
+    "--checkpoint",
+    help="Path to a journal file to keep the last exported record of each entry",
+    type=Path,
 )
 
-entries_option = click.option(
-    "--entries",
-    "-e",
-    help="Only these entries, separated by comma. Wildcards are supported.",
-    default="",
+resume_option = click.option(
+    "--resume/--no-resume",
+    help="Resume the export from the journal file specified by --checkpoint",
+    default=False,
 )
 
-include_option = click.option(
-    "--include",
-    "-I",
-    help="Only these records which have these labels with given values, "
-    "separated by comma. Example: --include label1=values1,label2=value2",
-    default="",
+slices_option = click.option(
+    "--slices",
+    help="Split time range of each entry into up to this number of sub-ranges "
+    "and export them concurrently. Useful for big entries",
+    type=int,
+    default=1,
 )
 
-exclude_option = click.option(
-    "--exclude",
-    "-E",
-    help="Only these records which DON NOT have these labels with given values, "
-    "separated by comma. Example: --exclude label1=values1,label2=value2",
-    default="",
+workers_option = click.option(
+    "--workers",
+    help="Split entries between this number of worker processes to use "
+    "several CPU cores. The --parallel tasks are shared between them",
+    type=click.IntRange(min=1),
+    default=1,
 )
 
-limit_option = click.option(
-    "--limit", "-l", help="Limit the number of records to export"
+
+def _parse_bandwidth(_ctx, _param, value: Optional[str]) -> Optional[int]:
+    if value is None:
+        return None
+    try:
+        bandwidth = parse_ci_size(value.upper().removesuffix("/S"))
+    except ValueError as err:
+        raise click.BadParameter(
+            "must be a size per second in CI format e.g. 10MB/s"
+        ) from err
+    if bandwidth <= 0:
+        raise click.BadParameter("must be positive")
+    return bandwidth
+
+
+max_bandwidth_option = click.option(
+    "--max-bandwidth",
+    help="Max. bandwidth of the export per second in CI format e.g. 10MB. "
+    "It is shared by all tasks",
+    callback=_parse_bandwidth,
+)
+
+max_rps_option = click.option(
+    "--max-rps",
+    help="Max. number of HTTP requests per second. It is shared by all tasks",
+    type=click.FloatRange(min=0, min_open=True),
+)
+
+stats_json_option = click.option(
+    "--stats-json",
+    help="Path to a JSON file to write statistics of the export for each entry "
+    "and in total: records, bytes, time, latency percentiles, retries and "
+    "skipped records",
+    type=Path,
+)
+
+
+class StatusList(click.ParamType):
+    """HTTP status codes separated by comma
+
+    It is a parameter type instead of a callback, because ctx.forward
+    of mirror command converts defaults with the type but doesn't call
+    callbacks.
+    """
+
+    name = "statuses"
+
+    def convert(self, value, param, ctx) -> FrozenSet[int]:
+        if isinstance(value, frozenset):
+            return value
+        try:
+            return frozenset(
+                int(status) for status in value.split(",") if status.strip()
+            )
+        except ValueError:
+            self.fail("must be HTTP status codes separated by comma", param, ctx)
+
+
+retry_attempts_option = click.option(
+    "--retry-attempts",
+    help="Max. number of attempts of a request which failed because of "
+    "a transient error, 1 disables retries",
+    type=click.IntRange(min=1),
+    default=5,
+)
+
+retry_backoff_option = click.option(
+    "--retry-backoff",
+    help="Delay before the first retry in seconds, it is doubled "
+    "for each next one up to 30 seconds",
+    type=click.FloatRange(min=0),
+    default=0.5,
+)
+
+retry_jitter_option = click.option(
+    "--retry-jitter",
+    help="Max. random part of a delay before retry from 0 to 1",
+    type=click.FloatRange(min=0, max=1),
+    default=0.5,
+)
+
+retry_statuses_option = click.option(
+    "--retry-statuses",
+    help="HTTP statuses of transient errors separated by comma. "
+    "Timeouts and connection errors are always transient",
+    default=",".join(str(status) for status in sorted(TRANSIENT_STATUSES)),
+    type=StatusList(),
 )
 
 
@@ -67,7 +175,23 @@ def export():
 @entries_option
 @include_option
 @exclude_option
+@when_option
 @limit_option
+@slices_option
+@checkpoint_option
+@resume_option
+@quiet_option
+@workers_option
+@max_bandwidth_option
+@max_rps_option
+@max_connections_option
+@keepalive_option
+@pool_timeout_option
+@stats_json_option
+@retry_attempts_option
+@retry_backoff_option
+@retry_jitter_option
+@retry_statuses_option
 @click.option(
     "--ext",
     help="Extension for exported files, if not specified, will be guessed from content type",
@@ -77,6 +201,26 @@ def export():
     help="Export metadata along with the data",
     default=False,
 )
+@click.option(
+    "--format",
+    "format_",
+    help="Output format: 'files' - a file for each record, "
+    "'tar' - tar segments with an index of metadata for each entry",
+    type=click.Choice(["files", "tar"]),
+    default="files",
+)
+@click.option(
+    "--metadata-only/--no-metadata-only",
+    help="Export only metadata of records without their contents into "
+    "a JSON Lines file for each entry",
+    default=False,
+)
+@click.option(
+    "--segment-size",
+    help="Max. size of a tar segment in CI format e.g. 1GB. Only for --format tar",
+    default="1GB",
+    type=PositiveSize(),
+)
 @click.pass_context
 def folder(
     ctx,
@@ -87,10 +231,29 @@ def folder(
     entries: str,
     include: str,
     exclude: str,
+    when: Optional[str],
     ext: Optional[str],
     with_metadata: bool,
+    format_: str,
+    metadata_only: bool,
+    segment_size: int,
     limit: Optional[int],
-):  # pylint: disable=too-many-arguments
+    slices: int,
+    checkpoint: Optional[Path],
+    resume: bool,
+    quiet: bool,
+    workers: int,
+    max_bandwidth: Optional[int],
+    max_rps: Optional[float],
+    max_connections: Optional[int],
+    keepalive: Optional[float],
+    pool_timeout: Optional[float],
+    stats_json: Optional[Path],
+    retry_attempts: int,
+    retry_backoff: float,
+    retry_jitter: float,
+    retry_statuses: FrozenSet[int],
+):  # pylint: disable=too-many-arguments, too-many-locals
     """Export data from SRC bucket to DST folder
 
     SRC should be in the format of ALIAS/BUCKET_NAME.
@@ -99,30 +262,75 @@ def folder(
     As result, the folder will contain a folder for each entry in the bucket.
     Each entry folder will contain a file for each record
     in the entry with the timestamp as the name.
+    With --metadata-only, the folder will contain a {entry}.jsonl file
+    with metadata of the records of each entry.
     """
+    if resume and checkpoint is None:
+        raise click.UsageError("--resume requires --checkpoint")
 
+    parallel, concurrency = _parallel_tasks(ctx.obj, workers)
+    limiter = _make_limiter(max_bandwidth, max_rps, workers)
     alias_name, src_bucket = parse_path(src)
-    client = build_client(
-        ctx.obj["config_path"], alias_name, timeout=ctx.obj["timeout"]
+    build = partial(
+        build_client,
+        ctx.obj["config_path"],
+        alias_name,
+        timeout=ctx.obj["timeout"],
+        default_max_connections=parallel,
+        limiter=limiter,
+        observer=concurrency.observe if concurrency else None,
+        max_connections=max_connections,
+        keepalive=keepalive,
+        pool_timeout=pool_timeout,
     )
-    with error_handle():
-        run(
-            export_to_folder(
-                client,
-                dest,
-                src_bucket,
-                parallel=ctx.obj["parallel"],
-                start=start,
-                stop=stop,
-                entries=entries.split(","),
-                include=include.split(","),
-                exclude=exclude.split(","),
-                ext=ext,
-                timeout=ctx.obj["timeout"],
-                with_metadata=with_metadata,
-                limit=limit,
+    kwargs = {
+        "parallel": parallel,
+        "limiter": limiter,
+        "concurrency": concurrency,
+        "stats": ExportStats(),
+        "retry": RetryPolicy(
+            retry_attempts, retry_backoff, retry_jitter, retry_statuses
+        ),
+        "start": start,
+        "stop": stop,
+        "entries": entries.split(","),
+        "include": include.split(","),
+        "exclude": exclude.split(","),
+        "when": when,
+        "ext": ext,
+        "timeout": ctx.obj["timeout"],
+        "with_metadata": with_metadata,
+        "format": format_,
+        "segment_size": segment_size,
+        "metadata_only": metadata_only,
+        "limit": limit,
+        "slices": slices,
+        "checkpoint_path": checkpoint,
+        "resume": resume,
+        "quiet": quiet,
+    }
+    with error_handle(), _stats_written(kwargs["stats"], stats_json):
+        if when is not None:
+            kwargs["when_pushdown"] = run(supports_conditional_query(build()))
+        if workers > 1:
+            pools = run(
+                export_with_workers(
+                    build(),
+                    src_bucket,
+                    partial(export_to_folder, dest=dest, bucket_name=src_bucket),
+                    {"client": build},
+                    workers=workers,
+                    **kwargs,
+                )
             )
-        )
+            if not quiet and "client" in pools:
+                print_pool_stats("Connections", *pools["client"])
+        else:
+            client = build()
+            run(export_to_folder(client, dest, src_bucket, **kwargs))
+            if not quiet:
+                print_pool_summary("Connections", client)
+                _print_concurrency(concurrency)
 
 
 @export.command
@@ -133,7 +341,49 @@ def folder(
 @entries_option
 @include_option
 @exclude_option
+@when_option
 @limit_option
+@slices_option
+@checkpoint_option
+@resume_option
+@quiet_option
+@batch_size_option
+@batch_records_option
+@workers_option
+@max_bandwidth_option
+@max_rps_option
+@max_connections_option
+@keepalive_option
+@pool_timeout_option
+@stats_json_option
+@retry_attempts_option
+@retry_backoff_option
+@retry_jitter_option
+@retry_statuses_option
+@click.option(
+    "--skip-existing/--no-skip-existing",
+    help="Fetch timestamps of records in the destination entries first "
+    "and don't copy the records which already exist there",
+    default=False,
+)
+@click.option(
+    "--chunk-size",
+    help="Size of chunks in CI format e.g. 512KB, in which records bigger than "
+    "--batch-size are relayed from the source to the destination",
+    default="512KB",
+    type=PositiveSize(),
+)
+@click.option(
+    "--follow/--no-follow",
+    help="Keep copying new records and new entries until interrupted",
+    default=False,
+)
+@click.option(
+    "--poll-interval",
+    help="Seconds between checks for new records with --follow",
+    type=click.FloatRange(min=0),
+    default=1.0,
+)
 @click.pass_context
 def bucket(
     ctx,
@@ -144,39 +394,191 @@ def bucket(
     entries: str,
     include: str,
     exclude: str,
+    when: Optional[str],
     limit: Optional[int],
-):  # pylint: disable=too-many-arguments
+    slices: int,
+    checkpoint: Optional[Path],
+    resume: bool,
+    quiet: bool,
+    workers: int,
+    batch_size: int,
+    batch_records: int,
+    max_bandwidth: Optional[int],
+    max_rps: Optional[float],
+    max_connections: Optional[int],
+    keepalive: Optional[float],
+    pool_timeout: Optional[float],
+    skip_existing: bool,
+    chunk_size: int,
+    follow: bool,
+    poll_interval: float,
+    stats_json: Optional[Path],
+    retry_attempts: int,
+    retry_backoff: float,
+    retry_jitter: float,
+    retry_statuses: FrozenSet[int],
+):  # pylint: disable=too-many-arguments, too-many-locals
     """Copy data from SRC to DEST bucket
 
     SRC and DST should be in the format of ALIAS/BUCKET_NAME
 
     If the destination bucket doesn't exist, it is created with
-    the settings of the source bucket."""
+    the settings of the source bucket.
+
+    With --follow, the records written to the source after the export
+    are copied as they appear, until the command is interrupted."""
+    if resume and checkpoint is None:
+        raise click.UsageError("--resume requires --checkpoint")
+    if follow and (stop is not None or limit is not None or workers > 1):
+        raise click.UsageError(
+            "--follow can't be used with --stop, --limit or --workers"
+        )
 
+    parallel, concurrency = _parallel_tasks(ctx.obj, workers)
+    limiter = _make_limiter(max_bandwidth, max_rps, workers)
     with error_handle():
         alias_name, src_bucket = parse_path(src)
-        src_instance = build_client(
-            ctx.obj["config_path"], alias_name, timeout=ctx.obj["timeout"]
+        build_src = partial(
+            build_client,
+            ctx.obj["config_path"],
+            alias_name,
+            timeout=ctx.obj["timeout"],
+            default_max_connections=parallel,
+            limiter=limiter,
+            observer=concurrency.observe if concurrency else None,
+            max_connections=max_connections,
+            keepalive=keepalive,
+            pool_timeout=pool_timeout,
         )
 
         alias_name, dest_bucket = parse_path(dest)
-        dest_instance = build_client(
-            ctx.obj["config_path"], alias_name, timeout=ctx.obj["timeout"]
+        build_dest = partial(
+            build_client,
+            ctx.obj["config_path"],
+            alias_name,
+            timeout=ctx.obj["timeout"],
+            default_max_connections=parallel,
+            limiter=limiter,
+            observer=concurrency.observe if concurrency else None,
+            max_connections=max_connections,
+            keepalive=keepalive,
+            pool_timeout=pool_timeout,
         )
 
-        run(
-            export_to_bucket(
-                src_bucket,
-                dest_bucket,
-                src_instance,
-                dest_instance,
-                parallel=ctx.obj["parallel"],
-                start=start,
-                stop=stop,
-                entries=entries.split(","),
-                include=include.split(","),
-                exclude=exclude.split(","),
-                timeout=ctx.obj["timeout"],
-                limit=limit,
-            )
+        kwargs = {
+            "parallel": parallel,
+            "limiter": limiter,
+            "concurrency": concurrency,
+            "stats": ExportStats(),
+            "retry": RetryPolicy(
+                retry_attempts, retry_backoff, retry_jitter, retry_statuses
+            ),
+            "start": start,
+            "stop": stop,
+            "entries": entries.split(","),
+            "include": include.split(","),
+            "exclude": exclude.split(","),
+            "when": when,
+            "timeout": ctx.obj["timeout"],
+            "limit": limit,
+            "slices": slices,
+            "checkpoint_path": checkpoint,
+            "resume": resume,
+            "quiet": quiet,
+            "batch_size": batch_size,
+            "batch_records": batch_records,
+            "skip_existing": skip_existing,
+            "chunk_size": chunk_size,
+            "follow": follow,
+            "poll_interval": poll_interval,
+        }
+        if when is not None:
+            kwargs["when_pushdown"] = run(supports_conditional_query(build_src()))
+        with _stats_written(kwargs["stats"], stats_json):
+            if workers > 1:
+                pools = run(
+                    export_with_workers(
+                        build_src(),
+                        src_bucket,
+                        partial(
+                            export_to_bucket,
+                            src_bucket_name=src_bucket,
+                            dest_bucket_name=dest_bucket,
+                        ),
+                        {"src": build_src, "dest": build_dest},
+                        workers=workers,
+                        **kwargs,
+                    )
+                )
+                if not quiet:
+                    if "src" in pools:
+                        print_pool_stats("Source connections", *pools["src"])
+                    if "dest" in pools:
+                        print_pool_stats("Destination connections", *pools["dest"])
+            else:
+                src_instance = build_src()
+                dest_instance = build_dest()
+                run(
+                    export_to_bucket(
+                        src_bucket, dest_bucket, src_instance, dest_instance, **kwargs
+                    )
+                )
+                if not quiet:
+                    print_pool_summary("Source connections", src_instance)
+                    print_pool_summary("Destination connections", dest_instance)
+                    _print_concurrency(concurrency)
+
+
+@contextmanager
+def _stats_written(stats: ExportStats, path: Optional[Path]) -> Iterator[None]:
+    """Write statistics to path, when the export is finished or failed"""
+    try:
+        yield
+    finally:
+        if path is not None:
+            stats.write(path)
+
+
+def _make_limiter(
+    max_bandwidth: Optional[int], max_rps: Optional[float], workers: int
+) -> Optional[RateLimiter]:
+    """Rate limiter of each worker process, the limits are shared between them"""
+    if max_bandwidth is None and max_rps is None:
+        return None
+
+    return RateLimiter(
+        max_bandwidth / workers if max_bandwidth else None,
+        max_rps / workers if max_rps else None,
+    )
+
+
+def _parallel_tasks(
+    obj: Dict[str, Any], workers: int
+) -> Tuple[int, Optional[AdaptiveConcurrency]]:
+    """Number of parallel tasks of each worker process and their adaptive limit
+
+    If --parallel is auto, the tasks are limited by AdaptiveConcurrency,
+    and the number of parallel tasks is its upper bound.
+    """
+    if obj["parallel_bounds"] is None:
+        parallel = (
+            max(obj["parallel"] // workers, 1) if workers > 1 else obj["parallel"]
+        )
+        return parallel, None
+
+    min_limit, max_limit = obj["parallel_bounds"]
+    if workers > 1:
+        max_limit = max(max_limit // workers, 1)
+        min_limit = min(min_limit, max_limit)
+    concurrency = AdaptiveConcurrency(
+        obj["parallel"], min_limit=min_limit, max_limit=max_limit
+    )
+    return max_limit, concurrency
+
+
+def _print_concurrency(concurrency: Optional[AdaptiveConcurrency]):
+    if concurrency is not None:
+        console.print(
+            f"Parallel tasks: {concurrency.limit} "
+            f"(auto, {concurrency.min_limit}-{concurrency.max_limit})"
         )
@@ -0,0 +1,145 @@
+"""Packed archive format for export folder command
+
+Records of an entry are packed into tar segments named by the timestamp of
+their first record. Each segment has a columnar index with the metadata of
+its records:
+
+    entry-1/
+        1000000000.tar
+        1000000000.index.json
+        5000000000.tar
+        5000000000.index.json
+"""
+import json
+import tarfile
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Any
+
+from reduct import Record
+
+from reduct_cli.export_impl.writer import FileWriter
+from reduct_cli.utils.stats import EntryStats
+
+SEGMENT_SUFFIX = ".tar"
+INDEX_SUFFIX = ".index.json"
+
+_TAR_BLOCK = tarfile.BLOCKSIZE
+_CHUNK_SIZE = 1024 * 512
+
+
+class TarSegmentWriter:  # pylint: disable=too-many-instance-attributes
+    """Write records of an entry into tar segments rolled by size
+
+    The blocking I/O is done in the thread pool of FileWriter. The timestamp
+    of the last record of a segment is passed to commit callback,
+    when the segment and its index are written.
+    """
+
+    def __init__(
+        self,
+        entry_path: Path,
+        writer: FileWriter,
+        max_size: int,
+        commit: Callable[[int], None],
+        stats: Optional[EntryStats] = None,
+    ):  # pylint: disable=too-many-arguments
+        self._entry_path = entry_path
+        self._writer = writer
+        self._max_size = max_size
+        self._commit = commit
+        self._stats = stats if stats is not None else EntryStats()
+
+        self._tar: Optional[tarfile.TarFile] = None
+        self._first_timestamp = 0
+        self._size = 0
+        self._index: Dict[str, List[Any]] = {}
+
+    async def add(self, record: Record, name: str):
+        """Add record to the current segment, start a new one if it is full
+
+        The contents of the record are streamed into the segment chunk by chunk,
+        so that big records aren't kept in memory.
+        """
+        timestamp = record.timestamp
+        record_size = _TAR_BLOCK + -(-record.size // _TAR_BLOCK) * _TAR_BLOCK
+        if self._tar is not None and self._size + record_size > self._max_size:
+            await self.close()
+
+        if self._tar is None:
+            self._first_timestamp = timestamp
+            self._size = 0
+            self._index = {
+                "timestamp": [],
+                "name": [],
+                "offset": [],
+                "size": [],
+                "content_type": [],
+                "labels": [],
+            }
+            with self._stats.measure("disk"):
+                self._tar = await self._writer.run(
+                    tarfile.open,
+                    self._entry_path / f"{timestamp}{SEGMENT_SUFFIX}",
+                    "w",
+                )
+
+        with self._stats.measure("disk"):
+            offset = await self._writer.run(
+                self._add_header, timestamp, name, record.size
+            )
+            written = 0
+            async for chunk in record.read(_CHUNK_SIZE):
+                await self._writer.run(self._tar.fileobj.write, chunk)
+                written += len(chunk)
+            if written != record.size:
+                raise RuntimeError(
+                    f"Record {timestamp} has {written} bytes instead of {record.size}"
+                )
+            await self._writer.run(self._add_padding, record.size)
+        self._size += record_size
+
+        self._index["timestamp"].append(timestamp)
+        self._index["name"].append(name)
+        self._index["offset"].append(offset)
+        self._index["size"].append(record.size)
+        self._index["content_type"].append(record.content_type)
+        self._index["labels"].append(record.labels)
+
+    async def close(self):
+        """Close the current segment and write its index"""
+        if self._tar is None:
+            return
+
+        tar, self._tar = self._tar, None
+        with self._stats.measure("disk"):
+            await self._writer.run(tar.close)
+            await self._writer.run(
+                _write_index,
+                self._entry_path / f"{self._first_timestamp}{INDEX_SUFFIX}",
+                self._index,
+            )
+        self._commit(self._index["timestamp"][-1])
+
+    def _add_header(self, timestamp: int, name: str, size: int) -> int:
+        """Write tar header of a member and return offset of its data"""
+        info = tarfile.TarInfo(name)
+        info.size = size
+        info.mtime = timestamp // 1000_000
+        header = info.tobuf(self._tar.format, self._tar.encoding, self._tar.errors)
+        self._tar.fileobj.write(header)
+        self._tar.offset += len(header)
+        self._tar.members.append(info)
+        return self._tar.offset
+
+    def _add_padding(self, size: int):
+        """Pad data of the last member to the tar block boundary"""
+        blocks, remainder = divmod(size, _TAR_BLOCK)
+        if remainder > 0:
+            self._tar.fileobj.write(tarfile.NUL * (_TAR_BLOCK - remainder))
+            blocks += 1
+        self._tar.offset += blocks * _TAR_BLOCK
+
+
+def _write_index(path: Path, index: Dict[str, List[Any]]):
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(index, file)
@@ -1,49 +1,350 @@
 """Module for export store command"""
 import asyncio
+from array import array
+from bisect import bisect_left
+from functools import partial
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, Optional, Tuple
 
 from reduct import Client as ReductClient, Bucket, EntryInfo, ReductError
-from rich.progress import Progress
+from reduct import Batch, Record
 
-from reduct_cli.utils.helpers import (
+from reduct_cli.export_impl.checkpoint import Checkpoint
+from reduct_cli.export_impl.query import (
+    query_timestamps,
     read_records_with_progress,
-    filter_entries,
+    signal_queue,
+    stop_on_signals,
 )
+from reduct_cli.utils.progress import ExportProgress
+from reduct_cli.utils.retry import NO_RETRY, RetryPolicy
+from reduct_cli.utils.stats import EntryStats, ExportStats
+from reduct_cli.utils.helpers import filter_entries
+
+
+CHUNK_SIZE = 512_000
+RELAY_DEPTH = 4
+# a query is split around existing records only if it skips at least so many of them
+MIN_SKIPPED_RECORDS = 100
+
+
+async def relay(chunks: AsyncIterator[bytes], depth: int) -> AsyncIterator[bytes]:
+    """Read chunks ahead in a separate task and pass them through as they are
+
+    The source is read while the previous chunks are sent, so a copy isn't
+    blocked by the slower side. Only up to depth chunks are kept in memory.
+    """
+    queue: asyncio.Queue = asyncio.Queue(depth)
+
+    async def read_ahead():
+        try:
+            async for chunk in chunks:
+                await queue.put(chunk)
+            await queue.put(None)
+        except Exception as err:  # pylint: disable=broad-except
+            await queue.put(err)
+
+    reader = asyncio.create_task(read_ahead())
+    try:
+        while True:
+            chunk = await queue.get()
+            if chunk is None:
+                break
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+    finally:
+        reader.cancel()
+
+
+class BatchWriter:  # pylint: disable=too-many-instance-attributes
+    """Accumulate small records and write them to an entry in batches
+
+    The timestamp of the last written record is passed to commit callback
+    after each request. Records bigger than max_size are relayed
+    to the destination in chunks of chunk_size. The time of reading records
+    and writing them is added to stats, a relayed record counts as
+    destination time. The requests are retried after transient errors
+    by the retry policy, a relayed record is read again for each attempt.
+    """
+
+    def __init__(
+        self,
+        bucket: Bucket,
+        entry_name: str,
+        max_size: int,
+        max_records: int,
+        commit: Callable[[int], None],
+        chunk_size: int = CHUNK_SIZE,
+        stats: Optional[EntryStats] = None,
+        retry: RetryPolicy = NO_RETRY,
+    ):  # pylint: disable=too-many-arguments
+        self._bucket = bucket
+        self._entry_name = entry_name
+        self._max_size = max_size
+        self._max_records = max_records
+        self._commit = commit
+        self._chunk_size = chunk_size
+        self._stats = stats if stats is not None else EntryStats()
+        self._retry = retry
+
+        self._batch = Batch()
+        self._size = 0
+        self._count = 0
+        self._last_timestamp = 0
+
+    async def write(self, record: Record):
+        """Write a record, large records are streamed in a separate request"""
+        if record.size > self._max_size:
+            await self.flush()
+            await self._write_single(record)
+            return
+
+        if (
+            self._size + record.size > self._max_size
+            or self._count >= self._max_records
+        ):
+            await self.flush()
+
+        with self._stats.measure("network"):
+            data = await record.read_all()
+        self._batch.add(
+            record.timestamp,
+            data,
+            content_type=record.content_type,
+            labels=record.labels,
+        )
+        self._size += record.size
+        self._count += 1
+        self._last_timestamp = record.timestamp
+
+    async def flush(self):
+        """Write accumulated records in one request"""
+        if self._count == 0:
+            return
+
+        batch = self._batch
+        self._batch = Batch()
+        self._size = 0
+        self._count = 0
+
+        with self._stats.measure("destination"):
+            errors = await self._retry.call(
+                partial(self._bucket.write_batch, self._entry_name, batch),
+                self._stats,
+            )
+        for err in errors.values():
+            # filter out the error that the record already exists
+            if err.status_code != 409:
+                raise err
+            self._stats.skipped += 1
+
+        self._commit(self._last_timestamp)
+
+    async def _write_single(self, record: Record):
+        try:
+            with self._stats.measure("destination"):
+                await self._retry.call(partial(self._send, record), self._stats)
+        except ReductError as err:
+            # filter out the error that the record already exists
+            if err.status_code != 409:
+                raise err
+            self._stats.skipped += 1
+
+        self._commit(record.timestamp)
+
+    async def _send(self, record: Record):
+        # the contents are read from the beginning for each attempt
+        await self._bucket.write(
+            self._entry_name,
+            data=relay(record.read(self._chunk_size), RELAY_DEPTH),
+            content_length=record.size,
+            timestamp=record.timestamp,
+            content_type=record.content_type,
+            labels=record.labels,
+        )
+
+
+class ExistingTimestamps:
+    """Sorted timestamps of records which already exist in an entry
+
+    The timestamps are kept in a compact array of 64-bit integers.
+    """
+
+    def __init__(self, timestamps: array):
+        self._timestamps = timestamps
+
+    def __len__(self):
+        return len(self._timestamps)
+
+    def __contains__(self, timestamp: int) -> bool:
+        index = bisect_left(self._timestamps, timestamp)
+        return index < len(self._timestamps) and self._timestamps[index] == timestamp
+
+    def missing_ranges(self, timestamps: Iterable[int]) -> Iterator[Tuple[int, int]]:
+        """Time ranges [start, stop) which cover the sorted timestamps
+        that don't exist
+
+        A range is closed only before a run of at least MIN_SKIPPED_RECORDS
+        existing timestamps, so shorter runs stay inside the ranges and
+        a mostly synced entry is still copied with a few queries.
+        """
+        first = last = None
+        skipped = 0
+        for timestamp in timestamps:
+            if timestamp in self:
+                skipped += 1
+                continue
+            if first is not None and skipped >= MIN_SKIPPED_RECORDS:
+                yield first, last + 1
+                first = None
+            if first is None:
+                first = timestamp
+            last = timestamp
+            skipped = 0
+        if first is not None:
+            yield first, last + 1
+
+    @classmethod
+    async def fetch(
+        cls, bucket: Bucket, entry_name: str, start: int, stop: int
+    ) -> "ExistingTimestamps":
+        """Fetch timestamps of records in time range with a query without bodies"""
+        timestamps = array("q")
+        try:
+            async for record in bucket.query(
+                entry_name, start=start, stop=stop, head=True
+            ):
+                timestamps.append(record.timestamp)
+        except ReductError as err:
+            if err.status_code != 404:
+                raise err
+
+        return cls(timestamps)
 
 
 async def _copy_entry(
     entry: EntryInfo,
     src_bucket: Bucket,
     dest_bucket: Bucket,
-    progress: Progress,
+    progress: ExportProgress,
     sem: asyncio.Semaphore,
+    checkpoint: Checkpoint,
     **kwargs,
-):
+):  # pylint: disable=too-many-arguments
+    stats = (kwargs.get("stats") or ExportStats()).entry(entry.name)
+    policy = kwargs.get("retry") or NO_RETRY
+    writer = BatchWriter(
+        dest_bucket,
+        entry.name,
+        kwargs["batch_size"],
+        kwargs["batch_records"],
+        partial(checkpoint.commit, entry.name, kwargs["range_id"]),
+        kwargs["chunk_size"],
+        stats,
+        policy,
+    )
+    if kwargs["skip_existing"]:
+        async with sem:
+            with stats.measure("destination"):
+                existing = await policy.call(
+                    partial(
+                        ExistingTimestamps.fetch,
+                        dest_bucket,
+                        entry.name,
+                        kwargs["start"],
+                        kwargs["stop"],
+                    ),
+                    stats,
+                )
+            if existing:
+                # the source is queried without contents to find the missing records
+                timestamps = await query_timestamps(entry, src_bucket, **kwargs)
+                stats.skipped += sum(timestamp in existing for timestamp in timestamps)
+                kwargs["ranges"] = list(existing.missing_ranges(timestamps))
+                kwargs["skip"] = existing
+
     async for record in read_records_with_progress(
         entry, src_bucket, progress, sem, **kwargs
     ):
-        try:
-            await dest_bucket.write(
-                entry.name,
-                data=record.read(1024 * 512),
-                content_length=record.size,
-                timestamp=record.timestamp,
-                content_type=record.content_type,
-                labels=record.labels,
+        await writer.write(record)
+
+    await writer.flush()
+
+
+async def _follow(
+    src_bucket: Bucket,
+    dest_bucket: Bucket,
+    progress: ExportProgress,
+    sem: asyncio.Semaphore,
+    checkpoint: Checkpoint,
+    **kwargs,
+):  # pylint: disable=too-many-arguments
+    """Copy new records of entries every poll interval until a stop signal
+
+    The entries are listed in each cycle, so new entries are picked up.
+    An entry is copied from its last exported record to its latest record,
+    if it has new records. Records written with older timestamps
+    than the last exported one are not copied.
+    """
+    stop_on_signals()
+    policy = kwargs.get("retry") or NO_RETRY
+    start = kwargs["start"]
+    exported: Dict[str, int] = {}
+    while signal_queue.qsize() == 0:
+        entries = [
+            entry
+            for entry in filter_entries(
+                await policy.call(src_bucket.get_entry_list), kwargs["entries"]
             )
-        except ReductError as err:
-            # filter out the error that the entry already exists
-            if err.status_code != 409:
-                raise err
+            if entry.record_count > 0
+            and entry.latest_record > exported.get(entry.name, -1)
+        ]
+        await asyncio.gather(
+            *[
+                _copy_entry(
+                    entry,
+                    src_bucket,
+                    dest_bucket,
+                    progress,
+                    sem,
+                    checkpoint,
+                    **entry_kwargs,
+                )
+                for entry in entries
+                for entry_kwargs in checkpoint.split_query(
+                    entry,
+                    **dict(
+                        kwargs,
+                        start=exported[entry.name] + 1
+                        if entry.name in exported
+                        else start,
+                        stop=entry.latest_record + 1,
+                    ),
+                )
+            ]
+        )
+        for entry in entries:
+            exported[entry.name] = entry.latest_record
 
+        checkpoint.flush()
+        await asyncio.sleep(kwargs["poll_interval"])
 
-async def export_to_bucket(
+
+async def export_to_bucket(  # pylint: disable=too-many-arguments
     src_bucket_name: str,
     dest_bucket_name: str,
     src: ReductClient,
     dest: ReductClient,
+    progress: Optional[ExportProgress] = None,
+    checkpoint: Optional[Checkpoint] = None,
     **kwargs,
 ) -> None:
-    """Export data from SRC bucket to DST bucket"""
+    """Export data from SRC bucket to DST bucket
+
+    The progress and the checkpoint are created from keyword arguments,
+    if they aren't passed. If follow is True, new records are copied
+    every poll_interval seconds until a stop signal.
+    """
     async with src as src, dest as dest:
         src_bucket: Bucket = await src.get_bucket(src_bucket_name)
 
@@ -55,16 +356,44 @@ async def export_to_bucket(
         except ReductError as err:
             if err.status_code != 404:
                 raise err
+            # exist_ok in case another worker process created it meanwhile
             dest_bucket: Bucket = await dest.create_bucket(
-                dest_bucket_name, settings=await src_bucket.get_settings()
+                dest_bucket_name,
+                settings=await src_bucket.get_settings(),
+                exist_ok=True,
             )
 
-        sem = asyncio.Semaphore(kwargs["parallel"])
-        with Progress() as progress:
-            tasks = [
-                _copy_entry(entry, src_bucket, dest_bucket, progress, sem, **kwargs)
-                for entry in filter_entries(
-                    await src_bucket.get_entry_list(), kwargs["entries"]
-                )
-            ]
-            await asyncio.gather(*tasks)
+        sem = kwargs.get("concurrency") or asyncio.Semaphore(kwargs["parallel"])
+        if checkpoint is None:
+            checkpoint = Checkpoint(kwargs["checkpoint_path"], resume=kwargs["resume"])
+        if progress is None:
+            progress = ExportProgress(
+                quiet=kwargs["quiet"], reuse_tasks=kwargs.get("follow", False)
+            )
+
+        async with progress:
+            try:
+                if kwargs.get("follow"):
+                    await _follow(
+                        src_bucket, dest_bucket, progress, sem, checkpoint, **kwargs
+                    )
+                else:
+                    await asyncio.gather(
+                        *[
+                            _copy_entry(
+                                entry,
+                                src_bucket,
+                                dest_bucket,
+                                progress,
+                                sem,
+                                checkpoint,
+                                **entry_kwargs,
+                            )
+                            for entry in filter_entries(
+                                await src_bucket.get_entry_list(), kwargs["entries"]
+                            )
+                            for entry_kwargs in checkpoint.split_query(entry, **kwargs)
+                        ]
+                    )
+            finally:
+                checkpoint.flush()
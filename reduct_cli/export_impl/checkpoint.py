@@ -0,0 +1,97 @@
+"""Checkpoint journal to resume interrupted exports"""
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional, Dict, List, Any
+
+from reduct import EntryInfo
+
+from reduct_cli.export_impl.query import split_query
+
+
+class Checkpoint:
+    """Journal of the time ranges of entries and their last exported records
+
+    The journal is a JSON file which keeps the time ranges of each entry
+    and the timestamp of the last record committed to the destination:
+
+        {"entry-1": [{"start": 1000, "stop": 2000, "last": 1500}, ...]}
+
+    If the path is None, the journal isn't written.
+    """
+
+    def __init__(
+        self, path: Optional[Path], resume: bool = False, flush_interval: float = 5.0
+    ):
+        self._path = path
+        self._flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+        self._entries: Dict[str, List[Dict[str, Optional[int]]]] = {}
+        self._resumed: Dict[str, List[Dict[str, Optional[int]]]] = {}
+
+        if resume and path is not None and path.exists():
+            with open(path, "r", encoding="utf-8") as file:
+                self._resumed = json.load(file)
+
+    def split_query(self, entry: EntryInfo, **kwargs) -> List[Dict[str, Any]]:
+        """Split query of entry into time ranges
+
+        If the entry is in the resumed journal, its time ranges are taken
+        from the journal and start after the last committed records.
+        Otherwise, the query is split with query.split_query. The journal
+        is resumed only once for each entry, the next queries of the entry
+        replace its time ranges.
+
+        Returns:
+            List[Dict[str, Any]]: keyword arguments for each time range with
+                range_id to commit exported records
+        """
+        if entry.name in self._resumed:
+            ranges = self._resumed.pop(entry.name)
+        else:
+            ranges = [
+                {"start": params["start"], "stop": params["stop"], "last": None}
+                for params in split_query(entry, **kwargs)
+            ]
+
+        self.set_ranges(entry.name, ranges)
+
+        result = []
+        for range_id, time_range in enumerate(ranges):
+            start = time_range["start"]
+            if time_range["last"] is not None:
+                start = time_range["last"] + 1
+            if start >= time_range["stop"]:
+                continue
+
+            params = dict(kwargs, start=start, stop=time_range["stop"])
+            params["range_id"] = range_id
+            if len(ranges) > 1:
+                params["part"] = (range_id + 1, len(ranges))
+            result.append(params)
+
+        return result
+
+    def set_ranges(self, entry_name: str, ranges: List[Dict[str, Optional[int]]]):
+        """Set time ranges of entry to commit exported records to them"""
+        self._entries[entry_name] = ranges
+
+    def commit(self, entry_name: str, range_id: int, timestamp: int):
+        """Commit the last record exported in a time range of entry"""
+        self._entries[entry_name][range_id]["last"] = timestamp
+        if time.monotonic() - self._last_flush > self._flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Write journal to file"""
+        self._last_flush = time.monotonic()
+        if self._path is None:
+            return
+
+        journal = dict(self._resumed, **self._entries)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._path.with_name(self._path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(journal, file)
+        os.replace(tmp_path, self._path)
@@ -1,29 +1,227 @@
 """Module for export folder command"""
 import asyncio
 import json
+from collections import deque
+from functools import partial
 from mimetypes import guess_extension
 from pathlib import Path
+from typing import Deque, Tuple, Callable, List, Optional, TextIO
 
 from reduct import Client as ReductClient
-from reduct import EntryInfo, Bucket
-from rich.progress import Progress
+from reduct import EntryInfo, Bucket, Record
 
-from reduct_cli.utils.helpers import filter_entries, read_records_with_progress
+from reduct_cli.export_impl.archive import TarSegmentWriter
+from reduct_cli.export_impl.checkpoint import Checkpoint
+from reduct_cli.export_impl.writer import FileWriter
+from reduct_cli.utils.progress import ExportProgress
+from reduct_cli.export_impl.query import read_records_with_progress
+from reduct_cli.utils.helpers import filter_entries
+from reduct_cli.utils.stats import EntryStats, ExportStats
 
+MAX_WRITERS = 16
+BUFFERED_RECORD_SIZE = 4_000_000
+INDEX_LINES_PER_WRITE = 1000
+METADATA_INDEX_SUFFIX = ".jsonl"
 
-async def _export_entry(
-    path: Path, entry: EntryInfo, bucket: Bucket, progress: Progress, sem, **kwargs
+
+class _RecordFiles:
+    """Write each record into a separate file with optional metadata file
+
+    The timestamps of the records are passed to commit callback in order,
+    when their files are written. A streamed record counts as disk time
+    in stats.
+    """
+
+    def __init__(
+        self,
+        entry_path: Path,
+        writer: FileWriter,
+        commit: Callable[[int], None],
+        with_meta: bool,
+        stats: Optional[EntryStats] = None,
+    ):  # pylint: disable=too-many-arguments
+        self._entry_path = entry_path
+        self._writer = writer
+        self._commit = commit
+        self._with_meta = with_meta
+        self._stats = stats if stats is not None else EntryStats()
+        self._pending: Deque[Tuple[int, asyncio.Future]] = deque()
+
+    async def add(self, record: Record, name: str):
+        """Write record to file with name"""
+        file_path = self._entry_path / name
+        if record.size > BUFFERED_RECORD_SIZE:
+            with self._stats.measure("disk"):
+                await self._writer.write_stream(file_path, record.read(1024 * 512))
+            written = asyncio.get_running_loop().create_future()
+            written.set_result(None)
+        else:
+            with self._stats.measure("network"):
+                data = await record.read_all()
+            with self._stats.measure("disk"):
+                written = await self._writer.write(file_path, data)
+
+        if self._with_meta:
+            meta = json.dumps(
+                {
+                    "timestamp": record.timestamp,
+                    "content_type": record.content_type,
+                    "size": record.size,
+                    "labels": record.labels,
+                },
+                indent=4,
+            )
+            with self._stats.measure("disk"):
+                written = asyncio.gather(
+                    written,
+                    await self._writer.write(
+                        self._entry_path / f"{record.timestamp}.json",
+                        meta.encode("utf-8"),
+                    ),
+                )
+
+        self._pending.append((record.timestamp, written))
+        self._commit_written()
+
+    async def close(self):
+        """Wait for all files to be written"""
+        if self._pending:
+            with self._stats.measure("disk"):
+                await asyncio.gather(*(written for _, written in self._pending))
+            self._commit_written()
+
+    def _commit_written(self):
+        last_written = None
+        while self._pending and self._pending[0][1].done():
+            timestamp, written = self._pending.popleft()
+            written.result()
+            last_written = timestamp
+        if last_written is not None:
+            self._commit(last_written)
+
+
+class _MetadataIndex:  # pylint: disable=too-many-instance-attributes
+    """Write metadata of records into a JSON Lines file without their contents
+
+    The lines are written in chunks, and the timestamp of the last written
+    record is passed to commit callback after each chunk.
+    """
+
+    def __init__(
+        self,
+        index_path: Path,
+        writer: FileWriter,
+        commit: Callable[[int], None],
+        keep_before: Optional[int],
+        stats: Optional[EntryStats] = None,
+    ):  # pylint: disable=too-many-arguments
+        self._index_path = index_path
+        self._writer = writer
+        self._commit = commit
+        self._keep_before = keep_before
+        self._file: Optional[TextIO] = None
+        self._lines: List[str] = []
+        self._last_timestamp = 0
+        self._stats = stats if stats is not None else EntryStats()
+
+    async def add(self, record: Record, _name: str):
+        """Add a line with metadata of record"""
+        self._lines.append(
+            json.dumps(
+                {
+                    "timestamp": record.timestamp,
+                    "size": record.size,
+                    "content_type": record.content_type,
+                    "labels": record.labels,
+                },
+                separators=(",", ":"),
+            )
+            + "\n"
+        )
+        self._last_timestamp = record.timestamp
+        if len(self._lines) >= INDEX_LINES_PER_WRITE:
+            await self._write_lines()
+
+    async def close(self):
+        """Write the rest of lines and close the file"""
+        await self._write_lines()
+        if self._file is not None:
+            with self._stats.measure("disk"):
+                await self._writer.run(self._file.close)
+
+    async def _write_lines(self):
+        with self._stats.measure("disk"):
+            await self._write_index()
+
+    async def _write_index(self):
+        if self._file is None:
+            self._file = await self._writer.run(
+                _open_index, self._index_path, self._keep_before
+            )
+        if not self._lines:
+            return
+
+        lines, self._lines = self._lines, []
+        await self._writer.run(self._file.writelines, lines)
+        await self._writer.run(self._file.flush)
+        self._commit(self._last_timestamp)
+
+
+def _open_index(path: Path, keep_before: Optional[int]) -> TextIO:
+    """Open index file for appending and keep only records older than keep_before
+
+    If keep_before is None, the file is truncated.
+    """
+    lines = []
+    if keep_before is not None and path.exists():
+        with open(path, "r", encoding="utf-8") as file:
+            lines = [
+                line for line in file if json.loads(line)["timestamp"] < keep_before
+            ]
+
+    file = open(path, "w", encoding="utf-8")  # pylint: disable=consider-using-with
+    file.writelines(lines)
+    return file
+
+
+async def _export_entry(  # pylint: disable=too-many-arguments, too-many-locals
+    path: Path,
+    entry: EntryInfo,
+    bucket: Bucket,
+    progress: ExportProgress,
+    sem,
+    checkpoint: Checkpoint,
+    writer: FileWriter,
+    **kwargs,
 ) -> None:
-    entry_path = Path(path / entry.name)
-    entry_path.mkdir(exist_ok=True)
+    commit = partial(checkpoint.commit, entry.name, kwargs["range_id"])
+    stats = (kwargs.get("stats") or ExportStats()).entry(entry.name)
+    if kwargs["metadata_only"]:
+        output = _MetadataIndex(
+            path / f"{entry.name}{METADATA_INDEX_SUFFIX}",
+            writer,
+            commit,
+            kwargs["start"] if kwargs["resume"] else None,
+            stats,
+        )
+    else:
+        entry_path = Path(path / entry.name)
+        entry_path.mkdir(exist_ok=True)
+        if kwargs["format"] == "tar":
+            output = TarSegmentWriter(
+                entry_path, writer, kwargs["segment_size"], commit, stats
+            )
+        else:
+            output = _RecordFiles(
+                entry_path, writer, commit, kwargs["with_metadata"], stats
+            )
 
     force_ext = None
     if kwargs["ext"] is not None:
         force_ext = "." + kwargs["ext"].split(".")[-1]
 
-    with_meta = kwargs["with_metadata"]
     async for record in read_records_with_progress(
-        entry, bucket, progress, sem, **kwargs
+        entry, bucket, progress, sem, head=kwargs["metadata_only"], **kwargs
     ):
         if force_ext is None:
             # guess extension from content type
@@ -31,43 +229,60 @@ async def _export_entry(
             ext = guess if guess is not None else ".bin"
         else:
             ext = force_ext
-        with open(entry_path / f"{record.timestamp}{ext}", "wb") as file:
-            async for chunk in record.read(1024 * 512):
-                file.write(chunk)
-        if with_meta:
-            with open(
-                entry_path / f"{record.timestamp}.json", "w", encoding="utf-8"
-            ) as file:
-                json.dump(
-                    {
-                        "timestamp": record.timestamp,
-                        "content_type": record.content_type,
-                        "size": record.size,
-                        "labels": record.labels,
-                    },
-                    file,
-                    indent=4,
-                )
+
+        await output.add(record, f"{record.timestamp}{ext}")
+
+    await output.close()
 
 
 async def export_to_folder(
     client: ReductClient,
     dest: str,
     bucket_name: str,
+    progress: Optional[ExportProgress] = None,
+    checkpoint: Optional[Checkpoint] = None,
     **kwargs,
 ) -> None:
-    """Export data from SRC bucket to DST folder"""
+    """Export data from SRC bucket to DST folder
+
+    The progress and the checkpoint are created from keyword arguments,
+    if they aren't passed.
+    """
     async with client as client:
         bucket: Bucket = await client.get_bucket(bucket_name)
         folder_path = Path(dest)
         folder_path.mkdir(parents=True, exist_ok=True)
-        sem = asyncio.Semaphore(kwargs["parallel"])
+        if kwargs["metadata_only"]:
+            # an entry is written into one file, so its query isn't split
+            kwargs["slices"] = 1
 
-        with Progress() as progress:
+        sem = kwargs.get("concurrency") or asyncio.Semaphore(kwargs["parallel"])
+        if checkpoint is None:
+            checkpoint = Checkpoint(kwargs["checkpoint_path"], resume=kwargs["resume"])
+        if progress is None:
+            progress = ExportProgress(quiet=kwargs["quiet"])
+
+        writers = min(kwargs["parallel"], MAX_WRITERS)
+        async with progress, FileWriter(
+            workers=writers, queue_size=writers * 4
+        ) as writer:
             tasks = [
-                _export_entry(folder_path, entry, bucket, progress, sem, **kwargs)
+                _export_entry(
+                    folder_path,
+                    entry,
+                    bucket,
+                    progress,
+                    sem,
+                    checkpoint,
+                    writer,
+                    **entry_kwargs,
+                )
                 for entry in filter_entries(
                     await bucket.get_entry_list(), kwargs["entries"]
                 )
+                for entry_kwargs in checkpoint.split_query(entry, **kwargs)
             ]
-            await asyncio.gather(*tasks)
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                checkpoint.flush()
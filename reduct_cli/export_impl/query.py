@@ -0,0 +1,268 @@
+"""Query records of entries for export commands"""
+import asyncio
+import signal
+import time
+from array import array
+from asyncio import Semaphore, Queue
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from reduct import EntryInfo, Bucket, Record
+
+from reduct_cli.utils.helpers import extract_key_values, to_timestamp
+from reduct_cli.utils.progress import ExportProgress, RUNNING, STOPPED, DONE
+from reduct_cli.utils.retry import NO_RETRY, RetryPolicy, retrying_record
+from reduct_cli.utils.stats import EntryStats, ExportStats
+from reduct_cli.utils.when import compile_when
+
+signal_queue = Queue()
+
+MIN_RECORDS_PER_SLICE = 1000
+
+
+def split_query(entry: EntryInfo, **kwargs) -> List[Dict[str, Any]]:
+    """Split time range of entry query into sub-ranges to read them concurrently
+
+    The records are supposed to be evenly distributed between the oldest and
+    the latest record of the entry, so the range is split into parts of equal
+    duration. The number of parts is reduced, if the entry has too few records.
+
+    Args:
+        entry (EntryInfo): Entry to split
+    Keyword Args:
+        start (Optional[str]): Start time point
+        stop (Optional[str]): Stop time point
+        slices (int): Max. number of sub-ranges
+        limit (Optional[int]): Limit of records, the range isn't split if it is set
+    Returns:
+        List[Dict[str, Any]]: keyword arguments for each sub-range
+    """
+    start = to_timestamp(kwargs["start"]) if kwargs["start"] else entry.oldest_record
+    # the stop time point is exclusive, and the latest record is exported too
+    stop = to_timestamp(kwargs["stop"]) if kwargs["stop"] else entry.latest_record + 1
+
+    slices = 1 if kwargs.get("limit") else kwargs.get("slices", 1)
+    if slices > 1:
+        start = max(start, entry.oldest_record)
+        stop = min(stop, entry.latest_record + 1)
+        history = max(entry.latest_record - entry.oldest_record, 1)
+        expected_records = entry.record_count * max(stop - start, 0) // history
+        slices = min(slices, expected_records // MIN_RECORDS_PER_SLICE)
+
+    if slices <= 1:
+        return [dict(kwargs, start=start, stop=stop)]
+
+    step = (stop - start) // slices
+    bounds = [start + step * i for i in range(slices)] + [stop]
+    return [
+        dict(kwargs, start=bounds[i], stop=bounds[i + 1], part=(i + 1, slices))
+        for i in range(slices)
+    ]
+
+
+def _query_params(
+    entry: EntryInfo, **kwargs
+) -> Tuple[Dict[str, Any], Optional[Callable[[Dict[str, str]], bool]]]:
+    """Parameters of query of entry and predicate to filter records on the client"""
+    params = {
+        "start": to_timestamp(kwargs["start"])
+        if kwargs["start"]
+        else entry.oldest_record,
+        "stop": to_timestamp(kwargs["stop"])
+        if kwargs["stop"]
+        else entry.latest_record + 1,
+        "include": {},
+        "exclude": {},
+        "ttl": kwargs["timeout"] * kwargs["parallel"],
+    }
+
+    if "limit" in kwargs and kwargs["limit"]:
+        params["limit"] = int(kwargs["limit"])
+
+    if kwargs.get("head"):
+        params["head"] = True
+
+    params["include"] = extract_key_values(kwargs["include"])
+    params["exclude"] = extract_key_values(kwargs["exclude"])
+
+    predicate = None
+    if kwargs.get("when"):
+        when = compile_when(kwargs["when"])
+        if kwargs.get("when_pushdown") and when.condition is not None:
+            params["when"] = when.condition
+        else:
+            predicate = when.predicate
+    return params, predicate
+
+
+async def query_timestamps(entry: EntryInfo, bucket: Bucket, **kwargs) -> array:
+    """Timestamps of records which the query of entry returns
+
+    The records are queried without their contents and filtered with the same
+    parameters as in read_records_with_progress, but without the limit.
+
+    Returns:
+        array: sorted timestamps as 64-bit integers
+    """
+    params, predicate = _query_params(entry, **dict(kwargs, head=True, limit=None))
+    stats = (kwargs.get("stats") or ExportStats()).entry(entry.name)
+    policy = kwargs.get("retry") or NO_RETRY
+
+    timestamps = array("q")
+    async for record, _ in _query_with_retries(
+        entry, bucket, params, predicate, policy, stats
+    ):
+        if predicate is None or predicate(record.labels):
+            timestamps.append(record.timestamp)
+    return timestamps
+
+
+async def read_records_with_progress(  # pylint: disable=too-many-locals
+    entry: EntryInfo,
+    bucket: Bucket,
+    progress: ExportProgress,
+    sem: Semaphore,
+    **kwargs,
+):
+    """Read records from entry and show progress
+    Args:
+        entry (EntryInfo): Entry to read records from
+        bucket (Bucket): Bucket to read records from
+        progress (ExportProgress): Progress to count exported records
+        sem (Semaphore): Semaphore to limit parallelism
+    Keyword Args:
+        start (Optional[datetime]): Start time point
+        stop (Optional[datetime]): Stop time point
+        timeout (int): Timeout for read operation
+        parallel (int): Number of parallel tasks
+        part (Optional[Tuple[int, int]]): Number of sub-range and total number
+            of sub-ranges, if the query was split with split_query
+        head (bool): Read only metadata of records without their contents
+        limiter (Optional[RateLimiter]): Limiter of bandwidth shared by all tasks
+        stats (Optional[ExportStats]): Statistics to count records and
+            time waiting for the source
+        retry (Optional[RetryPolicy]): Policy to retry transient errors. A failed
+            query is resumed after the last read record, the contents of records
+            are read again with separate requests
+        when (Optional[str]): Filter expression of labels, see utils.when
+        ranges (Optional[Iterable[Tuple[int, int]]]): Time ranges [start, stop)
+            to query one after another instead of the whole time range
+        skip (Optional[Container[int]]): Timestamps of records to drop
+            from the queried ones
+        when_pushdown (bool): Send the filter to the server as a condition of
+            the query, if it can be evaluated there. Otherwise, the records
+            are filtered by a compiled predicate on the client side
+    Yields:
+        Record: Record from entry
+    """
+
+    params, predicate = _query_params(entry, **kwargs)
+
+    name = f"Entry '{entry.name}'"
+    if kwargs.get("part"):
+        part, total = kwargs["part"]
+        name += f" [{part}/{total}]"
+
+    task = progress.add_task(name, total=params["stop"] - params["start"])
+    stats = (kwargs.get("stats") or ExportStats()).entry(entry.name)
+    policy = kwargs.get("retry") or NO_RETRY
+    async with sem:
+        task.state = RUNNING
+        stats.start()
+        stop_on_signals()
+
+        try:
+            start = params["start"]
+            ranges = kwargs.get("ranges")
+            if ranges is None:
+                ranges = [(params["start"], params["stop"])]
+            skip = kwargs.get("skip") or ()
+            for params["start"], params["stop"] in ranges:
+                async for record, requested in _query_with_retries(
+                    entry, bucket, params, predicate, policy, stats
+                ):
+                    if signal_queue.qsize() > 0:
+                        # stop signal received
+                        task.state = STOPPED
+                        return
+
+                    if (
+                        predicate is not None and not predicate(record.labels)
+                    ) or record.timestamp in skip:
+                        task.completed = record.timestamp - start
+                        continue
+
+                    if kwargs.get("limiter") is not None:
+                        await kwargs["limiter"].acquire_bytes(record.size)
+
+                    if not params.get("head"):
+                        record = retrying_record(
+                            record, bucket, entry.name, policy, stats
+                        )
+                    yield record
+
+                    task.count += 1
+                    task.size += record.size
+                    task.completed = record.timestamp - start
+                    stats.add_record(record.size, time.monotonic() - requested)
+
+                    if "limit" in params:
+                        params["limit"] -= 1
+                        if params["limit"] == 0:
+                            break
+                if params.get("limit") == 0:
+                    break
+
+            task.state = DONE
+        finally:
+            stats.finish()
+
+
+async def _query_with_retries(  # pylint: disable=too-many-arguments
+    entry: EntryInfo,
+    bucket: Bucket,
+    params: Dict[str, Any],
+    predicate: Optional[Callable[[Dict[str, str]], bool]],
+    policy: RetryPolicy,
+    stats: EntryStats,
+) -> AsyncIterator[Tuple[Record, float]]:
+    """Query records and resume the query after the last record, if it fails
+
+    Yields:
+        Tuple[Record, float]: record and monotonic time when it was requested
+    """
+    retry = 0
+    while params.get("limit") != 0:
+        try:
+            requested = time.monotonic()
+            async for record in bucket.query(
+                entry.name,
+                **_server_params(params, predicate),
+            ):
+                stats.add_time("network", time.monotonic() - requested)
+                params["start"] = record.timestamp + 1
+                retry = 0
+                yield record, requested
+                requested = time.monotonic()
+            return
+        except Exception as err:  # pylint: disable=broad-except
+            retry += 1
+            await policy.wait(err, retry, stats)
+
+
+def _server_params(
+    params: Dict[str, Any], predicate: Optional[Callable[[Dict[str, str]], bool]]
+) -> Dict[str, Any]:
+    """Parameters of query, the limit is counted on the client with a predicate"""
+    if predicate is None:
+        return params
+    return {key: value for key, value in params.items() if key != "limit"}
+
+
+def stop_on_signals():
+    """Put a stop message into signal_queue on SIGINT and SIGTERM"""
+
+    def stop_signal():
+        signal_queue.put_nowait("stop")
+
+    asyncio.get_event_loop().add_signal_handler(signal.SIGINT, stop_signal)
+    asyncio.get_event_loop().add_signal_handler(signal.SIGTERM, stop_signal)
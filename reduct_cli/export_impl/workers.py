@@ -0,0 +1,300 @@
+"""Export entries in worker processes
+
+The filtered entries are split into shards, and each shard is exported
+in a separate process with its own event loop and clients. The workers
+send the counters of their progress tasks, the commits of the checkpoint
+journal, the usage of their connection pools and the statistics of their
+entries to the parent process through a queue. The parent renders
+the progress and writes the journal. On Ctrl+C, the parent sets a shared
+stop event, which the workers pass to the export as a stop signal.
+"""
+import asyncio
+import multiprocessing
+import signal
+from queue import Empty
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from reduct import Client as ReductClient, EntryInfo
+
+from reduct_cli.export_impl.checkpoint import Checkpoint
+from reduct_cli.export_impl.query import signal_queue
+from reduct_cli.utils.helpers import filter_entries
+from reduct_cli.utils.pool import PooledClient, PoolSettings, PoolStats
+from reduct_cli.utils.progress import ExportProgress, ProgressTask
+from reduct_cli.utils.stats import ExportStats
+
+PROGRESS_INTERVAL = 0.1
+
+
+class WorkerError(RuntimeError):
+    """Export failed in a worker process"""
+
+
+def shard_entries(entries: List[EntryInfo], workers: int) -> List[List[str]]:
+    """Split entries into shards of similar size
+
+    The biggest entries are assigned first, each to the smallest shard.
+    Empty shards are dropped.
+    """
+    shards: List[Tuple[int, List[str]]] = [(0, []) for _ in range(workers)]
+    for entry in sorted(entries, key=lambda entry: entry.size, reverse=True):
+        index = min(range(workers), key=lambda i: shards[i][0])
+        size, names = shards[index]
+        names.append(entry.name)
+        shards[index] = (size + entry.size, names)
+
+    return [names for _, names in shards if names]
+
+
+class _QueueProgress(ExportProgress):
+    """Progress which sends the counters of its tasks to the parent process"""
+
+    def __init__(self, queue, worker: int):
+        super().__init__(quiet=True)
+        self._queue = queue
+        self._worker = worker
+        self._counters: List[ProgressTask] = []
+        self._sent_state: List[Tuple] = []
+        self._send_task = None
+
+    def add_task(self, name: str, total: int) -> ProgressTask:
+        task = ProgressTask(name, total)
+        self._counters.append(task)
+        self._sent_state.append(())
+        return task
+
+    async def __aenter__(self):
+        self._send_task = asyncio.create_task(self._send_loop())
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self._send_task.cancel()
+        self.render()
+
+    async def _send_loop(self):
+        while True:
+            await asyncio.sleep(PROGRESS_INTERVAL)
+            self.render()
+
+    def render(self):
+        """Send the counters of the tasks which changed since the last call"""
+        changed = []
+        for task_id, task in enumerate(self._counters):
+            state = (
+                task.name,
+                task.total,
+                task.completed,
+                task.count,
+                task.size,
+                task.state,
+            )
+            if state != self._sent_state[task_id]:
+                self._sent_state[task_id] = state
+                changed.append((task_id, state))
+        if changed:
+            self._queue.put(("progress", self._worker, changed))
+
+
+class _QueueCheckpoint(Checkpoint):
+    """Checkpoint which sends its time ranges and commits to the parent process"""
+
+    def __init__(self, queue, **kwargs):
+        super().__init__(**kwargs)
+        self._queue = queue
+
+    def set_ranges(self, entry_name: str, ranges):
+        super().set_ranges(entry_name, ranges)
+        self._queue.put(("ranges", entry_name, ranges))
+
+    def commit(self, entry_name: str, range_id: int, timestamp: int):
+        self._queue.put(("commit", entry_name, range_id, timestamp))
+
+    def flush(self):
+        pass
+
+
+async def _watch_stop(stop_event):
+    """Put a stop message into signal_queue, when the stop event is set"""
+    while not stop_event.is_set():
+        await asyncio.sleep(PROGRESS_INTERVAL)
+    signal_queue.put_nowait("stop")
+
+
+async def _export_until_stopped(
+    export: Callable[..., Awaitable[None]], stop_event, **kwargs
+):
+    watcher = asyncio.create_task(_watch_stop(stop_event))
+    try:
+        await export(**kwargs)
+    finally:
+        watcher.cancel()
+
+
+def _run_worker(
+    worker: int,
+    queue,
+    stop_event,
+    export: Callable[..., Awaitable[None]],
+    clients: Dict[str, Callable[[], ReductClient]],
+    entries: List[str],
+    kwargs: Dict[str, Any],
+):  # pylint: disable=too-many-arguments
+    # the parent process stops the workers with the stop event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    instances = {name: build() for name, build in clients.items()}
+    progress = _QueueProgress(queue, worker)
+    checkpoint = _QueueCheckpoint(
+        queue, path=kwargs["checkpoint_path"], resume=kwargs["resume"]
+    )
+    try:
+        asyncio.run(
+            _export_until_stopped(
+                export,
+                stop_event,
+                **instances,
+                progress=progress,
+                checkpoint=checkpoint,
+                **dict(kwargs, entries=entries),
+            )
+        )
+    except Exception as err:  # pylint: disable=broad-except
+        queue.put(("error", worker, f"[{type(err).__name__}] {err}"))
+    finally:
+        queue.put(
+            (
+                "done",
+                worker,
+                {
+                    name: (client.pool, client.stats)
+                    for name, client in instances.items()
+                    if isinstance(client, PooledClient)
+                },
+                kwargs.get("stats"),
+            )
+        )
+
+
+class _Collector:  # pylint: disable=too-few-public-methods
+    """Handle messages of worker processes in the parent process"""
+
+    def __init__(
+        self,
+        progress: ExportProgress,
+        checkpoint: Checkpoint,
+        stats: Optional[ExportStats],
+        workers: int,
+    ):
+        self.progress = progress
+        self.checkpoint = checkpoint
+        self.stats = stats
+        self.running = workers
+        self.errors: List[str] = []
+        self.pools: Dict[str, Tuple[PoolSettings, PoolStats]] = {}
+        self._tasks: Dict[Tuple[int, int], ProgressTask] = {}
+
+    def handle(self, message: Tuple):
+        """Handle a message from a worker"""
+        kind, *args = message
+        if kind == "progress":
+            worker, changed = args
+            for task_id, state in changed:
+                key = (worker, task_id)
+                if key not in self._tasks:
+                    self._tasks[key] = self.progress.add_task(state[0], state[1])
+                task = self._tasks[key]
+                _, task.total, task.completed, task.count, task.size, task.state = state
+        elif kind == "ranges":
+            self.checkpoint.set_ranges(*args)
+        elif kind == "commit":
+            self.checkpoint.commit(*args)
+        elif kind == "error":
+            worker, error = args
+            self.errors.append(f"{error} (worker {worker + 1})")
+        elif kind == "done":
+            self.running -= 1
+            self._add_usage(*args[1:])
+
+    def _add_usage(
+        self,
+        pools: Dict[str, Tuple[PoolSettings, PoolStats]],
+        stats: Optional[ExportStats],
+    ):
+        for name, (pool, pool_stats) in pools.items():
+            self.pools.setdefault(name, (pool, PoolStats()))[1].add(pool_stats)
+        if self.stats is not None and stats is not None:
+            self.stats.merge(stats)
+
+
+async def export_with_workers(
+    client: ReductClient,
+    bucket_name: str,
+    export: Callable[..., Awaitable[None]],
+    clients: Dict[str, Callable[[], ReductClient]],
+    **kwargs,
+) -> Dict[str, Tuple[PoolSettings, PoolStats]]:
+    """Export entries of SRC bucket in worker processes
+
+    Args:
+        client: Client to list entries of the source bucket in the parent process
+        bucket_name: Name of the source bucket
+        export: Export function which is called in each worker with clients,
+            progress, checkpoint and keyword arguments
+        clients: Functions to build the clients of the export function by names
+            of its arguments. They must be picklable.
+    Keyword Args:
+        workers (int): Number of worker processes
+        entries (List[str]): Entries to export, wildcards are supported
+        stats (Optional[ExportStats]): Statistics to merge the statistics
+            of the workers into
+    Returns:
+        Dict[str, Tuple[PoolSettings, PoolStats]]: usage of connection pools
+            of the clients of all workers by their names
+    """
+    async with client:
+        bucket = await client.get_bucket(bucket_name)
+        entries = filter_entries(await bucket.get_entry_list(), kwargs["entries"])
+
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    stop_event = context.Event()
+    processes = [
+        context.Process(
+            target=_run_worker,
+            args=(worker, queue, stop_event, export, clients, shard, kwargs),
+            daemon=True,
+        )
+        for worker, shard in enumerate(shard_entries(entries, kwargs["workers"]))
+    ]
+    for process in processes:
+        process.start()
+
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGINT, stop_event.set)
+    collector = _Collector(
+        ExportProgress(quiet=kwargs["quiet"]),
+        Checkpoint(kwargs["checkpoint_path"], resume=kwargs["resume"]),
+        kwargs.get("stats"),
+        len(processes),
+    )
+    try:
+        async with collector.progress:
+            while collector.running > 0:
+                try:
+                    collector.handle(queue.get_nowait())
+                except Empty:
+                    if not any(process.is_alive() for process in processes):
+                        break
+                    await asyncio.sleep(PROGRESS_INTERVAL / 2)
+    finally:
+        loop.remove_signal_handler(signal.SIGINT)
+        collector.checkpoint.flush()
+        for process in processes:
+            process.join()
+
+    if collector.running > 0 and not collector.errors:
+        collector.errors.append("Worker process exited unexpectedly")
+    if collector.errors:
+        raise WorkerError("\n".join(collector.errors))
+
+    return collector.pools
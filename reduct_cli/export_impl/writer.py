@@ -0,0 +1,82 @@
+"""Buffered file writer for export folder command"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import AsyncIterator, List, Optional, Tuple, Callable, Any
+
+
+def _write_file(path: Path, data: bytes):
+    with open(path, "wb") as file:
+        file.write(data)
+
+
+class FileWriter:
+    """Write files in a thread pool, so that disk I/O doesn't block the event loop
+
+    The files are put into a bounded queue and written by a pool of threads.
+    If the disk is slower than the network, the queue is full and
+    the producers wait for free space.
+
+    Examples:
+        >>> async with FileWriter(workers=4, queue_size=16) as writer:
+        >>>     written = await writer.write(Path("1000.bin"), b"data")
+        >>>     await written
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self._workers = workers
+        self._queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def __aenter__(self):
+        self._pool = ThreadPoolExecutor(
+            self._workers, thread_name_prefix="reduct-cli-writer"
+        )
+        self._tasks = [
+            asyncio.create_task(self._worker()) for _ in range(self._workers)
+        ]
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        for _ in self._tasks:
+            await self._queue.put(None)
+        await asyncio.gather(*self._tasks)
+        self._pool.shutdown()
+
+    async def write(self, path: Path, data: bytes) -> asyncio.Future:
+        """Put file into queue and wait if it is full
+
+        Returns:
+            asyncio.Future: future which is done when the file is written
+        """
+        written = asyncio.get_running_loop().create_future()
+        await self._queue.put((path, data, written))
+        return written
+
+    async def run(self, func: Callable[..., Any], *args) -> Any:
+        """Run a blocking function in the thread pool and wait for its result"""
+        return await asyncio.get_running_loop().run_in_executor(self._pool, func, *args)
+
+    async def write_stream(self, path: Path, chunks: AsyncIterator[bytes]):
+        """Write file chunk by chunk in the thread pool without buffering it"""
+        file = await self.run(open, path, "wb")
+        try:
+            async for chunk in chunks:
+                await self.run(file.write, chunk)
+        finally:
+            await self.run(file.close)
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job: Optional[Tuple[Path, bytes, asyncio.Future]] = await self._queue.get()
+            if job is None:
+                return
+
+            path, data, written = job
+            try:
+                await loop.run_in_executor(self._pool, _write_file, path, data)
+                written.set_result(None)
+            except Exception as err:  # pylint: disable=broad-except
+                written.set_exception(err)
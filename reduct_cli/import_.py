@@ -0,0 +1,94 @@
+"""Import Command"""
+from typing import Optional
+
+import click
+
+from reduct_cli.import_impl.folder import import_from_folder
+from reduct_cli.utils.error import error_handle
+from reduct_cli.utils.helpers import (
+    parse_path,
+    build_client,
+)
+from reduct_cli.utils.loop import run
+from reduct_cli.utils.options import (
+    entries_option,
+    quiet_option,
+    batch_size_option,
+    batch_records_option,
+    max_connections_option,
+    keepalive_option,
+    pool_timeout_option,
+)
+from reduct_cli.utils.pool import print_pool_summary
+
+
+@click.group()
+def import_():
+    """Import data to a bucket from somewhere else"""
+
+
+@import_.command()
+@click.argument("src")
+@click.argument("dest")
+@entries_option
+@quiet_option
+@batch_size_option
+@batch_records_option
+@max_connections_option
+@keepalive_option
+@pool_timeout_option
+@click.option(
+    "--with-metadata/--no-with-metadata",
+    help="Import content types and labels from metadata files",
+    default=False,
+)
+@click.pass_context
+def folder(
+    ctx,
+    src: str,
+    dest: str,
+    entries: str,
+    quiet: bool,
+    batch_size: int,
+    batch_records: int,
+    with_metadata: bool,
+    max_connections: Optional[int],
+    keepalive: Optional[float],
+    pool_timeout: Optional[float],
+):  # pylint: disable=too-many-arguments
+    """Import data from SRC folder to DEST bucket
+
+    SRC should be a path to a folder exported with 'export folder' command.
+    DEST should be in the format of ALIAS/BUCKET_NAME.
+
+    Each sub-folder of SRC is imported as an entry. The records are read from
+    {timestamp}.{ext} files or tar segments of 'export folder --format tar'.
+    If the destination bucket doesn't exist, it is created with default settings.
+    """
+
+    alias_name, dest_bucket = parse_path(dest)
+    client = build_client(
+        ctx.obj["config_path"],
+        alias_name,
+        timeout=ctx.obj["timeout"],
+        default_max_connections=ctx.obj["parallel"],
+        max_connections=max_connections,
+        keepalive=keepalive,
+        pool_timeout=pool_timeout,
+    )
+    with error_handle():
+        run(
+            import_from_folder(
+                client,
+                src,
+                dest_bucket,
+                parallel=ctx.obj["parallel"],
+                entries=entries.split(","),
+                quiet=quiet,
+                batch_size=batch_size,
+                batch_records=batch_records,
+                with_metadata=with_metadata,
+            )
+        )
+        if not quiet:
+            print_pool_summary("Connections", client)
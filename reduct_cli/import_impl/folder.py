@@ -0,0 +1,256 @@
+"""Module for import folder command"""
+import asyncio
+import json
+from mimetypes import guess_type
+from pathlib import Path
+from itertools import islice
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from reduct import Client as ReductClient
+from reduct import Bucket, Record, ReductError
+
+from reduct_cli.export_impl.archive import INDEX_SUFFIX, SEGMENT_SUFFIX
+from reduct_cli.export_impl.bucket import BatchWriter
+from reduct_cli.export_impl.query import MIN_RECORDS_PER_SLICE
+from reduct_cli.utils.helpers import filter_entries
+from reduct_cli.utils.progress import ExportProgress, ProgressTask, RUNNING, DONE
+
+SCAN_CHUNK = 100
+
+
+def _file_record(  # pylint: disable=too-many-arguments
+    path: Path,
+    timestamp: int,
+    content_type: str,
+    labels: Dict[str, str],
+    offset: int = 0,
+    size: Optional[int] = None,
+) -> Record:
+    """Make record which reads its data from file in a thread"""
+    size = path.stat().st_size if size is None else size
+
+    def _read_all() -> bytes:
+        with open(path, "rb") as file:
+            file.seek(offset)
+            return file.read(size)
+
+    async def read_all() -> bytes:
+        return await asyncio.to_thread(_read_all)
+
+    async def read(n: int) -> AsyncIterator[bytes]:
+        file = await asyncio.to_thread(open, path, "rb")
+        try:
+            await asyncio.to_thread(file.seek, offset)
+            count = 0
+            while count < size:
+                chunk = await asyncio.to_thread(file.read, min(n, size - count))
+                if not chunk:
+                    break
+                count += len(chunk)
+                yield chunk
+        finally:
+            await asyncio.to_thread(file.close)
+
+    return Record(
+        timestamp=timestamp,
+        size=size,
+        last=False,
+        content_type=content_type,
+        labels=labels,
+        read_all=read_all,
+        read=read,
+    )
+
+
+def _scan_files(entry_path: Path, with_meta: bool) -> Iterator[Record]:
+    """Scan files {timestamp}.{ext} with optional metadata files {timestamp}.json
+
+    The names are listed first to pair the files with their metadata,
+    the records are made lazily.
+    """
+    files: Dict[int, List[Path]] = {}
+    for path in entry_path.iterdir():
+        stem = path.name.split(".")[0]
+        if stem.isdigit() and path.is_file():
+            files.setdefault(int(stem), []).append(path)
+
+    for timestamp in sorted(files):
+        paths = files.pop(timestamp)
+        meta = {}
+        meta_path = entry_path / f"{timestamp}.json"
+        if len(paths) > 1 and meta_path in paths:
+            # the JSON file is metadata of another file with the same timestamp
+            paths.remove(meta_path)
+            if with_meta:
+                meta = json.loads(meta_path.read_text(encoding="utf-8"))
+
+        content_type = meta.get("content_type") or guess_type(paths[0].name)[0]
+        yield _file_record(
+            paths[0],
+            timestamp,
+            content_type or "application/octet-stream",
+            meta.get("labels", {}),
+        )
+
+
+def _scan_segments(entry_path: Path) -> Iterator[Record]:
+    """Scan tar segments with their indexes written by export folder --format tar"""
+    for index_path in sorted(entry_path.glob(f"*{INDEX_SUFFIX}")):
+        segment_path = index_path.with_name(
+            index_path.name[: -len(INDEX_SUFFIX)] + SEGMENT_SUFFIX
+        )
+        index = json.loads(index_path.read_text(encoding="utf-8"))
+        for timestamp, offset, size, content_type, labels in zip(
+            index["timestamp"],
+            index["offset"],
+            index["size"],
+            index["content_type"],
+            index["labels"],
+        ):
+            yield _file_record(
+                segment_path,
+                timestamp,
+                content_type or "application/octet-stream",
+                labels,
+                offset=offset,
+                size=size,
+            )
+
+
+def _scan_entry(entry_path: Path, with_meta: bool) -> Iterator[Record]:
+    if any(entry_path.glob(f"*{INDEX_SUFFIX}")):
+        return _scan_segments(entry_path)
+    return _scan_files(entry_path, with_meta)
+
+
+def _next_records(records: Iterator[Record]) -> List[Record]:
+    return list(islice(records, SCAN_CHUNK))
+
+
+async def _put(queue: asyncio.Queue, item: Any, uploaders: List[asyncio.Task]):
+    """Put item into queue, fail if the uploaders fail while the queue is full"""
+    if not queue.full():
+        queue.put_nowait(item)
+        return
+
+    put = asyncio.ensure_future(queue.put(item))
+    while not put.done():
+        await asyncio.wait([put, *uploaders], return_when=asyncio.FIRST_COMPLETED)
+        for uploader in uploaders:
+            if uploader.done() and uploader.exception() is not None:
+                put.cancel()
+                raise uploader.exception()
+
+
+async def _upload_records(
+    entry_name: str,
+    queue: asyncio.Queue,
+    bucket: Bucket,
+    task: ProgressTask,
+    sem: asyncio.Semaphore,
+    **kwargs,
+):  # pylint: disable=too-many-arguments
+    async with sem:
+        task.state = RUNNING
+        writer = BatchWriter(
+            bucket,
+            entry_name,
+            kwargs["batch_size"],
+            kwargs["batch_records"],
+            lambda _: None,
+        )
+        while (record := await queue.get()) is not None:
+            await writer.write(record)
+            task.count += 1
+            task.size += record.size
+            task.completed = task.count
+
+        await writer.flush()
+
+
+async def _import_entry(
+    entry_path: Path,
+    bucket: Bucket,
+    progress: ExportProgress,
+    scan_sem: asyncio.Semaphore,
+    upload_sem: asyncio.Semaphore,
+    **kwargs,
+):  # pylint: disable=too-many-arguments
+    """Scan entry folder and upload its records while they are found
+
+    The records are passed to the uploaders through a bounded queue.
+    A new uploader is started when the queue is full, up to --parallel
+    uploaders for an entry.
+    """
+    task = progress.add_task(f"Entry '{entry_path.name}'", total=0)
+    queue: asyncio.Queue = asyncio.Queue(MIN_RECORDS_PER_SLICE)
+    uploaders: List[asyncio.Task] = []
+
+    def start_uploader():
+        uploaders.append(
+            asyncio.create_task(
+                _upload_records(
+                    entry_path.name, queue, bucket, task, upload_sem, **kwargs
+                )
+            )
+        )
+
+    try:
+        async with scan_sem:
+            records = _scan_entry(entry_path, kwargs["with_metadata"])
+            start_uploader()
+            while chunk := await asyncio.to_thread(_next_records, records):
+                for record in chunk:
+                    if queue.full() and len(uploaders) < kwargs["parallel"]:
+                        start_uploader()
+                    await _put(queue, record, uploaders)
+                    task.total += 1
+
+            for _ in uploaders:
+                await _put(queue, None, uploaders)
+
+        await asyncio.gather(*uploaders)
+    except BaseException:
+        for uploader in uploaders:
+            uploader.cancel()
+        raise
+    task.state = DONE
+
+
+async def import_from_folder(
+    client: ReductClient,
+    src: str,
+    bucket_name: str,
+    **kwargs,
+) -> None:
+    """Import data from SRC folder to DST bucket
+
+    The entries are scanned concurrently, and their records are uploaded
+    as they are found, so that the uploads don't wait for the whole folder.
+    """
+    async with client as client:
+        bucket: Bucket
+        try:
+            bucket = await client.get_bucket(bucket_name)
+        except ReductError as err:
+            if err.status_code != 404:
+                raise err
+            bucket = await client.create_bucket(bucket_name)
+
+        folder_path = Path(src)
+        entry_paths = filter_entries(
+            sorted(path for path in folder_path.iterdir() if path.is_dir()),
+            kwargs["entries"],
+        )
+
+        scan_sem = asyncio.Semaphore(kwargs["parallel"])
+        upload_sem = asyncio.Semaphore(kwargs["parallel"])
+        async with ExportProgress(quiet=kwargs["quiet"]) as progress:
+            await asyncio.gather(
+                *[
+                    _import_entry(
+                        entry_path, bucket, progress, scan_sem, upload_sem, **kwargs
+                    )
+                    for entry_path in entry_paths
+                ]
+            )
@@ -3,8 +3,9 @@ from typing import Optional
 
 import click
 
-from reduct_cli.export import stop_option, start_option, entries_option, bucket
+from reduct_cli.export import bucket
 from reduct_cli.utils.consoles import error_console
+from reduct_cli.utils.options import stop_option, start_option, entries_option
 
 
 @click.command()
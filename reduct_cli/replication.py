@@ -1,6 +1,5 @@
 """Replication commands"""
-from asyncio import new_event_loop as loop
-from typing import List
+from typing import List, Optional, Dict, Any
 
 import click
 from reduct import ReplicationSettings
@@ -9,12 +8,17 @@ from rich.layout import Layout
 from rich.panel import Panel
 from rich.table import Table
 
-from reduct_cli.export import entries_option, include_option, exclude_option
 from reduct_cli.utils.consoles import console
 from reduct_cli.utils.error import error_handle
 from reduct_cli.utils.helpers import build_client, extract_key_values
-
-run = loop().run_until_complete
+from reduct_cli.utils.loop import run
+from reduct_cli.utils.options import (
+    entries_option,
+    include_option,
+    exclude_option,
+    when_option,
+)
+from reduct_cli.utils.when import compile_when
 
 
 @click.group()
@@ -22,6 +26,22 @@ def replication():
     """Commands to manage and monitor replications"""
 
 
+def _when_settings(when: Optional[str]) -> Dict[str, Any]:
+    """Settings of replication to filter records by the filter expression"""
+    if when is None:
+        return {}
+    # pylint: disable-next=unsupported-membership-test
+    if "when" not in ReplicationSettings.model_fields:
+        raise click.UsageError("--when requires reduct-py 1.15 or later")
+    condition = compile_when(when).condition
+    if condition is None:
+        raise click.UsageError(
+            "--when can't use =~ and ! operators in replications, "
+            "the server evaluates the expression"
+        )
+    return {"when": condition}
+
+
 @replication.command()
 @click.argument("alias")
 @click.option("--full/--no-full", help="Print full information", default=False)
@@ -116,6 +136,7 @@ def show(ctx, alias: str, name: str):
 @entries_option
 @include_option
 @exclude_option
+@when_option
 @click.pass_context
 def create(
     ctx,
@@ -128,6 +149,7 @@ def create(
     entries: str,
     include: str,
     exclude: str,
+    when: Optional[str],
 ):  # pylint: disable=too-many-arguments
     """Create replication
 
@@ -136,6 +158,7 @@ def create(
     SRC_BUCKET and DST_BUCKET should be created beforehand.
     DST_HOST is URL of the destination server.
     """
+    when_settings = _when_settings(when)
     client = build_client(ctx.obj["config_path"], alias, timeout=ctx.obj["timeout"])
     with error_handle():
         settings = ReplicationSettings(
@@ -146,6 +169,7 @@ def create(
             entries=entries.split(",") if entries else [],
             include=extract_key_values(include.split(",")),
             exclude=extract_key_values(exclude.split(",")),
+            **when_settings,
         )
 
         run(client.create_replication(name, settings))
@@ -162,6 +186,7 @@ def create(
 @entries_option
 @include_option
 @exclude_option
+@when_option
 @click.pass_context
 def update(
     ctx,
@@ -174,6 +199,7 @@ def update(
     entries: str,
     include: str,
     exclude: str,
+    when: Optional[str],
 ):  # pylint: disable=too-many-arguments
     """Update replication
 
@@ -182,6 +208,7 @@ def update(
     SRC_BUCKET and DST_BUCKET should be created beforehand.
     DST_HOST is URL of the destination server.
     """
+    when_settings = _when_settings(when)
     client = build_client(ctx.obj["config_path"], alias, timeout=ctx.obj["timeout"])
     with error_handle():
         settings = ReplicationSettings(
@@ -192,6 +219,7 @@ def update(
             entries=entries.split(",") if entries else [],
             include=extract_key_values(include.split(",")),
             exclude=extract_key_values(exclude.split(",")),
+            **when_settings,
         )
 
         run(client.update_replication(name, settings))
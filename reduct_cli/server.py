@@ -1,15 +1,18 @@
 """Server commands"""
-from asyncio import new_event_loop as loop
+from typing import Optional
 
 import click
 from reduct import ServerInfo
+from rich.table import Table
+from rich.text import Text
 
+from reduct_cli.config import is_alias_pattern, resolve_aliases
 from reduct_cli.utils.consoles import console
-from reduct_cli.utils.error import error_handle
+from reduct_cli.utils.error import error_handle, format_error
+from reduct_cli.utils.fleet import alias_timeout_option, for_each_alias
 from reduct_cli.utils.helpers import build_client
-from reduct_cli.utils.humanize import pretty_time_interval
-
-run = loop().run_until_complete
+from reduct_cli.utils.humanize import pretty_size, pretty_time_interval
+from reduct_cli.utils.loop import run
 
 
 @click.group()
@@ -19,11 +22,18 @@ def server():
 
 @server.command()
 @click.argument("alias")
+@alias_timeout_option
 @click.pass_context
-def status(ctx, alias: str):
+def status(ctx, alias: str, alias_timeout: Optional[float]):
     """
     Connect to server with alias and print its status
+
+    ALIAS can be a glob of aliases (e.g. 'edge-*') or a group of aliases
+    (e.g. @fleet) to print the status of several servers in one table
     """
+    if is_alias_pattern(alias):
+        _print_statuses(ctx, alias, alias_timeout)
+        return
 
     with error_handle():
         client = build_client(ctx.obj["config_path"], alias, timeout=ctx.obj["timeout"])
@@ -32,3 +42,45 @@ def status(ctx, alias: str):
         console.print("Status:     [green]Ok[/green]")
         console.print(f"Version:    {info.version}")
         console.print(f"Uptime:     {pretty_time_interval(info.uptime)}")
+
+
+def _print_statuses(ctx, pattern: str, alias_timeout: Optional[float]):
+    aliases = resolve_aliases(ctx.obj["config_path"], pattern)
+    results = run(
+        for_each_alias(ctx.obj, aliases, lambda client: client.info(), alias_timeout)
+    )
+
+    table = Table()
+    table.add_column("Alias", justify="right", style="green")
+    table.add_column("Status")
+    table.add_column("Version")
+    table.add_column("Uptime")
+    table.add_column("Usage")
+    table.add_column("Buckets")
+
+    infos = [info for info in results.values() if not isinstance(info, Exception)]
+    for alias, info in results.items():
+        if isinstance(info, Exception):
+            table.add_row(alias, Text(format_error(info), style="red"), "", "", "", "")
+        else:
+            table.add_row(
+                alias,
+                "[green]Ok[/green]",
+                info.version,
+                pretty_time_interval(info.uptime),
+                pretty_size(info.usage),
+                str(info.bucket_count),
+            )
+
+    table.add_section()
+    table.add_row(
+        f"Total for {len(results)} aliases",
+        f"{len(infos)} ok, {len(results) - len(infos)} failed",
+        "",
+        "",
+        pretty_size(sum(info.usage for info in infos)),
+        str(sum(info.bucket_count for info in infos)),
+    )
+    console.print(table)
+    if len(infos) < len(results):
+        ctx.exit(1)
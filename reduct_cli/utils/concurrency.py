@@ -0,0 +1,126 @@
+"""Adaptive limit of concurrent tasks"""
+import asyncio
+import time
+from collections import deque
+from typing import Callable, Deque, Optional
+
+
+class AdaptiveConcurrency:  # pylint: disable=too-many-instance-attributes
+    """Semaphore with a limit adjusted by latency and errors of requests (AIMD)
+
+    The requests report their latency and errors with observe(). They are
+    aggregated in windows, and at the end of each window the limit is:
+
+    * multiplied by decrease, if there were errors or the average latency was
+      higher than the lowest observed one multiplied by tolerance,
+    * increased by one, if the tasks used all the slots in the window.
+
+    The limit is kept between min_limit and max_limit. The lowest latency
+    drifts up by drift in each window to follow a link which became slower.
+
+    Examples:
+        >>> concurrency = AdaptiveConcurrency(10, min_limit=1, max_limit=64)
+        >>> async with concurrency:
+        >>>     started = time.monotonic()
+        >>>     await send_request()
+        >>>     concurrency.observe(time.monotonic() - started, error=False)
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        min_limit: int,
+        max_limit: int,
+        window: float = 1.0,
+        tolerance: float = 2.0,
+        decrease: float = 0.7,
+        drift: float = 0.02,
+        clock: Callable[[], float] = time.monotonic,
+    ):  # pylint: disable=too-many-arguments
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = min(max(initial, min_limit), max_limit)
+        self.in_flight = 0
+
+        self._window = window
+        self._tolerance = tolerance
+        self._decrease = decrease
+        self._drift = drift
+        self._clock = clock
+
+        self._baseline: Optional[float] = None
+        self._window_start: Optional[float] = None
+        self._latency_sum = 0.0
+        self._samples = 0
+        self._errors = 0
+        self._saturated = False
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    async def __aenter__(self):
+        if self.in_flight < self.limit and not self._waiters:
+            self._take_slot()
+            return self
+
+        self._saturated = True
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # the slot was given to the cancelled task
+                self._release_slot()
+            else:
+                self._waiters.remove(waiter)
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self._release_slot()
+
+    def observe(self, latency: float, error: bool):
+        """Report latency of a request in seconds and if it failed"""
+        now = self._clock()
+        if self._window_start is None:
+            self._window_start = now
+
+        self._latency_sum += latency
+        self._samples += 1
+        self._errors += int(error)
+
+        if now - self._window_start >= self._window:
+            self._adjust()
+            self._window_start = now
+
+    def _adjust(self):
+        latency = self._latency_sum / self._samples
+        if self._baseline is None:
+            self._baseline = latency
+        self._baseline = min(latency, self._baseline * (1 + self._drift))
+
+        if self._errors > 0 or latency > self._baseline * self._tolerance:
+            self.limit = max(int(self.limit * self._decrease), self.min_limit)
+        elif self._saturated:
+            self.limit = min(self.limit + 1, self.max_limit)
+            self._wake_up()
+
+        self._latency_sum = 0.0
+        self._samples = 0
+        self._errors = 0
+        self._saturated = self.in_flight >= self.limit
+
+    def _take_slot(self):
+        self.in_flight += 1
+        if self.in_flight >= self.limit:
+            self._saturated = True
+
+    def _release_slot(self):
+        self.in_flight -= 1
+        self._wake_up()
+
+    def _wake_up(self):
+        while self._waiters and self.in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._take_slot()
+                waiter.set_result(None)
@@ -6,11 +6,16 @@ from click import Abort
 from reduct_cli.utils.consoles import error_console
 
 
+def format_error(err: Exception) -> str:
+    """Format error with its type"""
+    return f"[{type(err).__name__}] {err}"
+
+
 @contextmanager
 def error_handle():
     """Wrap try-catch block and print error"""
     try:
         yield
     except Exception as err:
-        error_console.print(f"[{type(err).__name__}] {err}")
+        error_console.print(format_error(err))
         raise Abort() from err
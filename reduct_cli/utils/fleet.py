@@ -0,0 +1,56 @@
+"""Commands for several aliases"""
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional, TypeVar, Union
+
+import click
+from reduct import Client
+
+from reduct_cli.utils.helpers import build_client
+
+T = TypeVar("T")
+
+alias_timeout_option = click.option(
+    "--alias-timeout",
+    help="Seconds to wait for each alias, if ALIAS is a glob or @group. "
+    "Defaults to the global --timeout",
+    type=float,
+)
+
+
+async def for_each_alias(
+    obj: dict,
+    aliases: List[str],
+    func: Callable[[Client], Awaitable[T]],
+    timeout: Optional[float] = None,
+) -> Dict[str, Union[T, Exception]]:
+    """Call coroutine function with client of each alias concurrently
+
+    The number of aliases processed at the same time is limited by
+    the global --parallel option. Each alias has its own deadline,
+    so a slow or unreachable instance doesn't delay the others.
+
+    Args:
+        obj (dict): Context object with config_path, timeout and parallel
+        aliases (List[str]): Names of aliases
+        func (Callable[[Client], Awaitable[T]]): Coroutine function to call
+        timeout (Optional[float]): Seconds for each alias, defaults to
+            the timeout of requests
+    Returns:
+        Dict[str, Union[T, Exception]]: result or error of each alias
+            in the order of the aliases
+    """
+    sem = asyncio.Semaphore(obj["parallel"])
+    timeout = timeout if timeout is not None else obj["timeout"]
+
+    async def call(alias: str) -> Union[T, Exception]:
+        async with sem:
+            try:
+                client = build_client(obj["config_path"], alias, timeout=obj["timeout"])
+                return await asyncio.wait_for(func(client), timeout)
+            except asyncio.TimeoutError:
+                return TimeoutError(f"No response in {timeout} seconds")
+            except Exception as err:  # pylint: disable=broad-except
+                return err
+
+    results = await asyncio.gather(*(call(alias) for alias in aliases))
+    return dict(zip(aliases, results))
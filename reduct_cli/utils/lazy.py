@@ -0,0 +1,37 @@
+"""Command group which imports its commands on demand"""
+from importlib import import_module
+from typing import Dict, List, Optional
+
+import click
+
+
+class LazyGroup(click.Group):
+    """Group which imports its commands when they are invoked
+
+    The commands are given as import paths "module:attribute" by their names,
+    so that a command imports only its own dependencies.
+
+    Examples:
+        >>> @click.group(cls=LazyGroup, lazy_commands={"alias": "reduct_cli.alias:alias"})
+        >>> def cli():
+        >>>     pass
+    """
+
+    def __init__(self, *args, lazy_commands: Optional[Dict[str, str]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = lazy_commands if lazy_commands else {}
+
+    def list_commands(self, ctx: click.Context) -> List[str]:
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_commands))
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> Optional[click.Command]:
+        if cmd_name in self.lazy_commands and cmd_name not in self.commands:
+            self.add_command(self._import_command(cmd_name), cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def _import_command(self, cmd_name: str) -> click.Command:
+        module_name, attribute = self.lazy_commands[cmd_name].split(":")
+        command = getattr(import_module(module_name), attribute)
+        if not isinstance(command, click.Command):
+            raise TypeError(f"{self.lazy_commands[cmd_name]} is not a click command")
+        return command
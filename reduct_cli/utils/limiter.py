@@ -0,0 +1,72 @@
+"""Rate limiter of bandwidth and requests"""
+import asyncio
+import time
+from typing import Callable, Optional
+
+
+class TokenBucket:
+    """Token bucket refilled with a constant rate
+
+    A caller takes tokens at once, even if there are not enough of them,
+    and waits until the debt is refilled. So the callers are served in order,
+    and a request bigger than the bucket doesn't block forever.
+
+    Examples:
+        >>> bucket = TokenBucket(rate=1000)
+        >>> await bucket.acquire(500)
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._rate = rate
+        self._burst = burst if burst is not None else rate
+        self._clock = clock
+        self._tokens = self._burst
+        self._updated: Optional[float] = None
+
+    def reserve(self, amount: float) -> float:
+        """Take amount of tokens and return seconds to wait for them"""
+        now = self._clock()
+        if self._updated is not None:
+            self._tokens = min(
+                self._burst, self._tokens + (now - self._updated) * self._rate
+            )
+        self._updated = now
+
+        self._tokens -= amount
+        return -self._tokens / self._rate if self._tokens < 0 else 0.0
+
+    async def acquire(self, amount: float = 1):
+        """Take amount of tokens and wait until they are available"""
+        delay = self.reserve(amount)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class RateLimiter:
+    """Limit bandwidth and request rate of all tasks which share it
+
+    If a limit is None, it isn't applied.
+    """
+
+    def __init__(
+        self, max_bandwidth: Optional[float] = None, max_rps: Optional[float] = None
+    ):
+        self.max_bandwidth = max_bandwidth
+        self.max_rps = max_rps
+        self._bytes = TokenBucket(max_bandwidth) if max_bandwidth else None
+        self._requests = TokenBucket(max_rps) if max_rps else None
+
+    async def acquire_bytes(self, size: int):
+        """Wait until size bytes can be transferred"""
+        if self._bytes is not None:
+            await self._bytes.acquire(size)
+
+    async def acquire_request(self):
+        """Wait until a request can be sent"""
+        if self._requests is not None:
+            await self._requests.acquire()
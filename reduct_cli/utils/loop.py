@@ -0,0 +1,23 @@
+"""Event loop of commands"""
+import asyncio
+import atexit
+from functools import lru_cache
+from typing import Awaitable, TypeVar
+
+T = TypeVar("T")
+
+
+@lru_cache(maxsize=None)
+def _event_loop() -> asyncio.AbstractEventLoop:
+    loop = asyncio.new_event_loop()
+    atexit.register(loop.close)
+    return loop
+
+
+def run(coroutine: Awaitable[T]) -> T:
+    """Run coroutine until it is complete
+
+    The event loop is created on the first call, so that importing
+    a command module doesn't create it.
+    """
+    return _event_loop().run_until_complete(coroutine)
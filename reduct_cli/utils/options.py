@@ -0,0 +1,123 @@
+"""Options and parameter types shared by commands"""
+from typing import Optional, Union
+
+import click
+
+from reduct_cli.utils.humanize import parse_ci_size
+from reduct_cli.utils.when import compile_when
+
+
+class PositiveSize(click.ParamType):
+    """Positive size in CI format e.g. 8MB, converted to bytes
+
+    It is a parameter type instead of a callback, so that the defaults
+    are converted also by ctx.forward of mirror command.
+    """
+
+    name = "size"
+
+    def convert(self, value: Union[str, int], param, ctx) -> int:
+        try:
+            size = value if isinstance(value, int) else parse_ci_size(value)
+        except ValueError:
+            size = None
+        if size is None or size <= 0:
+            self.fail("must be a positive size in CI format e.g. 8MB", param, ctx)
+        return size
+
+
+start_option = click.option(
+    "--start",
+    help="Export records with timestamps newer than this time point in ISO format"
+    " or Unix timestamp in microseconds",
+)
+
+stop_option = click.option(
+    "--stop",
+    help="Export records  with timestamps older than this time point in ISO format"
+    " or Unix timestamp in microseconds",
+)
+
+entries_option = click.option(
+    "--entries",
+    "-e",
+    help="Only these entries, separated by comma. Wildcards are supported.",
+    default="",
+)
+
+include_option = click.option(
+    "--include",
+    "-I",
+    help="Only these records which have these labels with given values, "
+    "separated by comma. Example: --include label1=values1,label2=value2",
+    default="",
+)
+
+exclude_option = click.option(
+    "--exclude",
+    "-E",
+    help="Only these records which DON NOT have these labels with given values, "
+    "separated by comma. Example: --exclude label1=values1,label2=value2",
+    default="",
+)
+
+
+def _parse_when(_ctx, _param, value: Optional[str]) -> Optional[str]:
+    if value is not None:
+        try:
+            compile_when(value)
+        except ValueError as err:
+            raise click.BadParameter(str(err)) from err
+    return value
+
+
+when_option = click.option(
+    "--when",
+    help="Only these records whose labels match this filter expression. "
+    'Example: --when \'score > 0.8 && camera in ["a", "b"]\'',
+    callback=_parse_when,
+)
+
+quiet_option = click.option(
+    "--quiet",
+    "--no-progress",
+    "-q",
+    help="Don't show progress bars. Useful for cron jobs and CI",
+    is_flag=True,
+    default=False,
+)
+
+batch_size_option = click.option(
+    "--batch-size",
+    help="Max. size of a batch of records written in one request in CI format "
+    "e.g. 8MB. Bigger records are written one by one",
+    default="8MB",
+    type=PositiveSize(),
+)
+
+batch_records_option = click.option(
+    "--batch-records",
+    help="Max. number of records in a batch written in one request",
+    type=int,
+    default=80,
+)
+
+max_connections_option = click.option(
+    "--max-connections",
+    help="Max. number of HTTP connections to a server. "
+    "Overrides the alias setting, defaults to --parallel",
+    type=int,
+)
+
+keepalive_option = click.option(
+    "--keepalive",
+    help="Seconds to keep idle HTTP connections open for reuse, "
+    "0 closes a connection after each request. Overrides the alias setting",
+    type=float,
+)
+
+pool_timeout_option = click.option(
+    "--pool-timeout",
+    help="Seconds to wait for a free HTTP connection. Overrides the alias setting",
+    type=float,
+)
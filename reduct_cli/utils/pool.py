@@ -0,0 +1,174 @@
+"""HTTP connection pool of a client"""
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector, TraceConfig
+from reduct import Bucket, BucketFullInfo, Client
+
+from reduct_cli.utils.consoles import console
+from reduct_cli.utils.limiter import RateLimiter
+
+
+@dataclass
+class PoolSettings:
+    """Settings of HTTP connection pool
+
+    None means the default of aiohttp.
+    """
+
+    max_connections: Optional[int] = None
+    """Max. number of connections per host"""
+    keepalive: Optional[float] = None
+    """Seconds to keep an idle connection open, 0 closes it after each request"""
+    pool_timeout: Optional[float] = None
+    """Seconds to wait for a free connection in the pool"""
+
+
+@dataclass
+class PoolStats:
+    """Connection usage of a client"""
+
+    opened: int = 0
+    """Number of new connections"""
+    reused: int = 0
+    """Number of requests sent over an idle connection from the pool"""
+    queued: int = 0
+    """Number of requests which waited for a free connection"""
+
+    def add(self, other: "PoolStats"):
+        """Add usage of another pool, e.g. of a worker process"""
+        self.opened += other.opened
+        self.reused += other.reused
+        self.queued += other.queued
+
+    @property
+    def requests(self) -> int:
+        """Number of requests which got a connection"""
+        return self.opened + self.reused
+
+
+class PooledClient(Client):
+    """Client with a configured connection pool shared by all requests
+
+    The connections are kept alive and reused between entries and queries,
+    so that the TLS handshakes are done once per connection.
+    If a limiter is passed, each request waits for it before it is sent.
+    If an observer is passed, it is called with the latency of each request
+    till its response headers and whether the request failed.
+
+    Examples:
+        >>> client = PooledClient("http://127.0.0.1:8383", pool=PoolSettings(10))
+        >>> async with client:
+        >>>     await client.info()
+        >>> client.stats.reused
+    """
+
+    def __init__(
+        self,
+        url: str,
+        pool: PoolSettings,
+        limiter: Optional[RateLimiter] = None,
+        observer: Optional[Callable[[float, bool], None]] = None,
+        **kwargs,
+    ):  # pylint: disable=too-many-arguments
+        super().__init__(url, **kwargs)
+        self.pool = pool
+        self.limiter = limiter
+        self.observer = observer
+        self.stats = PoolStats()
+
+    async def __aenter__(self):
+        pool = self.pool
+        if pool.max_connections:
+            # a client talks to one host, so the total limit is the same
+            limits = {"limit": pool.max_connections, "limit_per_host": 0}
+        else:
+            limits = {}
+        if pool.keepalive == 0:
+            connector = TCPConnector(force_close=True, **limits)
+        elif pool.keepalive is not None:
+            connector = TCPConnector(keepalive_timeout=pool.keepalive, **limits)
+        else:
+            connector = TCPConnector(**limits)
+
+        timeout = ClientTimeout(
+            total=self._http._timeout.total,  # pylint: disable=protected-access
+            connect=pool.pool_timeout,
+        )
+        self._http._session = ClientSession(  # pylint: disable=protected-access
+            timeout=timeout, connector=connector, trace_configs=[self._trace()]
+        )
+        return self
+
+    async def get_bucket_full_info(self, name: str) -> BucketFullInfo:
+        """Get information, settings and entries of a bucket in one request
+
+        Client.get_bucket requests the bucket to check that it exists,
+        so it would be two requests with Bucket.get_full_info.
+        """
+        http = self._http  # pylint: disable=protected-access
+        return await Bucket(name, http).get_full_info()
+
+    def _trace(self) -> TraceConfig:
+        stats = self.stats
+
+        async def on_create(_session, _ctx, _params):
+            stats.opened += 1
+
+        async def on_reuse(_session, _ctx, _params):
+            stats.reused += 1
+
+        async def on_queued(_session, _ctx, _params):
+            stats.queued += 1
+
+        trace = TraceConfig()
+        if self.limiter is not None:
+            limiter = self.limiter
+
+            async def on_request(_session, _ctx, _params):
+                await limiter.acquire_request()
+
+            trace.on_request_start.append(on_request)
+
+        if self.observer is not None:
+            observer = self.observer
+
+            async def on_start(_session, ctx, _params):
+                ctx.started = time.monotonic()
+
+            async def on_end(_session, ctx, params):
+                status = params.response.status
+                observer(time.monotonic() - ctx.started, status >= 500 or status == 429)
+
+            async def on_exception(_session, ctx, _params):
+                observer(time.monotonic() - ctx.started, True)
+
+            trace.on_request_start.append(on_start)
+            trace.on_request_end.append(on_end)
+            trace.on_request_exception.append(on_exception)
+
+        trace.on_connection_create_end.append(on_create)
+        trace.on_connection_reuseconn.append(on_reuse)
+        trace.on_connection_queued_start.append(on_queued)
+        return trace
+
+
+def print_pool_summary(name: str, client: Client):
+    """Print connection usage of a client, if it has a pool"""
+    if isinstance(client, PooledClient):
+        print_pool_stats(name, client.pool, client.stats)
+
+
+def print_pool_stats(name: str, pool: PoolSettings, stats: PoolStats):
+    """Print connection usage of a pool"""
+    if stats.requests == 0:
+        return
+
+    limit = pool.max_connections
+    console.print(
+        f"{name}: {stats.requests} requests over {stats.opened} connections "
+        f"({stats.reused / stats.requests:.0%} reused, "
+        f"{stats.queued} waited for a free connection, "
+        f"limit {limit if limit else 'none'} per host)"
+    )
@@ -0,0 +1,171 @@
+"""Progress of export tasks rendered with a fixed rate"""
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+from rich.progress import Progress, TaskID
+
+from reduct_cli.utils.humanize import pretty_size
+from reduct_cli.utils.rate import RateMeter
+
+WAITING = "waiting"
+RUNNING = "running"
+STOPPED = "stopped"
+DONE = "done"
+
+
+class ProgressTask:  # pylint: disable=too-few-public-methods
+    """Counters of a task
+
+    The counters are updated by the task for each record without any
+    rendering and sampled by ExportProgress with a fixed rate.
+    """
+
+    __slots__ = ("name", "total", "completed", "count", "size", "state")
+
+    def __init__(self, name: str, total: int):
+        self.name = name
+        self.total = total
+        self.completed = 0
+        self.count = 0
+        self.size = 0
+        self.state = WAITING
+
+
+class _RenderedTask:  # pylint: disable=too-few-public-methods
+    """Rich task with the last rendered state of a progress task"""
+
+    __slots__ = (
+        "task",
+        "task_id",
+        "rendered",
+        "meter",
+        "sampled_size",
+        "sampled_count",
+    )
+
+    def __init__(self, task: ProgressTask, task_id: TaskID):
+        self.task = task
+        self.task_id = task_id
+        self.rendered = None
+        self.meter = RateMeter()
+        self.sampled_size = 0
+        self.sampled_count = 0
+
+    def sample(self) -> float:
+        """Sample counters of the task and return its speed in bytes per second"""
+        task = self.task
+        if task.count != self.sampled_count:
+            self.meter.add(
+                task.size - self.sampled_size, task.count - self.sampled_count
+            )
+            self.sampled_size = task.size
+            self.sampled_count = task.count
+
+        if task.state == DONE:
+            return self.meter.average_bytes_per_second
+        return self.meter.bytes_per_second
+
+
+class ExportProgress:
+    """Render progress of export tasks
+
+    The tasks only increment their counters, and the progress bars are
+    rendered in a separate asyncio task with a fixed refresh rate.
+    If quiet is True, nothing is rendered. If reuse_tasks is True,
+    a task added with the name of an existing one restarts it,
+    so that repeated exports of the same entries keep one progress bar each.
+
+    Examples:
+        >>> async with ExportProgress() as progress:
+        >>>     task = progress.add_task("Entry 'entry-1'", total=100)
+        >>>     task.state = RUNNING
+        >>>     task.count += 1
+    """
+
+    def __init__(
+        self,
+        quiet: bool = False,
+        refresh_per_second: float = 10,
+        reuse_tasks: bool = False,
+    ):
+        self._interval = 1 / refresh_per_second
+        self._progress: Optional[Progress] = None
+        if not quiet:
+            self._progress = Progress(auto_refresh=False)
+        self._tasks: List[_RenderedTask] = []
+        self._render_task: Optional[asyncio.Task] = None
+        self._reuse_tasks = reuse_tasks
+        self._named_tasks: Dict[str, Tuple[ProgressTask, Optional[TaskID]]] = {}
+
+    def add_task(self, name: str, total: int) -> ProgressTask:
+        """Add a new task with name and total number of steps"""
+        if name in self._named_tasks:
+            task, task_id = self._named_tasks[name]
+            task.total = total
+            task.completed = 0
+            task.state = WAITING
+            if self._progress is not None:
+                self._progress.update(task_id, total=total)
+            return task
+
+        task = ProgressTask(name, total)
+        task_id = None
+        if self._progress is not None:
+            task_id = self._progress.add_task(name, total=total)
+            self._tasks.append(_RenderedTask(task, task_id))
+        if self._reuse_tasks:
+            self._named_tasks[name] = (task, task_id)
+        return task
+
+    async def __aenter__(self):
+        if self._progress is not None:
+            self._progress.start()
+            self._render_task = asyncio.create_task(self._render_loop())
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self._progress is not None:
+            self._render_task.cancel()
+            self.render()
+            self._progress.stop()
+
+    async def _render_loop(self):
+        while True:
+            await asyncio.sleep(self._interval)
+            self.render()
+
+    def render(self):
+        """Update progress bars from counters of the tasks and refresh them"""
+        for rendered in self._tasks:
+            task = rendered.task
+            speed = rendered.sample()
+
+            state = (task.state, task.count, pretty_size(speed))
+            if state == rendered.rendered:
+                continue
+            rendered.rendered = state
+
+            if task.state == WAITING:
+                description = f"{task.name} waiting"
+            elif task.state == STOPPED:
+                description = (
+                    f"{task.name} (copied {task.count} records "
+                    f"({pretty_size(task.size)}), stopped"
+                )
+            else:
+                description = (
+                    f"{task.name} (copied {task.count} records "
+                    f"({pretty_size(task.size)}), "
+                    f"speed {pretty_size(speed) if speed else '? B'}/s)"
+                )
+
+            if task.state == DONE:
+                self._progress.update(
+                    rendered.task_id, description=description, total=1, completed=1
+                )
+            else:
+                self._progress.update(
+                    rendered.task_id, description=description, completed=task.completed
+                )
+
+        self._progress.refresh()
@@ -0,0 +1,98 @@
+"""Throughput meter"""
+import math
+import time
+from typing import Callable
+
+
+class RateMeter:  # pylint: disable=too-many-instance-attributes
+    """Sliding window meter of bytes and records per second
+
+    The window is a ring buffer of time slots with running sums, so adding
+    a sample and reading the rates take constant time.
+
+    Examples:
+        >>> meter = RateMeter(window=5)
+        >>> meter.add(size=1024)
+        >>> meter.bytes_per_second, meter.average_bytes_per_second
+    """
+
+    def __init__(
+        self,
+        window: float = 5.0,
+        resolution: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._resolution = resolution
+        self._clock = clock
+        self._slots = max(math.ceil(window / resolution), 1)
+        self._bytes = [0] * self._slots
+        self._records = [0] * self._slots
+        self._window_bytes = 0
+        self._window_records = 0
+        self._total_bytes = 0
+        self._total_records = 0
+
+        self._started_at = clock()
+        self._slot = self._slot_at(self._started_at)
+
+    def add(self, size: int, count: int = 1):
+        """Add size in bytes and number of records"""
+        self._advance(self._clock())
+        index = self._slot % self._slots
+        self._bytes[index] += size
+        self._records[index] += count
+        self._window_bytes += size
+        self._window_records += count
+        self._total_bytes += size
+        self._total_records += count
+
+    @property
+    def bytes_per_second(self) -> float:
+        """Bytes per second in the sliding window"""
+        span = self._window_span()
+        return self._window_bytes / span if span else 0.0
+
+    @property
+    def records_per_second(self) -> float:
+        """Records per second in the sliding window"""
+        span = self._window_span()
+        return self._window_records / span if span else 0.0
+
+    @property
+    def average_bytes_per_second(self) -> float:
+        """Bytes per second since the meter was created"""
+        return self._average_rate(self._total_bytes)
+
+    @property
+    def average_records_per_second(self) -> float:
+        """Records per second since the meter was created"""
+        return self._average_rate(self._total_records)
+
+    def _slot_at(self, now: float) -> int:
+        return int(now / self._resolution)
+
+    def _advance(self, now: float):
+        slot = self._slot_at(now)
+        for skipped in range(self._slot + 1, min(slot, self._slot + self._slots) + 1):
+            index = skipped % self._slots
+            self._window_bytes -= self._bytes[index]
+            self._window_records -= self._records[index]
+            self._bytes[index] = 0
+            self._records[index] = 0
+        self._slot = max(slot, self._slot)
+
+    def _window_span(self) -> float:
+        now = self._clock()
+        self._advance(now)
+        elapsed = now - self._started_at
+        if elapsed < self._resolution:
+            return 0.0
+
+        span = (self._slots - 1) * self._resolution + now % self._resolution
+        return min(span, elapsed)
+
+    def _average_rate(self, value: int) -> float:
+        elapsed = self._clock() - self._started_at
+        if elapsed < self._resolution:
+            return 0.0
+        return value / elapsed
@@ -0,0 +1,158 @@
+"""Retry of transient failures with exponential backoff"""
+import asyncio
+import random
+from dataclasses import dataclass, replace
+from typing import AsyncIterator, Awaitable, Callable, FrozenSet, Optional, TypeVar
+
+from aiohttp import ClientError
+from reduct import Bucket, Record, ReductError
+
+from reduct_cli.utils.stats import EntryStats
+
+TRANSIENT_STATUSES = frozenset({408, 429, 500, 502, 503, 504, 599})
+MAX_BACKOFF = 30.0
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Policy to retry requests which failed because of transient errors
+
+    A ReductError is transient, if its status is in statuses. Timeouts and
+    connection errors of aiohttp are always transient. The delay before
+    the n-th retry is backoff * 2^(n - 1) seconds limited by MAX_BACKOFF,
+    and a random part of up to jitter of it is subtracted, so that
+    the tasks which failed together don't retry together.
+
+    Examples:
+        >>> policy = RetryPolicy(attempts=5, backoff=0.5)
+        >>> info = await policy.call(bucket.info)
+    """
+
+    attempts: int = 5
+    backoff: float = 0.5
+    jitter: float = 0.5
+    statuses: FrozenSet[int] = TRANSIENT_STATUSES
+
+    def is_transient(self, err: Exception) -> bool:
+        """Check if the error is transient and the request can be retried"""
+        if isinstance(err, ReductError):
+            return err.status_code in self.statuses
+        return isinstance(err, (ClientError, asyncio.TimeoutError, ConnectionError))
+
+    def delay(self, retry: int) -> float:
+        """Delay before retry in seconds, retries are counted from 1"""
+        delay = min(self.backoff * 2 ** (retry - 1), MAX_BACKOFF)
+        return delay - delay * self.jitter * random.random()
+
+    async def wait(
+        self, err: Exception, retry: int, stats: Optional[EntryStats] = None
+    ):
+        """Wait before retry after the error
+
+        Raises:
+            Exception: the error, if it isn't transient or the attempts are over
+        """
+        if retry >= self.attempts or not self.is_transient(err):
+            raise err
+        if stats is not None:
+            stats.retries += 1
+        await asyncio.sleep(self.delay(retry))
+
+    async def call(
+        self, func: Callable[[], Awaitable[T]], stats: Optional[EntryStats] = None
+    ) -> T:
+        """Call coroutine function and retry it after transient errors"""
+        retry = 0
+        while True:
+            try:
+                return await func()
+            except Exception as err:  # pylint: disable=broad-except
+                retry += 1
+                await self.wait(err, retry, stats)
+
+
+NO_RETRY = RetryPolicy(attempts=1)
+
+
+class _RecordReader:
+    """Read contents of a record and read them again after transient errors
+
+    The contents are read from the query first. If it fails, the record
+    is read with separate requests, and a stream skips the chunks which
+    have already been read.
+    """
+
+    def __init__(
+        self,
+        record: Record,
+        bucket: Bucket,
+        entry_name: str,
+        policy: RetryPolicy,
+        stats: Optional[EntryStats],
+    ):  # pylint: disable=too-many-arguments
+        self._original: Optional[Record] = record
+        self._bucket = bucket
+        self._entry_name = entry_name
+        self._timestamp = record.timestamp
+        self._policy = policy
+        self._stats = stats
+
+    async def read_all(self) -> bytes:
+        """Read all contents"""
+        return await self._policy.call(self._read_all_once, self._stats)
+
+    async def read(self, n: int) -> AsyncIterator[bytes]:
+        """Read contents in chunks"""
+        offset = 0
+        retry = 0
+        while True:
+            try:
+                async for chunk in self._read_from(offset, n):
+                    offset += len(chunk)
+                    retry = 0
+                    yield chunk
+                return
+            except Exception as err:  # pylint: disable=broad-except
+                retry += 1
+                await self._policy.wait(err, retry, self._stats)
+
+    async def _read_all_once(self) -> bytes:
+        if self._original is not None:
+            original, self._original = self._original, None
+            return await original.read_all()
+
+        async with self._bucket.read(self._entry_name, self._timestamp) as record:
+            return await record.read_all()
+
+    async def _read_from(self, offset: int, n: int) -> AsyncIterator[bytes]:
+        if self._original is not None:
+            original, self._original = self._original, None
+            async for chunk in original.read(n):
+                yield chunk
+            return
+
+        async with self._bucket.read(self._entry_name, self._timestamp) as record:
+            async for chunk in record.read(n):
+                if offset >= len(chunk):
+                    offset -= len(chunk)
+                    continue
+                yield chunk[offset:]
+                offset = 0
+
+
+def retrying_record(
+    record: Record,
+    bucket: Bucket,
+    entry_name: str,
+    policy: RetryPolicy,
+    stats: Optional[EntryStats] = None,
+) -> Record:
+    """Record whose contents are read again after transient errors
+
+    The contents can be read several times, e.g. to send them again,
+    all reads after the first one are separate requests.
+    """
+    reader = _RecordReader(record, bucket, entry_name, policy, stats)
+    return replace(record, read_all=reader.read_all, read=reader.read)
@@ -0,0 +1,153 @@
+"""Statistics of export commands"""
+import json
+import math
+import random
+import time
+from array import array
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Iterator, Iterable
+
+PHASES = ("network", "disk", "destination")
+MAX_LATENCY_SAMPLES = 10_000
+
+
+class EntryStats:  # pylint: disable=too-many-instance-attributes
+    """Counters and timings of an entry
+
+    The time of each phase is the time the tasks of the entry waited for it:
+
+    * network - reading records from the source,
+    * disk - writing files,
+    * destination - writing records to the destination bucket.
+
+    The latencies of records are kept in a reservoir sample of fixed size
+    to calculate percentiles with constant memory.
+    """
+
+    def __init__(self):
+        self.records = 0
+        self.bytes = 0
+        self.retries = 0
+        self.skipped = 0
+        self.started = None
+        self.finished = None
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.latencies = array("d")
+        self._samples = 0
+
+    def start(self):
+        """Mark start of a task of the entry"""
+        now = time.monotonic()
+        self.started = now if self.started is None else min(self.started, now)
+
+    def finish(self):
+        """Mark end of a task of the entry"""
+        now = time.monotonic()
+        self.finished = now if self.finished is None else max(self.finished, now)
+
+    def add_record(self, size: int, latency: float):
+        """Count a record with its size and latency in seconds"""
+        self.records += 1
+        self.bytes += size
+        self._add_latency(latency)
+
+    def add_time(self, phase: str, seconds: float):
+        """Add time waiting for the phase"""
+        self.phases[phase] += seconds
+
+    @contextmanager
+    def measure(self, phase: str) -> Iterator[None]:
+        """Add time of the block to the phase"""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add_time(phase, time.monotonic() - started)
+
+    @property
+    def wall_time(self) -> float:
+        """Time from start of the first task to end of the last one in seconds"""
+        if self.started is None:
+            return 0.0
+        finished = self.finished if self.finished is not None else time.monotonic()
+        return finished - self.started
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Statistics as a dictionary"""
+        return _report([self], self.wall_time)
+
+    def _add_latency(self, latency: float):
+        self._samples += 1
+        if len(self.latencies) < MAX_LATENCY_SAMPLES:
+            self.latencies.append(latency)
+        else:
+            index = random.randrange(self._samples)
+            if index < MAX_LATENCY_SAMPLES:
+                self.latencies[index] = latency
+
+
+class ExportStats:
+    """Statistics of an export for each entry and in total
+
+    Examples:
+        >>> stats = ExportStats()
+        >>> entry = stats.entry("entry-1")
+        >>> with entry.measure("disk"):
+        >>>     write_file()
+        >>> stats.write(Path("stats.json"))
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.entries: Dict[str, EntryStats] = {}
+
+    def entry(self, name: str) -> EntryStats:
+        """Statistics of an entry, the sub-ranges of an entry share them"""
+        if name not in self.entries:
+            self.entries[name] = EntryStats()
+        return self.entries[name]
+
+    def merge(self, other: "ExportStats"):
+        """Add statistics of another export, e.g. of a worker process"""
+        self.entries.update(other.entries)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Statistics as a dictionary"""
+        return {
+            "entries": {
+                name: entry.to_dict() for name, entry in sorted(self.entries.items())
+            },
+            "total": _report(self.entries.values(), time.monotonic() - self.started),
+        }
+
+    def write(self, path: Path):
+        """Write statistics to JSON file"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, indent=4)
+
+
+def _report(entries: Iterable[EntryStats], wall_time: float) -> Dict[str, Any]:
+    entries = list(entries)
+    latencies = sorted(latency for entry in entries for latency in entry.latencies)
+    report = {
+        "records": sum(entry.records for entry in entries),
+        "bytes": sum(entry.bytes for entry in entries),
+        "wall_time": wall_time,
+    }
+    for phase in PHASES:
+        report[f"{phase}_time"] = sum(entry.phases[phase] for entry in entries)
+    report["latency"] = {
+        f"p{percent}": _percentile(latencies, percent) for percent in (50, 95, 99)
+    }
+    report["retries"] = sum(entry.retries for entry in entries)
+    report["skipped"] = sum(entry.skipped for entry in entries)
+    return report
+
+
+def _percentile(values: list, percent: int) -> float:
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return 0.0
+    return values[max(math.ceil(percent / 100 * len(values)) - 1, 0)]
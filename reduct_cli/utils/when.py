@@ -0,0 +1,340 @@
+"""Filter expressions of record labels for --when option
+
+An expression compares labels with values and combines the comparisons
+with logical operators, e.g.:
+
+    score > 0.8 && camera in ["a", "b"] || !(quality == "bad")
+
+Comparisons: ==, !=, >, >=, <, <=, in [...], not in [...] and =~ "regex".
+Values are numbers, strings in double quotes, true and false.
+Logical operators: && (and), || (or), ! (not) and parentheses.
+
+A label is compared as a number, if the value is a number, and as a string
+otherwise. A comparison with a missing label or a label which isn't
+a number is false.
+
+An expression is converted into a condition of the conditional query of
+ReductStore, so that the server filters the records, or into a predicate
+to filter the records on the client side, if the server doesn't support it.
+"""
+import inspect
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from reduct import Bucket, Client
+
+Value = Union[float, int, str, bool]
+Labels = Dict[str, str]
+
+MIN_SERVER_VERSION = (1, 13)
+
+_TOKEN = re.compile(
+    r"\s*(?:"
+    r"(?P<number>-?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?)"
+    r'|"(?P<string>(?:[^"\\]|\\.)*)"'
+    r"|(?P<op>&&|\|\||==|!=|>=|<=|=~|[><!()\[\],])"
+    r"|(?P<name>[A-Za-z_][\w.\-/]*)"
+    r")"
+)
+
+_OPERATORS = {
+    "==": "$eq",
+    "!=": "$ne",
+    ">": "$gt",
+    ">=": "$gte",
+    "<": "$lt",
+    "<=": "$lte",
+    "in": "$in",
+    "not in": "$nin",
+}
+
+
+@dataclass(frozen=True)
+class Compare:
+    """Comparison of a label with a value or a list of values"""
+
+    label: str
+    op: str
+    value: Any
+
+
+@dataclass(frozen=True)
+class And:
+    """All the items are true"""
+
+    items: Tuple[Any, ...]
+
+
+@dataclass(frozen=True)
+class Or:
+    """Any of the items is true"""
+
+    items: Tuple[Any, ...]
+
+
+@dataclass(frozen=True)
+class Not:
+    """The item is false"""
+
+    item: Any
+
+
+Node = Union[Compare, And, Or, Not]
+
+
+class _Parser:  # pylint: disable=too-few-public-methods
+    """Recursive descent parser of expressions"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens: List[Tuple[str, Any, int]] = []
+        pos = 0
+        text = text.rstrip()
+        while pos < len(text):
+            match = _TOKEN.match(text, pos)
+            if match is None or match.end() == pos:
+                rest = text[pos:].lstrip()
+                raise ValueError(
+                    f"Unexpected '{rest[0]}' at {len(text) - len(rest)} in '{self.text}'"
+                )
+            kind = match.lastgroup
+            value, start = match.group(kind), match.start(kind)
+            if kind == "number":
+                value = float(value) if re.search(r"[.eE]", value) else int(value)
+            elif kind == "string":
+                value = re.sub(r"\\(.)", r"\1", value)
+            elif kind == "name" and value in ("true", "false"):
+                kind, value = "bool", value == "true"
+            self.tokens.append((kind, value, start))
+            pos = match.end()
+        self.pos = 0
+
+    def parse(self) -> Node:
+        """Parse the whole expression"""
+        node = self._or()
+        if self.pos < len(self.tokens):
+            self._fail("Unexpected")
+        return node
+
+    def _peek(self) -> Tuple[Optional[str], Any]:
+        if self.pos < len(self.tokens):
+            kind, value, _ = self.tokens[self.pos]
+            return kind, value
+        return None, None
+
+    def _accept(self, kind: str, value: Any = None) -> bool:
+        token_kind, token_value = self._peek()
+        if token_kind == kind and (value is None or token_value == value):
+            self.pos += 1
+            return True
+        return False
+
+    def _expect(self, kind: str, value: Any = None) -> Any:
+        token = self._peek()
+        if not self._accept(kind, value):
+            self._fail(f"Expected {value or kind}, got")
+        return token[1]
+
+    def _fail(self, message: str):
+        if self.pos < len(self.tokens):
+            _, value, pos = self.tokens[self.pos]
+            raise ValueError(f"{message} '{value}' at {pos} in '{self.text}'")
+        raise ValueError(f"{message} end of '{self.text}'")
+
+    def _or(self) -> Node:
+        items = [self._and()]
+        while self._accept("op", "||"):
+            items.append(self._and())
+        return items[0] if len(items) == 1 else Or(tuple(items))
+
+    def _and(self) -> Node:
+        items = [self._not()]
+        while self._accept("op", "&&"):
+            items.append(self._not())
+        return items[0] if len(items) == 1 else And(tuple(items))
+
+    def _not(self) -> Node:
+        if self._accept("op", "!"):
+            return Not(self._not())
+        if self._accept("op", "("):
+            node = self._or()
+            self._expect("op", ")")
+            return node
+        return self._compare()
+
+    def _compare(self) -> Compare:
+        label = self._expect("name")
+        if self._accept("name", "in"):
+            return Compare(label, "in", self._list())
+        if self._accept("name", "not"):
+            self._expect("name", "in")
+            return Compare(label, "not in", self._list())
+
+        op = self._expect("op")
+        if op == "=~":
+            pattern = self._expect("string")
+            try:
+                re.compile(pattern)
+            except re.error as err:
+                raise ValueError(f"Invalid regex '{pattern}': {err}") from err
+            return Compare(label, op, pattern)
+        if op not in _OPERATORS:
+            self.pos -= 1
+            self._fail("Expected comparison, got")
+        return Compare(label, op, self._value())
+
+    def _list(self) -> Tuple[Value, ...]:
+        self._expect("op", "[")
+        values = []
+        if not self._accept("op", "]"):
+            values.append(self._value())
+            while self._accept("op", ","):
+                values.append(self._value())
+            self._expect("op", "]")
+        return tuple(values)
+
+    def _value(self) -> Value:
+        kind, value = self._peek()
+        if kind not in ("number", "string", "bool"):
+            self._fail("Expected value, got")
+        self.pos += 1
+        return value
+
+
+def parse_when(text: str) -> Node:
+    """Parse filter expression
+
+    Raises:
+        ValueError: if the expression is invalid
+    """
+    return _Parser(text).parse()
+
+
+def to_condition(node: Node) -> Optional[Dict[str, Any]]:
+    """Convert expression into a condition of the conditional query
+
+    Returns:
+        Optional[Dict[str, Any]]: condition or None, if the expression has
+            operators which the server doesn't support (=~ and !)
+    """
+    if isinstance(node, Compare):
+        if node.op not in _OPERATORS:
+            return None
+        value = list(node.value) if isinstance(node.value, tuple) else node.value
+        return {f"&{node.label}": {_OPERATORS[node.op]: value}}
+    if isinstance(node, (And, Or)):
+        items = [to_condition(item) for item in node.items]
+        if any(item is None for item in items):
+            return None
+        return {"$and" if isinstance(node, And) else "$or": items}
+    return None
+
+
+def _matches(value: Value) -> Callable[[str], Optional[int]]:
+    """Three-way comparison of a label with a value, None if they can't be compared"""
+
+    def compare(left: Any, right: Any) -> int:
+        return (left > right) - (left < right)
+
+    if isinstance(value, bool):
+        return lambda text: (
+            compare(text.lower() == "true", value)
+            if text.lower() in ("true", "false")
+            else None
+        )
+    if isinstance(value, (int, float)):
+
+        def compare_number(text: str) -> Optional[int]:
+            try:
+                return compare(float(text), value)
+            except ValueError:
+                return None
+
+        return compare_number
+    return lambda text: compare(text, value)
+
+
+_CHECKS = {
+    "==": lambda result: result == 0,
+    "!=": lambda result: result != 0,
+    ">": lambda result: result > 0,
+    ">=": lambda result: result >= 0,
+    "<": lambda result: result < 0,
+    "<=": lambda result: result <= 0,
+}
+
+
+def compile_predicate(node: Node) -> Callable[[Labels], bool]:
+    """Compile expression into a predicate of labels of a record"""
+    if isinstance(node, (And, Or)):
+        items = [compile_predicate(item) for item in node.items]
+        if isinstance(node, And):
+            return lambda labels: all(item(labels) for item in items)
+        return lambda labels: any(item(labels) for item in items)
+    if isinstance(node, Not):
+        item = compile_predicate(node.item)
+        return lambda labels: not item(labels)
+
+    label = node.label
+    if node.op == "=~":
+        pattern = re.compile(node.value)
+        return lambda labels: (
+            label in labels and pattern.search(labels[label]) is not None
+        )
+    if node.op in ("in", "not in"):
+        comparisons = [_matches(value) for value in node.value]
+        expected = node.op == "in"
+
+        def one_of(labels: Labels) -> bool:
+            if label not in labels:
+                return False
+            text = labels[label]
+            return any(compare(text) == 0 for compare in comparisons) == expected
+
+        return one_of
+
+    comparison = _matches(node.value)
+    check = _CHECKS[node.op]
+
+    def compare_label(labels: Labels) -> bool:
+        if label not in labels:
+            return False
+        result = comparison(labels[label])
+        return result is not None and check(result)
+
+    return compare_label
+
+
+@dataclass(frozen=True)
+class When:
+    """Compiled filter expression"""
+
+    text: str
+    condition: Optional[Dict[str, Any]]
+    """Condition for the server, None if it can't be evaluated there"""
+    predicate: Callable[[Labels], bool]
+    """Predicate to filter records on the client side"""
+
+
+@lru_cache(maxsize=None)
+def compile_when(text: str) -> When:
+    """Parse and compile filter expression
+
+    The result is cached, so that the tasks of an export compile it once.
+
+    Raises:
+        ValueError: if the expression is invalid
+    """
+    node = parse_when(text)
+    return When(text, to_condition(node), compile_predicate(node))
+
+
+async def supports_conditional_query(client: Client) -> bool:
+    """Check if the client library and the server support conditional queries"""
+    if "when" not in inspect.signature(Bucket.query).parameters:
+        return False
+    info = await client.info()
+    major, minor = (int(part) for part in info.version.split(".")[:2])
+    return (major, minor) >= MIN_SERVER_VERSION
@@ -97,3 +97,55 @@ def test__show_not_exist(runner, conf):
     result = runner(f"-c {conf} alias show storage")
     assert result.exit_code == 1
     assert result.output == "Alias 'storage' doesn't exist\nAborted!\n"
+
+
+def test__show_with_pool_settings(runner, conf, url):
+    """Should add and show alias with settings of connection pool"""
+    result = runner(
+        f"-c {conf} alias add storage -L {url} -t token "
+        f"--max-connections 4 --keepalive 30 --pool-timeout 5"
+    )
+    assert result.exit_code == 0
+
+    result = runner(f"-c {conf} alias show storage")
+    assert result.exit_code == 0
+    assert result.output.replace(" ", "").split("\n") == [
+        f"URL:{url}/",
+        "Max.Connections:4",
+        "Keep-Alive:30.0s",
+        "PoolTimeout:5.0s",
+        "",
+    ]
+
+
+def test__add_group(runner, conf, url):
+    """Should add a group of aliases and print it"""
+    result = runner(f"-c {conf} alias add edge-1 -L {url} -t token")
+    assert result.exit_code == 0
+
+    result = runner(f"-c {conf} alias group add fleet edge-* cloud")
+    assert result.exit_code == 0
+
+    result = runner(f"-c {conf} alias group ls")
+    assert result.exit_code == 0
+    assert result.output == "fleet: edge-*, cloud\n"
+
+    result = runner(f"-c {conf} alias group add fleet edge-1")
+    assert result.exit_code == 1
+    assert result.output == "Group 'fleet' already exists\nAborted!\n"
+
+
+def test__rm_group(runner, conf):
+    """Should remove a group"""
+    result = runner(f"-c {conf} alias group add fleet edge-*")
+    assert result.exit_code == 0
+
+    result = runner(f"-c {conf} alias group rm fleet")
+    assert result.exit_code == 0
+
+    result = runner(f"-c {conf} alias group ls")
+    assert result.output == ""
+
+    result = runner(f"-c {conf} alias group rm fleet")
+    assert result.exit_code == 1
+    assert result.output == "Group 'fleet' doesn't exist\nAborted!\n"
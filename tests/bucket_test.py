@@ -1,10 +1,23 @@
 """Unit tests for bucket commands"""
+import asyncio
+from typing import Dict
+from unittest.mock import call as mocker_call
 
 import pytest
-from reduct import BucketInfo, Client, Bucket, BucketSettings, QuotaType, EntryInfo
+from reduct import (
+    BucketFullInfo,
+    BucketInfo,
+    Client,
+    Bucket,
+    BucketSettings,
+    QuotaType,
+    EntryInfo,
+)
 from rich.console import Console
 from rich.table import Table
 
+from reduct_cli.utils.pool import PooledClient
+
 
 @pytest.fixture(name="console")
 def _patch_console(mocker) -> Console:
@@ -51,6 +64,11 @@ def _make_bucket(mocker) -> Bucket:
             latest_record=5000000000,
         ),
     ]
+    bucket.get_full_info.return_value = BucketFullInfo(
+        info=bucket.info.return_value,
+        settings=bucket.get_settings.return_value,
+        entries=bucket.get_entry_list.return_value,
+    )
 
     return bucket
 
@@ -62,7 +80,10 @@ def _build_client(mocker) -> Client:
 
 @pytest.fixture(name="client")
 def _make_client(mocker, bucket, build_client_func) -> Client:
-    build_client_func.return_value = mocker.Mock(spec=Client)
+    build_client_func.return_value = mocker.MagicMock(spec=PooledClient)
+    build_client_func.return_value.__aenter__.return_value = (
+        build_client_func.return_value
+    )
     build_client_func.return_value.list.return_value = [
         BucketInfo(
             name="bucket-1",
@@ -81,6 +102,9 @@ def _make_client(mocker, bucket, build_client_func) -> Client:
     ]
 
     build_client_func.return_value.get_bucket.return_value = bucket
+    build_client_func.return_value.get_bucket_full_info.return_value = (
+        bucket.get_full_info.return_value
+    )
     return build_client_func.return_value
 
 
@@ -123,6 +147,98 @@ def test__get_full_list(runner, conf, console):
     ]
 
 
+@pytest.mark.usefixtures("set_alias", "client")
+def test__get_full_list_with_entries(runner, conf, console, client):
+    """Should print buckets with their entries and quotas as one table"""
+
+    result = runner(f"-c {conf} --parallel 2 bucket ls --full --entries test")
+    assert result.exit_code == 0
+
+    table = console.print.call_args[0][0]
+    assert [call[0][0] for call in table.add_column.call_args_list] == [
+        "Bucket",
+        "Entry",
+        "Records",
+        "Size",
+        "Oldest Record (UTC)",
+        "Latest Record (UTC)",
+        "Quota",
+    ]
+
+    entry_row = (
+        "1 MB",
+        "1970-01-01T00:16:40",
+        "1970-01-01T01:23:20",
+        "",
+    )
+    bucket_row = (
+        "bucket-1",
+        "1 entries",
+        "20000",
+        "1 MB",
+        "1970-01-01T00:16:40",
+        "1970-01-01T01:23:20",
+        "FIFO 120 B",
+    )
+    assert [call[0] for call in table.add_row.call_args_list] == [
+        ("bucket-1", "entry-1", "10000", *entry_row),
+        ("bucket-1", "entry-2", "10000", *entry_row),
+        bucket_row,
+        ("bucket-1", "entry-1", "10000", *entry_row),
+        ("bucket-1", "entry-2", "10000", *entry_row),
+        bucket_row,
+        (
+            "Total for 2 buckets",
+            "2 entries",
+            "40000",
+            "2 MB",
+            "1970-01-01T00:16:40",
+            "1970-01-01T01:23:20",
+            "",
+        ),
+    ]
+    assert client.get_bucket_full_info.await_args_list == [
+        mocker_call("bucket-1"),
+        mocker_call("bucket-2"),
+    ]
+    client.get_bucket.assert_not_called()
+    client.__aenter__.assert_awaited_once()
+
+
+@pytest.mark.usefixtures("set_alias", "client")
+def test__get_full_list_with_entries_concurrently(runner, conf, client):
+    """Should request buckets concurrently with --parallel limit"""
+    full_info = client.get_bucket_full_info.return_value
+    in_flight = []
+    max_in_flight = []
+
+    async def get_full_info(_name):
+        in_flight.append(1)
+        max_in_flight.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.pop()
+        return full_info
+
+    client.get_bucket_full_info.side_effect = get_full_info
+
+    result = runner(f"-c {conf} --parallel 2 bucket ls --full --entries test")
+    assert result.exit_code == 0
+    assert max(max_in_flight) == 2
+
+    result = runner(f"-c {conf} --parallel 1 bucket ls --full --entries test")
+    assert result.exit_code == 0
+    assert max(max_in_flight[2:]) == 1
+
+
+@pytest.mark.usefixtures("set_alias", "client")
+def test__get_list_with_entries_without_full(runner, conf):
+    """Should require --full for --entries"""
+
+    result = runner(f"-c {conf} bucket ls --entries test")
+    assert result.exit_code == 2
+    assert "--entries can be used only with --full" in result.output
+
+
 @pytest.mark.usefixtures("set_alias")
 def test__get_error(runner, conf, client):
     """Should print error if something got wrong"""
@@ -148,11 +264,13 @@ def test__show_bucket(runner, conf):
     assert result.exit_code == 0
 
 
-@pytest.mark.usefixtures("set_alias", "client")
-def test__show_full_bucket(runner, conf):
+@pytest.mark.usefixtures("set_alias")
+def test__show_full_bucket(runner, conf, client):
     """Should show bucket's info"""
 
     result = runner(f"-c {conf} bucket show --full test/bucket-1")
+    client.get_bucket_full_info.assert_awaited_once_with("bucket-1")
+    client.get_bucket.assert_not_called()
     assert "Entry count:         1" in result.output
     assert "Oldest Record (UTC): 1970-01-01T00:16:40" in result.output
     assert "Latest Record (UTC): 1970-01-01T01:23:20" in result.output
@@ -334,18 +452,61 @@ def test__remove_only_entries_canceled(runner, conf, bucket):
 
 @pytest.mark.usefixtures("set_alias", "client")
 def test__remove_only_entries_error(runner, conf, bucket):
-    """Should print error if something got wrong"""
-    bucket.remove_entry.side_effect = RuntimeError("Oops")
+    """Should remove other entries and print errors of failed ones"""
+
+    async def remove_entry(name):
+        if name == "entry-1":
+            raise RuntimeError("Oops")
+
+    bucket.remove_entry.side_effect = remove_entry
     result = runner(
-        f"-c {conf} bucket rm test/bucket-1 --only-entries entry-1 ", input="Y\n"
+        f"-c {conf} bucket rm test/bucket-1 --only-entries entry-* ", input="Y\n"
     )
     assert result.output == (
-        "All data in entries 'entry-1' will be REMOVED.\n"
+        "All data in entries 'entry-1, entry-2' will be REMOVED.\n"
         "Do you want to continue? [y/N]: Y\n"
-        "[RuntimeError] Oops\n"
-        "Aborted!\n"
+        "Entries 'entry-2' were removed\n"
+        "Failed to remove 1 of 2 entries:\n"
+        "entry-1: [RuntimeError] Oops\n"
     )
     assert result.exit_code == 1
+    assert bucket.remove_entry.call_count == 2
+
+
+@pytest.mark.usefixtures("set_alias", "client")
+def test__remove_only_entries_without_confirmation(runner, conf, bucket):
+    """Should remove entries concurrently without confirmation"""
+    in_flight = []
+    max_in_flight = []
+
+    async def remove_entry(_name):
+        in_flight.append(1)
+        max_in_flight.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.pop()
+
+    bucket.remove_entry.side_effect = remove_entry
+    result = runner(
+        f"-c {conf} --parallel 2 bucket rm test/bucket-1 --only-entries entry-* --yes"
+    )
+    assert result.output == (
+        "All data in entries 'entry-1, entry-2' will be REMOVED.\n"
+        "Entries 'entry-1, entry-2' were removed\n"
+    )
+    assert result.exit_code == 0
+    assert max(max_in_flight) == 2
+
+
+@pytest.mark.usefixtures("set_alias", "client")
+def test__remove_without_confirmation(runner, conf, bucket):
+    """Should remove a bucket without confirmation"""
+    result = runner(f"-c {conf} bucket rm -y test/bucket-1")
+    assert result.output == (
+        "All data in bucket 'bucket-1' will be REMOVED.\n"
+        "Bucket 'bucket-1' was removed\n"
+    )
+    assert result.exit_code == 0
+    bucket.remove.assert_called_once()
 
 
 @pytest.mark.usefixtures("set_alias", "client", "bucket")
@@ -360,3 +521,151 @@ def test__remove_only_entries_error_entry_not_found(runner, conf):
         "Entries 'entry-1, entry-2' were removed\n"
     )
     assert result.exit_code == 0
+
+
+@pytest.fixture(name="fleet")
+def _make_fleet(mocker, runner, conf, url, client) -> Dict[str, Client]:
+    clients = {}
+    for name in ["edge-1", "edge-2"]:
+        runner(f"-c {conf} alias add {name} -L {url} -t token")
+        clients[name] = mocker.Mock(spec=Client)
+        clients[name].list.return_value = client.list.return_value
+
+    build_client = mocker.patch("reduct_cli.utils.fleet.build_client")
+    build_client.side_effect = lambda _path, alias, timeout: clients[alias]
+    return clients
+
+
+def test__get_list_of_aliases(runner, conf, fleet):
+    """Should print buckets of aliases matching glob with alias names"""
+    fleet["edge-2"].list.side_effect = RuntimeError("Oops")
+
+    result = runner(f"-c {conf} bucket ls edge-*")
+    assert result.exit_code == 1
+    assert result.output.split("\n") == [
+        "edge-1/bucket-1",
+        "edge-1/bucket-2",
+        "edge-2: [RuntimeError] Oops",
+        "",
+    ]
+
+
+def test__get_full_list_of_aliases(runner, conf, fleet, console):
+    """Should print buckets of aliases in one table"""
+    result = runner(f"-c {conf} bucket ls --full edge-*")
+    assert result.exit_code == 0
+
+    table = console.print.call_args[0][0]
+    assert [call[0][0] for call in table.add_column.call_args_list][:2] == [
+        "Alias",
+        "Name",
+    ]
+    rows = [call[0] for call in table.add_row.call_args_list]
+    assert [row[:3] for row in rows] == [
+        ("edge-1", "bucket-1", "1"),
+        ("edge-1", "bucket-2", "5"),
+        ("edge-2", "bucket-1", "1"),
+        ("edge-2", "bucket-2", "5"),
+        ("Total for 2 aliases", "4 buckets", "12"),
+    ]
+    assert fleet["edge-1"].list.call_count == 1
+
+
+@pytest.mark.usefixtures("fleet")
+def test__get_list_of_aliases_with_entries(runner, conf):
+    """Should not print entries of several aliases"""
+    result = runner(f"-c {conf} bucket ls --full --entries edge-*")
+    assert result.exit_code == 2
+    assert "--entries can't be used with several aliases" in result.output
+
+
+@pytest.fixture(name="remove_query")
+def _make_remove_query(mocker, bucket):
+    # set explicitly, the method isn't in the spec of older reduct-py
+    bucket.remove_query = mocker.AsyncMock(return_value=10)
+    return bucket.remove_query
+
+
+@pytest.mark.usefixtures("set_alias", "client")
+def test__prune(runner, conf, remove_query):
+    """Should remove records in time range from entries"""
+    result = runner(
+        f"-c {conf} bucket prune test/bucket-1 --start 2023-01-01T00:00:00Z "
+        f"--stop 1700000000000000 --entries entry-* -I label=a -E other=b",
+        input="Y\n",
+    )
+    assert result.output == (
+        "Records in entries 'entry-1, entry-2' will be REMOVED.\n"
+        "Time range: 2023-01-01T00:00:00Z - 1700000000000000\n"
+        "Do you want to continue? [y/N]: Y\n"
+        "Entry 'entry-1': 10 records removed\n"
+        "Entry 'entry-2': 10 records removed\n"
+    )
+    assert result.exit_code == 0
+
+    params = {
+        "start": 1672531200000000,
+        "stop": 1700000000000000,
+        "include": {"label": "a"},
+        "exclude": {"other": "b"},
+    }
+    assert remove_query.call_args_list == [
+        mocker_call("entry-1", **params),
+        mocker_call("entry-2", **params),
+    ]
+
+
+@pytest.mark.usefixtures("set_alias", "client")
+def test__prune_errors(runner, conf, remove_query):
+    """Should remove records from other entries and print errors"""
+
+    async def remove(name, **_kwargs):
+        if name == "entry-2":
+            raise RuntimeError("Oops")
+        return 5
+
+    remove_query.side_effect = remove
+    result = runner(f"-c {conf} bucket prune test/bucket-1 --stop 1000 --yes")
+    assert result.output == (
+        "Records in entries 'entry-1, entry-2' will be REMOVED.\n"
+        "Time range: oldest record - 1000\n"
+        "Entry 'entry-1': 5 records removed\n"
+        "Failed to remove 1 of 2 entries:\n"
+        "entry-2: [RuntimeError] Oops\n"
+    )
+    assert result.exit_code == 1
+
+
+@pytest.mark.usefixtures("set_alias", "client")
+def test__prune_canceled(runner, conf, remove_query):
+    """Should cancel removing records"""
+    result = runner(f"-c {conf} bucket prune test/bucket-1 --start 0", input="N\n")
+    assert result.output.endswith("Canceled\n")
+    assert result.exit_code == 0
+    remove_query.assert_not_called()
+
+
+@pytest.mark.usefixtures("set_alias", "client")
+def test__prune_without_range(runner, conf, remove_query):
+    """Should require time range"""
+    result = runner(f"-c {conf} bucket prune test/bucket-1 --yes")
+    assert result.exit_code == 2
+    assert "--start or --stop is required" in result.output
+    remove_query.assert_not_called()
+
+
+@pytest.mark.usefixtures("set_alias", "client")
+@pytest.mark.parametrize(
+    "args, error",
+    [
+        ("--start yesterday", "[ValueError] Invalid isoformat string: 'yesterday'"),
+        ("--stop 1000 --include foo", "[ValueError] not enough values to unpack"),
+    ],
+)
+def test__prune_invalid_params(runner, conf, remove_query, args, error):
+    """Should print error for invalid time range or labels"""
+    result = runner(f"-c {conf} bucket prune test/bucket-1 {args} --yes")
+    assert result.exit_code == 1
+    assert result.output.startswith(error)
+    assert result.output.endswith("Aborted!\n")
+    remove_query.assert_not_called()
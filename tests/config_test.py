@@ -0,0 +1,122 @@
+"""Unit tests for configuration"""
+import os
+
+import pytest
+from click import Abort
+
+from reduct_cli.config import (
+    Alias,
+    Config,
+    is_alias_pattern,
+    read_config,
+    resolve_aliases,
+    write_config,
+)
+
+
+@pytest.fixture(name="config_path")
+def _make_config_path(tmp_path):
+    path = tmp_path / "config.toml"
+    write_config(
+        path,
+        Config(aliases={"test": Alias(url="http://localhost:8383", token="token")}),
+    )
+    return path
+
+
+def test__read_config_from_cache(mocker, config_path):
+    """Should read validated config from cache without parsing TOML"""
+    assert (config_path.parent / ".config.toml.cache.json").exists()
+    load = mocker.patch("tomlkit.load")
+
+    config = read_config(config_path)
+    assert config.aliases["test"].url == "http://localhost:8383/"
+    assert config.aliases["test"].token == "token"
+    assert config.aliases["test"].max_connections is None
+    load.assert_not_called()
+
+
+def test__read_config_changed(config_path):
+    """Should parse config again if the file was changed"""
+    config_path.write_text(
+        '[aliases.test]\nurl = "http://localhost:8383/"\ntoken = "new-token"\n',
+        encoding="utf8",
+    )
+    stat = config_path.stat()
+    os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+
+    assert read_config(config_path).aliases["test"].token == "new-token"
+    assert read_config(config_path).aliases["test"].token == "new-token"
+
+
+def test__read_config_broken_cache(config_path):
+    """Should ignore broken cache"""
+    (config_path.parent / ".config.toml.cache.json").write_text("{", encoding="utf8")
+    assert read_config(config_path).aliases["test"].token == "token"
+
+
+def test__cache_permissions(config_path):
+    """Should create cache with tokens readable only by owner"""
+    cache_path = config_path.parent / ".config.toml.cache.json"
+    cache_path.unlink()
+    old_umask = os.umask(0o022)
+    try:
+        read_config(config_path)
+    finally:
+        os.umask(old_umask)
+    assert cache_path.stat().st_mode & 0o777 == 0o600
+
+
+@pytest.fixture(name="fleet_config_path")
+def _make_fleet_config_path(tmp_path):
+    path = tmp_path / "config.toml"
+    alias = Alias(url="http://localhost:8383", token="token")
+    write_config(
+        path,
+        Config(
+            aliases={"edge-1": alias, "edge-2": alias, "cloud": alias},
+            groups={"fleet": ["cloud", "edge-*", "edge-1"], "empty": ["other-*"]},
+        ),
+    )
+    return path
+
+
+def test__read_groups_from_cache(fleet_config_path):
+    """Should keep groups in cache"""
+    assert read_config(fleet_config_path).groups["fleet"] == [
+        "cloud",
+        "edge-*",
+        "edge-1",
+    ]
+
+
+@pytest.mark.parametrize(
+    "pattern, aliases",
+    [
+        ("cloud", ["cloud"]),
+        ("edge-*", ["edge-1", "edge-2"]),
+        ("edge-[2]", ["edge-2"]),
+        ("@fleet", ["cloud", "edge-1", "edge-2"]),
+    ],
+)
+def test__resolve_aliases(fleet_config_path, pattern, aliases):
+    """Should resolve globs and groups into aliases without duplicates"""
+    assert is_alias_pattern(pattern) == (pattern != "cloud")
+    assert resolve_aliases(fleet_config_path, pattern) == aliases
+
+
+@pytest.mark.parametrize(
+    "pattern, error",
+    [
+        ("other", "Alias 'other' doesn't exist"),
+        ("other-*", "No aliases match 'other-*'"),
+        ("@other", "Group 'other' doesn't exist"),
+        ("@empty", "No aliases match '@empty'"),
+    ],
+)
+def test__resolve_aliases_error(mocker, fleet_config_path, pattern, error):
+    """Should abort if aliases are not found"""
+    error_console = mocker.patch("reduct_cli.config.error_console")
+    with pytest.raises(Abort):
+        resolve_aliases(fleet_config_path, pattern)
+    error_console.print.assert_called_with(error)
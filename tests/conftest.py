@@ -22,6 +22,21 @@ class AsyncIter:  # pylint: disable=too-few-public-methods
             yield item
 
 
+class FakeClock:  # pylint: disable=too-few-public-methods
+    """Clock with manual time"""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(name="clock")
+def _make_clock() -> FakeClock:
+    return FakeClock()
+
+
 @pytest.fixture(name="runner")
 def _make_runner() -> Callable[[str], Result]:
     runner = CliRunner()
@@ -33,6 +48,7 @@ def _make_conf() -> Path:
     path = Path(gettempdir()) / "config.toml"
     yield path
     path.unlink(missing_ok=True)
+    path.with_name(".config.toml.cache.json").unlink(missing_ok=True)
 
 
 @pytest.fixture(name="url")
@@ -108,6 +124,7 @@ def _make_src_bucket(mocker, src_settings, records) -> Bucket:
     ]
 
     bucket.query.return_value = AsyncIter(records)
+    bucket.write_batch.return_value = {}
     return bucket
 
 
@@ -115,5 +132,6 @@ def _make_src_bucket(mocker, src_settings, records) -> Bucket:
 def _make_dest_bucket(mocker) -> Bucket:
     bucket = mocker.Mock(spec=Bucket)
     bucket.name = "dest_bucket"
+    bucket.write_batch.return_value = {}
 
     return bucket
@@ -1,10 +1,15 @@
 """Unit tests for export bucket command"""
 import asyncio
+import json
+from array import array
+from dataclasses import replace
 from unittest.mock import call, ANY
 
 import pytest
-from reduct import Client, Bucket, ReductError
+from reduct import Client, Bucket, ReductError, EntryInfo
 
+from reduct_cli.export_impl.bucket import ExistingTimestamps, relay
+from reduct_cli.export_impl.query import signal_queue
 from tests.conftest import AsyncIter
 
 
@@ -12,6 +17,7 @@ from tests.conftest import AsyncIter
 def _make_dest_bucket(mocker) -> Bucket:
     bucket = mocker.Mock(spec=Bucket)
     bucket.name = "dest_bucket"
+    bucket.write_batch.return_value = {}
 
     return bucket
 
@@ -37,6 +43,11 @@ def walk_async_iterator(iterator: AsyncIter):
     return asyncio.new_event_loop().run_until_complete(walk())
 
 
+def await_coroutine(coroutine):
+    """Wait for coroutine and return its result"""
+    return asyncio.new_event_loop().run_until_complete(coroutine)
+
+
 @pytest.mark.usefixtures("set_alias")
 def test__export_bucket_ok(
     runner, conf, client, src_settings, src_bucket, dest_bucket, records
@@ -46,15 +57,51 @@ def test__export_bucket_ok(
     client.get_bucket.side_effect = [src_bucket, ReductError(404, "Not found")]
 
     result = runner(f"-c {conf} export bucket test/src_bucket test/dest_bucket")
-    assert "Entry 'entry-1' (copied 1 records (6 B)" in result.output
+    assert "Entry 'entry-1' (copied 2 records (6 B)" in result.output
     assert result.exit_code == 0
 
     assert client.get_bucket.call_args_list == [call("src_bucket"), call("dest_bucket")]
-    client.create_bucket.assert_called_with("dest_bucket", settings=src_settings)
+    client.create_bucket.assert_called_with(
+        "dest_bucket", settings=src_settings, exist_ok=True
+    )
 
     assert src_bucket.query.call_args_list[0] == call(
-        "entry-1", start=1000000000, stop=5000000000, include={}, exclude={}, ttl=ANY
+        "entry-1", start=1000000000, stop=5000000001, include={}, exclude={}, ttl=ANY
+    )
+    assert src_bucket.query.call_args_list[1] == call(
+        "entry-2", start=1000000000, stop=5000000001, include={}, exclude={}, ttl=ANY
+    )
+
+    dest_bucket.write.assert_not_called()
+    assert dest_bucket.write_batch.await_args_list[0] == call("entry-1", ANY)
+    assert dest_bucket.write_batch.await_args_list[1] == call("entry-2", ANY)
+
+    batch = dest_bucket.write_batch.await_args_list[0].args[1]
+    assert [
+        (timestamp, record.size, record.content_type, record.labels)
+        for timestamp, record in batch.items()
+    ] == [
+        (record.timestamp, record.size, record.content_type, record.labels)
+        for record in records
+    ]
+    assert [await_coroutine(record.read_all()) for _, record in batch.items()] == [
+        b"Hey",
+        b"Bye",
+    ]
+
+
+@pytest.mark.usefixtures("set_alias")
+def test__export_bucket_big_records(
+    runner, conf, client, src_bucket, dest_bucket, records
+):  # pylint: disable=too-many-arguments
+    """Should write records bigger than batch size one by one"""
+    client.get_bucket.side_effect = [src_bucket, ReductError(404, "Not found")]
+    result = runner(
+        f"-c {conf} export bucket test/src_bucket test/dest_bucket --batch-size 2B"
     )
+    assert result.exit_code == 0
+
+    dest_bucket.write_batch.assert_not_called()
     assert dest_bucket.write.await_args_list[0] == call(
         "entry-1",
         data=ANY,
@@ -78,17 +125,21 @@ def test__export_bucket_ok(
         b"Bye"
     ]
 
-    assert src_bucket.query.call_args_list[1] == call(
-        "entry-2", start=1000000000, stop=5000000000, include={}, exclude={}, ttl=ANY
-    )
-    assert dest_bucket.write.await_args_list[2] == call(
-        "entry-2",
-        data=ANY,
-        content_length=records[0].size,
-        timestamp=records[0].timestamp,
-        content_type=records[0].content_type,
-        labels=records[0].labels,
+
+@pytest.mark.usefixtures("set_alias")
+def test__export_bucket_batch_records(runner, conf, client, src_bucket, dest_bucket):
+    """Should split batches by number of records"""
+    client.get_bucket.side_effect = [src_bucket, ReductError(404, "Not found")]
+    result = runner(
+        f"-c {conf} export bucket test/src_bucket test/dest_bucket "
+        f"--entries=entry-1 --batch-records 1"
     )
+    assert result.exit_code == 0
+
+    assert dest_bucket.write_batch.await_count == 2
+    assert [
+        len(args.args[1].items()) for args in dest_bucket.write_batch.await_args_list
+    ] == [1, 1]
 
 
 @pytest.mark.usefixtures("set_alias", "client")
@@ -99,7 +150,7 @@ def test__export_to_bucket_ok_with_interval(runner, conf, src_bucket):
         f"--stop 2022-02-01T00:00:00+02:00 "
         f"test/src_bucket test/dest_bucket"
     )
-    assert "Entry 'entry-1' (copied 1 records (6 B)" in result.output
+    assert "Entry 'entry-1' (copied 2 records (6 B)" in result.output
     assert result.exit_code == 0
 
     assert src_bucket.query.call_args_list[0] == call(
@@ -121,14 +172,37 @@ def test__get_error(runner, conf, client):
     assert result.exit_code == 1
 
 
-@pytest.mark.usefixtures("set_alias", "client", "src_bucket")
-def test__export_bucket_409(runner, conf, dest_bucket):
+@pytest.mark.usefixtures("set_alias")
+def test__export_bucket_409(runner, conf, client, src_bucket, dest_bucket):
     """Should skip record if it already exists in destination bucket"""
+    client.get_bucket.side_effect = [
+        src_bucket,
+        ReductError(404, "Not found"),
+        src_bucket,
+        ReductError(404, "Not found"),
+    ]
     dest_bucket.write.side_effect = ReductError(409, "Conflict")
+    result = runner(
+        f"-c {conf} export bucket test/src_bucket test/dest_bucket --batch-size 2B"
+    )
+    assert result.exit_code == 0
+    assert dest_bucket.write.await_count == 6
+
+    dest_bucket.write_batch.return_value = {1000000000: ReductError(409, "Conflict")}
     result = runner(f"-c {conf} export bucket test/src_bucket test/dest_bucket")
     assert result.exit_code == 0
 
 
+@pytest.mark.usefixtures("set_alias")
+def test__export_bucket_batch_error(runner, conf, client, src_bucket, dest_bucket):
+    """Should fail if a record in a batch failed not because of conflict"""
+    client.get_bucket.side_effect = [src_bucket, ReductError(404, "Not found")]
+    dest_bucket.write_batch.return_value = {1000000000: ReductError(500, "Oops")}
+    result = runner(f"-c {conf} export bucket test/src_bucket test/dest_bucket")
+    assert result.output.endswith("[ReductError] Status 500: Oops\nAborted!\n")
+    assert result.exit_code == 1
+
+
 @pytest.mark.usefixtures("set_alias", "client", "dest_bucket")
 def test__export_bucket_utc_timestamp(runner, conf, src_bucket):
     """Should support Z designator for UTC timestamps"""
@@ -233,3 +307,514 @@ def test__export_bucket_with_limit(runner, conf, src_bucket):
     assert src_bucket.query.call_args_list[0] == call(
         "entry-1", start=ANY, stop=ANY, include={}, exclude={}, ttl=ANY, limit=10
     )
+
+
+@pytest.mark.usefixtures("set_alias", "client", "dest_bucket")
+def test__export_bucket_with_slices(runner, conf, src_bucket):
+    """Should split a big entry into time sub-ranges and copy them concurrently"""
+    src_bucket.get_entry_list.return_value = [
+        EntryInfo(
+            name="entry-1",
+            size=1050000,
+            block_count=1,
+            record_count=3000,
+            oldest_record=1000000000,
+            latest_record=4000000000,
+        )
+    ]
+    result = runner(
+        f"-c {conf} export bucket test/src_bucket test/dest_bucket --slices 3"
+    )
+    assert result.exit_code == 0
+    assert src_bucket.query.call_args_list == [
+        call(
+            "entry-1",
+            start=1000000000,
+            stop=2000000000,
+            include={},
+            exclude={},
+            ttl=ANY,
+        ),
+        call(
+            "entry-1",
+            start=2000000000,
+            stop=3000000000,
+            include={},
+            exclude={},
+            ttl=ANY,
+        ),
+        call(
+            "entry-1",
+            start=3000000000,
+            stop=4000000001,
+            include={},
+            exclude={},
+            ttl=ANY,
+        ),
+    ]
+
+
+@pytest.mark.usefixtures("set_alias")
+def test__export_bucket_with_checkpoint(
+    runner, conf, client, src_bucket, dest_bucket, tmp_path
+):  # pylint: disable=too-many-arguments
+    """Should commit the last record of each written batch to journal"""
+    client.get_bucket.side_effect = [src_bucket, ReductError(404, "Not found")]
+    dest_bucket.write_batch.side_effect = [{}, RuntimeError("Oops")]
+
+    journal = tmp_path / "journal.json"
+    result = runner(
+        f"-c {conf} -p 1 export bucket test/src_bucket test/dest_bucket "
+        f"--checkpoint {journal} --batch-records 1"
+    )
+    assert result.exit_code == 1
+
+    assert json.loads(journal.read_text())["entry-1"] == [
+        {"start": 1000000000, "stop": 5000000001, "last": 1000000000}
+    ]
+
+
+@pytest.mark.usefixtures("set_alias")
+def test__export_bucket_skip_existing(
+    runner, conf, client, src_bucket, dest_bucket, records
+):  # pylint: disable=too-many-arguments
+    """Should query only records which don't exist in destination entry"""
+    client.get_bucket.side_effect = [src_bucket, dest_bucket]
+    dest_bucket.query.side_effect = [
+        AsyncIter(records[:1]),
+        ReductError(404, "Not found"),
+    ]
+    src_bucket.query.side_effect = lambda entry, start, stop, **_: AsyncIter(
+        [record for record in records if start <= record.timestamp <= stop]
+    )
+
+    result = runner(
+        f"-c {conf} -p 1 export bucket test/src_bucket test/dest_bucket "
+        f"--entries entry-1,entry-2 --skip-existing"
+    )
+    assert result.exit_code == 0
+
+    assert dest_bucket.query.call_args_list == [
+        call("entry-1", start=1000000000, stop=5000000001, head=True),
+        call("entry-2", start=1000000000, stop=5000000001, head=True),
+    ]
+    assert src_bucket.query.call_args_list == [
+        call(
+            "entry-1",
+            start=1000000000,
+            stop=5000000001,
+            include={},
+            exclude={},
+            ttl=ANY,
+            head=True,
+        ),
+        call(
+            "entry-1",
+            start=5000000000,
+            stop=5000000001,
+            include={},
+            exclude={},
+            ttl=ANY,
+        ),
+        call(
+            "entry-2",
+            start=1000000000,
+            stop=5000000001,
+            include={},
+            exclude={},
+            ttl=ANY,
+        ),
+    ]
+
+    batch = dest_bucket.write_batch.await_args_list[0].args[1]
+    assert dest_bucket.write_batch.await_args_list[0].args[0] == "entry-1"
+    assert [timestamp for timestamp, _ in batch.items()] == [5000000000]
+
+    batch = dest_bucket.write_batch.await_args_list[1].args[1]
+    assert dest_bucket.write_batch.await_args_list[1].args[0] == "entry-2"
+    assert [timestamp for timestamp, _ in batch.items()] == [1000000000, 5000000000]
+
+
+@pytest.mark.usefixtures("set_alias")
+def test__export_bucket_skip_existing_inside_range(
+    runner, conf, client, src_bucket, dest_bucket, records, tmp_path
+):  # pylint: disable=too-many-arguments
+    """Should drop existing records from one query and count only dropped ones"""
+    client.get_bucket.side_effect = [src_bucket, dest_bucket]
+    records.insert(1, replace(records[0], timestamp=3000000000))
+    dest_bucket.query.side_effect = [
+        AsyncIter([records[1], replace(records[1], timestamp=4000000000)]),
+    ]
+    src_bucket.query.side_effect = lambda entry, start, stop, **_: AsyncIter(
+        [record for record in records if start <= record.timestamp < stop]
+    )
+    stats_path = tmp_path / "stats.json"
+
+    result = runner(
+        f"-c {conf} export bucket test/src_bucket test/dest_bucket "
+        f"--entries entry-1 --stop 6000000000 --skip-existing "
+        f"--stats-json {stats_path}"
+    )
+    assert result.exit_code == 0
+
+    assert [
+        (kwargs["start"], kwargs["stop"], kwargs.get("head", False))
+        for _, kwargs in src_bucket.query.call_args_list
+    ] == [(1000000000, 6000000000, True), (1000000000, 5000000001, False)]
+
+    batch = dest_bucket.write_batch.await_args_list[0].args[1]
+    assert [timestamp for timestamp, _ in batch.items()] == [1000000000, 5000000000]
+    assert json.loads(stats_path.read_text())["entries"]["entry-1"]["skipped"] == 1
+
+
+def test__existing_timestamps():
+    """Should return time ranges of records which don't exist"""
+    existing = ExistingTimestamps(array("q", [10, 20, 21, 30, 50]))
+    assert len(existing) == 5
+    assert 21 in existing
+    assert 22 not in existing
+    assert list(existing.missing_ranges([5, 10, 15, 20, 21, 25, 30, 60])) == [(5, 61)]
+    assert not list(existing.missing_ranges([10, 20]))
+    assert not list(ExistingTimestamps(array("q", [1, 2])).missing_ranges([]))
+
+
+def test__existing_timestamps_long_runs():
+    """Should split ranges only around long runs of existing records"""
+    existing = ExistingTimestamps(array("q", range(100, 300)))
+    assert list(existing.missing_ranges(range(0, 400))) == [(0, 100), (300, 400)]
+    assert list(existing.missing_ranges(range(0, 400, 2))) == [(0, 99), (300, 399)]
+    assert list(existing.missing_ranges(range(0, 400, 4))) == [(0, 397)]
+    assert list(existing.missing_ranges(range(150, 400))) == [(300, 400)]
+
+
+@pytest.mark.usefixtures("set_alias")
+def test__export_bucket_chunk_size(
+    runner, conf, client, src_bucket, dest_bucket, records
+):  # pylint: disable=too-many-arguments
+    """Should relay big records in chunks of given size"""
+    client.get_bucket.side_effect = [src_bucket, ReductError(404, "Not found")]
+
+    chunk_sizes = []
+
+    async def read(size: int):
+        chunk_sizes.append(size)
+        yield b"Hey"
+
+    records[0].read = read
+    result = runner(
+        f"-c {conf} -p 1 export bucket test/src_bucket test/dest_bucket "
+        f"--entries entry-1 --batch-size 2B --chunk-size 1KB"
+    )
+    assert result.exit_code == 0
+
+    data = dest_bucket.write.await_args_list[0].kwargs["data"]
+    assert walk_async_iterator(data) == [b"Hey"]
+    assert chunk_sizes == [1000]
+
+
+@pytest.mark.usefixtures("set_alias", "client")
+@pytest.mark.parametrize("option", ["--chunk-size", "--batch-size"])
+@pytest.mark.parametrize("size", ["0", "-1KB", "abc"])
+def test__export_bucket_invalid_size(
+    runner, conf, src_bucket, option, size
+):  # pylint: disable=too-many-arguments
+    """Should fail with a chunk or batch size which isn't positive"""
+    result = runner(
+        f"-c {conf} export bucket test/src_bucket test/dest_bucket {option} {size}"
+    )
+    assert result.exit_code == 2
+    assert "must be a positive size in CI format" in result.output
+    src_bucket.query.assert_not_called()
+
+
+def test__relay_chunks():
+    """Should pass chunks through in order"""
+
+    async def chunks():
+        for i in range(10):
+            yield bytes([i])
+
+    assert walk_async_iterator(relay(chunks(), 2)) == [bytes([i]) for i in range(10)]
+
+
+def test__relay_error():
+    """Should raise error of source"""
+
+    async def chunks():
+        yield b"Hey"
+        raise RuntimeError("Oops")
+
+    with pytest.raises(RuntimeError, match="Oops"):
+        walk_async_iterator(relay(chunks(), 2))
+
+
+@pytest.mark.usefixtures("set_alias")
+def test__export_bucket_stats_json(
+    runner, conf, client, src_bucket, dest_bucket, tmp_path
+):  # pylint: disable=too-many-arguments
+    """Should write statistics with records skipped by the destination"""
+    client.get_bucket.side_effect = [src_bucket, ReductError(404, "Not found")]
+    dest_bucket.write_batch.return_value = {1000000000: ReductError(409, "Conflict")}
+    stats_path = tmp_path / "stats.json"
+    result = runner(
+        f"-c {conf} export bucket test/src_bucket test/dest_bucket "
+        f"--stats-json {stats_path}"
+    )
+    assert result.exit_code == 0
+
+    stats = json.loads(stats_path.read_text())
+    assert list(stats["entries"]) == ["entry-1", "entry-2", "some-other-entry"]
+    assert stats["entries"]["entry-1"]["records"] == 2
+    assert stats["entries"]["entry-1"]["bytes"] == 6
+    assert stats["entries"]["entry-1"]["skipped"] == 1
+    assert stats["total"]["records"] == 6
+    assert stats["total"]["skipped"] == 3
+    assert stats["total"]["destination_time"] > 0
+
+
+class FailingIter(AsyncIter):  # pylint: disable=too-few-public-methods
+    """Iterator which fails after its items"""
+
+    def __init__(self, items, error: Exception):
+        super().__init__(items)
+        self.error = error
+
+    async def __aiter__(self):
+        for item in self.items:
+            yield item
+        raise self.error
+
+
+@pytest.mark.usefixtures("set_alias")
+def test__export_bucket_resume_query(
+    runner, conf, client, src_bucket, dest_bucket, records, tmp_path
+):  # pylint: disable=too-many-arguments
+    """Should resume a failed query after the last read record"""
+    client.get_bucket.side_effect = [src_bucket, dest_bucket]
+    src_bucket.query.side_effect = [
+        FailingIter(records[:1], ReductError(503, "Unavailable")),
+        AsyncIter(records[1:]),
+    ]
+    stats_path = tmp_path / "stats.json"
+    result = runner(
+        f"-c {conf} export bucket test/src_bucket test/dest_bucket "
+        f"--entries entry-1 --retry-backoff 0 --stats-json {stats_path}"
+    )
+    assert result.exit_code == 0
+    assert src_bucket.query.call_args_list == [
+        call(
+            "entry-1",
+            start=1000000000,
+            stop=5000000001,
+            include={},
+            exclude={},
+            ttl=ANY,
+        ),
+        call(
+            "entry-1",
+            start=1000000001,
+            stop=5000000001,
+            include={},
+            exclude={},
+            ttl=ANY,
+        ),
+    ]
+
+    batch = dest_bucket.write_batch.await_args_list[0].args[1]
+    assert [timestamp for timestamp, _ in batch.items()] == [
+        record.timestamp for record in records
+    ]
+    assert json.loads(stats_path.read_text())["total"]["retries"] == 1
+
+
+@pytest.mark.usefixtures("set_alias")
+def test__export_bucket_retry_write(runner, conf, client, src_bucket, dest_bucket):
+    """Should retry writes after transient errors and give up after attempts"""
+    client.get_bucket.side_effect = [src_bucket, dest_bucket]
+    dest_bucket.write_batch.side_effect = [ReductError(502, "Bad Gateway"), {}]
+    result = runner(
+        f"-c {conf} export bucket test/src_bucket test/dest_bucket "
+        f"--entries entry-1 --retry-backoff 0"
+    )
+    assert result.exit_code == 0
+    assert dest_bucket.write_batch.await_count == 2
+
+    client.get_bucket.side_effect = [src_bucket, dest_bucket]
+    dest_bucket.write_batch.side_effect = ReductError(502, "Bad Gateway")
+    dest_bucket.write_batch.reset_mock()
+    result = runner(
+        f"-c {conf} export bucket test/src_bucket test/dest_bucket "
+        f"--entries entry-1 --retry-backoff 0 --retry-attempts 3 "
+        f"--retry-statuses 502,503"
+    )
+    assert result.output.endswith("[ReductError] Status 502: Bad Gateway\nAborted!\n")
+    assert dest_bucket.write_batch.await_count == 3
+
+    result = runner(
+        f"-c {conf} export bucket test/src_bucket test/dest_bucket "
+        f"--retry-statuses 50x"
+    )
+    assert "must be HTTP status codes separated by comma" in result.output
+    assert result.exit_code == 2
+
+
+@pytest.mark.usefixtures("set_alias")
+def test__export_bucket_retry_big_record(
+    runner, conf, client, src_bucket, dest_bucket, mocker
+):  # pylint: disable=too-many-arguments
+    """Should read a big record again to retry its write"""
+    client.get_bucket.side_effect = [src_bucket, dest_bucket]
+
+    async def write(_entry_name, data, **_kwargs):
+        if dest_bucket.write.await_count == 1:
+            async for _ in data:
+                raise ReductError(503, "Unavailable")
+            raise ReductError(503, "Unavailable")
+        sent.append(b"".join([chunk async for chunk in data]))
+
+    async def walk(data):
+        yield data
+
+    sent = []
+    dest_bucket.write.side_effect = write
+    read_again = mocker.MagicMock()
+    read_again.return_value.__aenter__.return_value.read = lambda _n: walk(b"Hey")
+    src_bucket.read = read_again
+
+    result = runner(
+        f"-c {conf} export bucket test/src_bucket test/dest_bucket "
+        f"--entries entry-1 --batch-size 2B --retry-backoff 0"
+    )
+    assert result.exit_code == 0
+    assert sent == [b"Hey", b"Bye"]
+    read_again.assert_called_once_with("entry-1", 1000000000)
+
+
+@pytest.fixture(name="stop_signal")
+def _make_stop_signal():
+    yield signal_queue
+    while not signal_queue.empty():
+        signal_queue.get_nowait()
+
+
+def make_entry(name: str, latest_record: int) -> EntryInfo:
+    """Entry with two records"""
+    return EntryInfo(
+        name=name,
+        size=100,
+        block_count=1,
+        record_count=2,
+        oldest_record=1000000000,
+        latest_record=latest_record,
+    )
+
+
+@pytest.mark.usefixtures("set_alias")
+def test__export_bucket_follow(
+    runner, conf, client, src_bucket, dest_bucket, stop_signal
+):  # pylint: disable=too-many-arguments
+    """Should copy new records and new entries until a stop signal"""
+    client.get_bucket.side_effect = [src_bucket, dest_bucket]
+
+    cycles = [
+        [make_entry("entry-1", 5000000000)],
+        [make_entry("entry-1", 5000000000)],
+        [make_entry("entry-1", 6000000000), make_entry("entry-2", 5000000000)],
+    ]
+
+    async def get_entry_list():
+        if not cycles:
+            stop_signal.put_nowait("stop")
+            return []
+        return cycles.pop(0)
+
+    src_bucket.get_entry_list.side_effect = get_entry_list
+    result = runner(
+        f"-c {conf} export bucket test/src_bucket test/dest_bucket "
+        f"--follow --poll-interval 0"
+    )
+    assert result.exit_code == 0
+    assert src_bucket.get_entry_list.await_count == 4
+    assert src_bucket.query.call_args_list == [
+        call(
+            "entry-1",
+            start=1000000000,
+            stop=5000000001,
+            include={},
+            exclude={},
+            ttl=ANY,
+        ),
+        call(
+            "entry-1",
+            start=5000000001,
+            stop=6000000001,
+            include={},
+            exclude={},
+            ttl=ANY,
+        ),
+        call(
+            "entry-2",
+            start=1000000000,
+            stop=5000000001,
+            include={},
+            exclude={},
+            ttl=ANY,
+        ),
+    ]
+    assert result.output.count("Entry 'entry-1'") == 1
+
+
+@pytest.mark.usefixtures("set_alias", "client")
+def test__export_bucket_follow_with_stop(runner, conf):
+    """Should not follow records with a stop time point"""
+    result = runner(
+        f"-c {conf} export bucket test/src_bucket test/dest_bucket "
+        f"--follow --stop 2022-01-01T00:00:00Z"
+    )
+    assert "--follow can't be used with --stop, --limit or --workers" in result.output
+    assert result.exit_code == 2
+
+
+@pytest.mark.usefixtures("set_alias", "client", "dest_bucket")
+@pytest.mark.parametrize("pushdown", [True, False])
+def test__export_bucket_with_when(mocker, runner, conf, src_bucket, pushdown):
+    """Should send filter to server, if it supports conditional queries"""
+    mocker.patch(
+        "reduct_cli.export.supports_conditional_query",
+        mocker.AsyncMock(return_value=pushdown),
+    )
+    result = runner(
+        f"-c {conf} export bucket test/src_bucket test/dest_bucket "
+        "--when 'score > 0.8'"
+    )
+    assert result.exit_code == 0
+    kwargs = src_bucket.query.call_args_list[0].kwargs
+    assert kwargs.get("when") == ({"&score": {"$gt": 0.8}} if pushdown else None)
+
+
+@pytest.mark.usefixtures("set_alias", "client", "dest_bucket")
+def test__export_bucket_with_invalid_when(runner, conf, src_bucket):
+    """Should fail with invalid filter expression"""
+    result = runner(
+        f"-c {conf} export bucket test/src_bucket test/dest_bucket --when 'score >'"
+    )
+    assert result.exit_code == 2
+    assert "Expected value, got end of 'score >'" in result.output
+    src_bucket.query.assert_not_called()
+
+
+@pytest.mark.usefixtures("set_alias")
+def test__mirror_retry_statuses(runner, conf, client, src_bucket, dest_bucket):
+    """Should use default retry statuses when mirror forwards to export bucket"""
+    client.get_bucket.side_effect = [src_bucket, dest_bucket]
+    dest_bucket.write_batch.side_effect = [
+        ReductError(503, "Unavailable"),
+        {1000000000: ReductError(409, "Conflict")},
+    ]
+    dest_bucket.write.side_effect = ReductError(409, "Conflict")
+
+    result = runner(
+        f"-c {conf} mirror test/src_bucket test/dest_bucket --entries entry-1"
+    )
+    assert result.exit_code == 0, result.output
+    assert dest_bucket.write_batch.await_count == 2
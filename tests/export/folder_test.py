@@ -1,12 +1,16 @@
 """Unit tests for export folder command"""
 import json
 import shutil
+import tarfile
 from pathlib import Path
 from tempfile import gettempdir
 from unittest.mock import call, ANY
 
 import pytest
-from reduct import Client
+from reduct import Client, EntryInfo, Record, ReductError
+
+from reduct_cli.utils.limiter import RateLimiter
+from tests.conftest import AsyncIter
 
 
 @pytest.fixture(name="client")
@@ -39,7 +43,7 @@ def test__export_to_folder_ok_with_interval(
         f"--stop 2022-02-01T00:00:00+02:00 "
         f"test/src_bucket {export_path}"
     )
-    assert "Entry 'entry-1' (copied 1 records (6 B)" in result.output
+    assert "Entry 'entry-1' (copied 2 records (6 B)" in result.output
     assert result.exit_code == 0
 
     assert src_bucket.query.call_args_list[0] == call(
@@ -73,11 +77,11 @@ def test__export_to_folder_ok_with_interval(
 def test__export_to_folder_ok_without_interval(runner, conf, src_bucket, export_path):
     """Should export a bucket to a fodder one without time interval"""
     result = runner(f"-c {conf} export folder test/src_bucket {export_path}")
-    assert "Entry 'entry-1' (copied 1 records (6 B)" in result.output
+    assert "Entry 'entry-1' (copied 2 records (6 B)" in result.output
     assert result.exit_code == 0
 
     assert src_bucket.query.call_args_list[0] == call(
-        "entry-1", start=1000000000, stop=5000000000, include={}, exclude={}, ttl=ANY
+        "entry-1", start=1000000000, stop=5000000001, include={}, exclude={}, ttl=ANY
     )
 
 
@@ -157,7 +161,7 @@ def test__export_multiple_specific_entry(runner, conf, src_bucket, export_path):
 def test__export_to_folder_with_ext_flag(runner, conf, records, export_path):
     """Should export a bucket to a folder with ext flag"""
     result = runner(f"-c {conf} export folder test/src_bucket {export_path} --ext .txt")
-    assert "Entry 'entry-1' (copied 1 records (6 B)" in result.output
+    assert "Entry 'entry-1' (copied 2 records (6 B)" in result.output
     assert result.exit_code == 0
 
     assert (
@@ -175,7 +179,7 @@ def test__export_to_folder_with_filters(runner, conf, src_bucket, export_path):
         f"-c {conf} export folder test/src_bucket {export_path} "
         f"--include label1=value1,label2=value2 --exclude label3=value3,label4=value4"
     )
-    assert "Entry 'entry-1' (copied 1 records (6 B)" in result.output
+    assert "Entry 'entry-1' (copied 2 records (6 B)" in result.output
     assert result.exit_code == 0
 
     assert src_bucket.query.call_args_list[0] == call(
@@ -192,7 +196,7 @@ def test__export_to_folder_with_filters(runner, conf, src_bucket, export_path):
 def test__export_to_folder_with_ttl(runner, conf, src_bucket, export_path):
     """Should query bucket with calculated TTL = timeout * parallel tasks"""
     result = runner(f"-c {conf} -p 2  -t 3 export folder test/src_bucket {export_path}")
-    assert "Entry 'entry-1' (copied 1 records (6 B)" in result.output
+    assert "Entry 'entry-1' (copied 2 records (6 B)" in result.output
     assert result.exit_code == 0
 
     assert src_bucket.query.call_args_list[0] == call(
@@ -209,7 +213,7 @@ def test__export_to_folder_with_ttl(runner, conf, src_bucket, export_path):
 def test__export_to_folder_with_limit(runner, conf, src_bucket, export_path):
     """Should export bucket with limit"""
     result = runner(f"-c {conf} export folder test/src_bucket {export_path} --limit 10")
-    assert "Entry 'entry-1' (copied 1 records (6 B)" in result.output
+    assert "Entry 'entry-1' (copied 2 records (6 B)" in result.output
     assert result.exit_code == 0
 
     assert src_bucket.query.call_args_list[0] == call(
@@ -229,7 +233,7 @@ def test__export_to_folder_with_metadata(runner, conf, export_path, records):
     result = runner(
         f"-c {conf} export folder test/src_bucket {export_path} --with-metadata"
     )
-    assert "Entry 'entry-1' (copied 1 records (6 B)" in result.output
+    assert "Entry 'entry-1' (copied 2 records (6 B)" in result.output
     assert result.exit_code == 0
 
     metadata = (export_path / "entry-1" / f"{records[0].timestamp}.json").read_bytes()
@@ -239,3 +243,376 @@ def test__export_to_folder_with_metadata(runner, conf, export_path, records):
         "size": records[0].size,
         "labels": records[0].labels,
     }
+
+
+@pytest.mark.usefixtures("set_alias", "client")
+def test__export_to_folder_with_slices(runner, conf, src_bucket, export_path):
+    """Should split a big entry into time sub-ranges and export them concurrently"""
+    src_bucket.get_entry_list.return_value = [
+        EntryInfo(
+            name="entry-1",
+            size=1050000,
+            block_count=1,
+            record_count=2000,
+            oldest_record=1000000000,
+            latest_record=5000000000,
+        )
+    ]
+    result = runner(f"-c {conf} export folder test/src_bucket {export_path} --slices 2")
+    assert "Entry 'entry-1' [1/2] (copied 2 records (6 B)" in result.output
+    assert "Entry 'entry-1' [2/2] (copied 2 records (6 B)" in result.output
+    assert result.exit_code == 0
+
+    assert src_bucket.query.call_args_list == [
+        call(
+            "entry-1",
+            start=1000000000,
+            stop=3000000000,
+            include={},
+            exclude={},
+            ttl=ANY,
+        ),
+        call(
+            "entry-1",
+            start=3000000000,
+            stop=5000000001,
+            include={},
+            exclude={},
+            ttl=ANY,
+        ),
+    ]
+
+
+@pytest.mark.usefixtures("set_alias", "client")
+def test__export_to_folder_with_checkpoint(runner, conf, export_path, records):
+    """Should keep the last exported record of each entry in journal"""
+    journal = export_path / "journal.json"
+    result = runner(
+        f"-c {conf} export folder test/src_bucket {export_path} "
+        f"--checkpoint {journal}"
+    )
+    assert result.exit_code == 0
+
+    time_range = {"start": 1000000000, "stop": 5000000001, "last": records[1].timestamp}
+    assert json.loads(journal.read_text()) == {
+        "entry-1": [time_range],
+        "entry-2": [time_range],
+        "some-other-entry": [time_range],
+    }
+
+
+@pytest.mark.usefixtures("set_alias", "client")
+def test__export_to_folder_resume(runner, conf, src_bucket, export_path):
+    """Should resume export after the last exported record of each entry"""
+    journal = export_path / "journal.json"
+    export_path.mkdir()
+    journal.write_text(
+        json.dumps(
+            {
+                "entry-1": [{"start": 1000000000, "stop": 5000000001, "last": 2000}],
+                "entry-2": [
+                    {"start": 1000000000, "stop": 5000000001, "last": 5000000000}
+                ],
+            }
+        )
+    )
+
+    result = runner(
+        f"-c {conf} export folder test/src_bucket {export_path} "
+        f"--checkpoint {journal} --resume"
+    )
+    assert result.exit_code == 0
+    assert src_bucket.query.call_args_list == [
+        call("entry-1", start=2001, stop=5000000001, include={}, exclude={}, ttl=ANY),
+        call(
+            "some-other-entry",
+            start=1000000000,
+            stop=5000000001,
+            include={},
+            exclude={},
+            ttl=ANY,
+        ),
+    ]
+
+
+@pytest.mark.usefixtures("set_alias", "client")
+def test__export_to_folder_resume_without_checkpoint(runner, conf, export_path):
+    """Should fail if --resume is used without --checkpoint"""
+    result = runner(f"-c {conf} export folder test/src_bucket {export_path} --resume")
+    assert "--resume requires --checkpoint" in result.output
+    assert result.exit_code == 2
+
+
+@pytest.mark.usefixtures("set_alias", "client", "src_bucket")
+def test__export_to_folder_quiet(runner, conf, export_path, records):
+    """Should export a bucket to a folder without progress bars"""
+    result = runner(f"-c {conf} export folder test/src_bucket {export_path} --quiet")
+    assert result.exit_code == 0
+    assert result.output == ""
+
+    assert (
+        export_path / "entry-1" / f"{records[0].timestamp}.png"
+    ).read_bytes() == b"Hey"
+
+
+@pytest.mark.usefixtures("set_alias", "client", "src_bucket")
+def test__export_to_folder_big_records(runner, conf, export_path, records, mocker):
+    """Should write big records chunk by chunk"""
+    mocker.patch("reduct_cli.export_impl.folder.BUFFERED_RECORD_SIZE", 1)
+    result = runner(
+        f"-c {conf} export folder test/src_bucket {export_path} --with-metadata"
+    )
+    assert result.exit_code == 0
+
+    assert (
+        export_path / "entry-1" / f"{records[0].timestamp}.png"
+    ).read_bytes() == b"Hey"
+    assert (export_path / "entry-1" / f"{records[0].timestamp}.json").exists()
+
+
+@pytest.mark.usefixtures("set_alias", "client", "src_bucket")
+def test__export_to_folder_tar(runner, conf, export_path, records):
+    """Should pack records of each entry into a tar segment with index"""
+    result = runner(
+        f"-c {conf} export folder test/src_bucket {export_path} --format tar"
+    )
+    assert result.exit_code == 0
+
+    segment = export_path / "entry-1" / f"{records[0].timestamp}.tar"
+    with tarfile.open(segment) as tar:
+        assert tar.getnames() == ["1000000000.png", "5000000000.bin"]
+        assert tar.extractfile("1000000000.png").read() == b"Hey"
+        assert tar.extractfile("5000000000.bin").read() == b"Bye"
+
+    index = json.loads(
+        (export_path / "entry-1" / f"{records[0].timestamp}.index.json").read_text()
+    )
+    assert index == {
+        "timestamp": [1000000000, 5000000000],
+        "name": ["1000000000.png", "5000000000.bin"],
+        "offset": [512, 1536],
+        "size": [3, 3],
+        "content_type": ["image/png", ""],
+        "labels": [{}, {}],
+    }
+    assert segment.read_bytes()[512:515] == b"Hey"
+
+
+@pytest.mark.usefixtures("set_alias", "client", "src_bucket")
+def test__export_to_folder_tar_segment_size(runner, conf, export_path, records):
+    """Should start a new segment if the current one is full"""
+    journal = export_path / "journal.json"
+    result = runner(
+        f"-c {conf} export folder test/src_bucket {export_path} --format tar "
+        f"--segment-size 1KB --checkpoint {journal}"
+    )
+    assert result.exit_code == 0
+
+    assert sorted(path.name for path in (export_path / "entry-1").iterdir()) == [
+        "1000000000.index.json",
+        "1000000000.tar",
+        "5000000000.index.json",
+        "5000000000.tar",
+    ]
+    assert json.loads(journal.read_text())["entry-1"][0]["last"] == (
+        records[1].timestamp
+    )
+
+
+@pytest.mark.usefixtures("set_alias", "client")
+def test__export_to_folder_tar_stream(runner, conf, src_bucket, export_path):
+    """Should stream contents of records into a segment chunk by chunk"""
+    data = bytes(range(256)) * 4000
+
+    async def read_all():
+        raise AssertionError("Record must not be read into memory")
+
+    async def read(n: int):
+        for i in range(0, len(data), n):
+            yield data[i : i + n]
+
+    src_bucket.query.return_value = AsyncIter(
+        [
+            Record(
+                timestamp=1000000000,
+                size=len(data),
+                content_type="",
+                labels={},
+                last=True,
+                read_all=read_all,
+                read=read,
+            )
+        ]
+    )
+    result = runner(
+        f"-c {conf} export folder test/src_bucket {export_path} "
+        f"--entries entry-1 --format tar"
+    )
+    assert result.exit_code == 0
+
+    with tarfile.open(export_path / "entry-1" / "1000000000.tar") as tar:
+        assert tar.extractfile("1000000000.bin").read() == data
+
+
+@pytest.mark.usefixtures("set_alias", "client")
+@pytest.mark.parametrize("size", ["abc", "0B", "-1GB"])
+def test__export_to_folder_invalid_segment_size(runner, conf, export_path, size):
+    """Should fail with invalid segment size"""
+    result = runner(
+        f"-c {conf} export folder test/src_bucket {export_path} --format tar "
+        f"--segment-size {size}"
+    )
+    assert result.exit_code == 2
+    assert "Invalid value for '--segment-size'" in result.output
+    assert "must be a positive size in CI format" in result.output
+
+
+@pytest.mark.usefixtures("set_alias", "client")
+def test__export_to_folder_metadata_only(runner, conf, src_bucket, export_path):
+    """Should export metadata of records into a JSON Lines file for each entry"""
+    result = runner(
+        f"-c {conf} export folder test/src_bucket {export_path} "
+        f"--entries entry-1 --metadata-only --slices 4"
+    )
+    assert result.exit_code == 0
+
+    assert src_bucket.query.call_args_list == [
+        call(
+            "entry-1",
+            start=1000000000,
+            stop=5000000001,
+            include={},
+            exclude={},
+            ttl=ANY,
+            head=True,
+        )
+    ]
+    assert not (export_path / "entry-1").exists()
+    assert [
+        json.loads(line)
+        for line in (export_path / "entry-1.jsonl").read_text().splitlines()
+    ] == [
+        {
+            "timestamp": 1000000000,
+            "size": 3,
+            "content_type": "image/png",
+            "labels": {},
+        },
+        {"timestamp": 5000000000, "size": 3, "content_type": "", "labels": {}},
+    ]
+
+
+@pytest.mark.usefixtures("set_alias", "client")
+def test__export_to_folder_metadata_only_resume(
+    runner, conf, src_bucket, export_path, records
+):
+    """Should drop lines after the last committed record and append new ones"""
+    journal = export_path / "journal.json"
+    export_path.mkdir()
+    journal.write_text(
+        json.dumps(
+            {"entry-1": [{"start": 1000000000, "stop": 5000000001, "last": 2000}]}
+        )
+    )
+    (export_path / "entry-1.jsonl").write_text(
+        '{"timestamp":1000,"size":1,"content_type":"","labels":{}}\n'
+        '{"timestamp":3000,"size":1,"content_type":"","labels":{}}\n'
+    )
+    src_bucket.query.return_value = AsyncIter(records[1:])
+
+    result = runner(
+        f"-c {conf} export folder test/src_bucket {export_path} --entries entry-1 "
+        f"--metadata-only --checkpoint {journal} --resume"
+    )
+    assert result.exit_code == 0
+
+    assert [
+        json.loads(line)["timestamp"]
+        for line in (export_path / "entry-1.jsonl").read_text().splitlines()
+    ] == [1000, 5000000000]
+    assert json.loads(journal.read_text())["entry-1"][0]["last"] == 5000000000
+
+
+@pytest.mark.usefixtures("set_alias", "client")
+def test__export_to_folder_max_bandwidth(runner, conf, export_path, mocker):
+    """Should draw size of each record from shared limiter"""
+    acquire = mocker.patch("reduct_cli.export.RateLimiter.acquire_bytes")
+    kls = mocker.patch("reduct_cli.export.RateLimiter", wraps=RateLimiter)
+
+    result = runner(
+        f"-c {conf} export folder test/src_bucket {export_path} "
+        f"--entries entry-1,entry-2 --max-bandwidth 10MB/s --max-rps 100"
+    )
+    assert result.exit_code == 0
+
+    kls.assert_called_once_with(10_000_000, 100)
+    assert acquire.await_args_list == [call(3)] * 4
+
+
+@pytest.mark.usefixtures("set_alias", "client")
+@pytest.mark.parametrize("value", ["10XB", "fast", "0MB/s"])
+def test__export_to_folder_invalid_max_bandwidth(runner, conf, export_path, value):
+    """Should fail with invalid bandwidth"""
+    result = runner(
+        f"-c {conf} export folder test/src_bucket {export_path} "
+        f"--max-bandwidth {value}"
+    )
+    assert result.exit_code == 2
+    assert "Invalid value for '--max-bandwidth'" in result.output
+
+
+@pytest.mark.usefixtures("set_alias", "client")
+def test__export_to_folder_parallel_auto(runner, conf, export_path, mocker):
+    """Should limit tasks adaptively with --parallel auto"""
+    export = mocker.patch("reduct_cli.export.export_to_folder")
+    result = runner(
+        f"-c {conf} -p auto --max-parallel 32 export folder "
+        f"test/src_bucket {export_path}"
+    )
+    assert result.exit_code == 0
+    assert "Parallel tasks: 10 (auto, 1-32)" in result.output
+
+    kwargs = export.call_args.kwargs
+    assert kwargs["parallel"] == 32
+    assert kwargs["concurrency"].limit == 10
+
+
+@pytest.mark.usefixtures("set_alias")
+def test__export_to_folder_parallel_wrong(runner, conf, export_path):
+    """Should check --parallel"""
+    result = runner(f"-c {conf} -p many export folder test/src_bucket {export_path}")
+    assert result.exit_code == 2
+    assert "must be a positive integer or 'auto'" in result.output
+
+    result = runner(
+        f"-c {conf} -p auto --min-parallel 8 --max-parallel 4 "
+        f"export folder test/src_bucket {export_path}"
+    )
+    assert result.exit_code == 2
+
+
+@pytest.mark.usefixtures("set_alias")
+def test__export_to_folder_stats_json(runner, conf, client, export_path):
+    """Should write statistics even if the export failed"""
+    stats_path = export_path / "stats.json"
+    result = runner(
+        f"-c {conf} export folder test/src_bucket {export_path} "
+        f"--stats-json {stats_path}"
+    )
+    assert result.exit_code == 0
+
+    stats = json.loads(stats_path.read_text())
+    assert stats["entries"]["entry-2"]["records"] == 2
+    assert stats["entries"]["entry-2"]["bytes"] == 6
+    assert stats["total"]["records"] == 6
+    assert stats["total"]["disk_time"] > 0
+    assert stats["total"]["latency"]["p99"] >= stats["total"]["latency"]["p50"]
+
+    client.get_bucket.side_effect = ReductError(404, "Not found")
+    stats_path.unlink()
+    result = runner(
+        f"-c {conf} export folder test/src_bucket {export_path} "
+        f"--stats-json {stats_path}"
+    )
+    assert result.exit_code == 1
+    assert json.loads(stats_path.read_text())["total"]["records"] == 0
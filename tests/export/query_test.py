@@ -0,0 +1,245 @@
+"""Unit tests for queries of export commands"""
+from asyncio import Semaphore
+
+import pytest
+from reduct import EntryInfo
+
+from reduct_cli.export_impl.query import (
+    _query_params,
+    read_records_with_progress,
+    split_query,
+)
+from reduct_cli.utils.progress import ExportProgress, ProgressTask, DONE
+from tests.conftest import AsyncIter
+
+QUERY_KWARGS = {"include": [], "exclude": [], "timeout": 1, "parallel": 1}
+
+
+@pytest.fixture(name="progress")
+def _make_progress():
+    return ExportProgress(quiet=True)
+
+
+@pytest.fixture(name="default_kwargs")
+def _make_default_kwargs():
+    return {
+        "sem": Semaphore(1),
+        "include": {},
+        "exclude": {},
+        "timeout": 0,
+        "parallel": 1,
+    }
+
+
+@pytest.fixture(name="entry")
+def _make_entry(mocker):
+    entry_info = mocker.Mock(spec=EntryInfo)
+    entry_info.name = "entry-1"
+    return entry_info
+
+
+@pytest.mark.parametrize(
+    "start,stop",
+    [("1000000000", "5000000000"), ("2001-09-09T00:00:00", "2028-09-09T00:00:00")],
+)
+@pytest.mark.asyncio
+async def test__read_records_with_progress_with_integers(
+    entry, src_bucket, start, stop, progress, default_kwargs
+):  # pylint: disable=too-many-arguments
+    """Should read records with integers or ISO time strings"""
+
+    result = [
+        record
+        async for record in read_records_with_progress(
+            entry,
+            src_bucket,
+            progress,
+            start=start,
+            stop=stop,
+            **default_kwargs,
+        )
+    ]
+
+    assert len(result) == 2
+    assert result[0].timestamp == 1000000000
+    assert result[1].timestamp == 5000000000
+
+
+@pytest.mark.asyncio
+async def test__read_records_with_progress_counters(
+    mocker, entry, src_bucket, default_kwargs
+):
+    """Should count records and their size in progress task"""
+    progress = mocker.Mock(spec=ExportProgress)
+    progress.add_task.return_value = ProgressTask("Entry 'entry-1'", 4999999000)
+    result = [
+        record
+        async for record in read_records_with_progress(
+            entry,
+            src_bucket,
+            progress,
+            start="1000",
+            stop="5000000000",
+            **default_kwargs,
+        )
+    ]
+
+    assert len(result) == 2
+    progress.add_task.assert_called_with("Entry 'entry-1'", total=4999999000)
+    task = progress.add_task.return_value
+    assert task.count == 2
+    assert task.size == 6
+    assert task.completed == 4999999000
+    assert task.state == DONE
+
+
+def test__split_query():
+    """Should split time range of entry into sub-ranges of equal duration"""
+    entry = EntryInfo(
+        name="entry-1",
+        size=1050000,
+        block_count=1,
+        record_count=4000,
+        oldest_record=1000,
+        latest_record=5000,
+    )
+
+    assert split_query(entry, start=None, stop=None, slices=4) == [
+        {"start": 1000, "stop": 2000, "slices": 4, "part": (1, 4)},
+        {"start": 2000, "stop": 3000, "slices": 4, "part": (2, 4)},
+        {"start": 3000, "stop": 4000, "slices": 4, "part": (3, 4)},
+        {"start": 4000, "stop": 5001, "slices": 4, "part": (4, 4)},
+    ]
+
+
+@pytest.mark.parametrize(
+    "kwargs,expected",
+    [
+        ({"start": None, "stop": None, "slices": 1}, [(1000, 5001)]),
+        ({"start": None, "stop": None, "slices": 2, "limit": 10}, [(1000, 5001)]),
+        ({"start": "3000", "stop": "4000", "slices": 4}, [(3000, 4000)]),
+        ({"start": "0", "stop": "100000", "slices": 2}, [(1000, 3000), (3000, 5001)]),
+    ],
+)
+def test__split_query_reduce_slices(kwargs, expected):
+    """Should reduce number of sub-ranges if there are too few records"""
+    entry = EntryInfo(
+        name="entry-1",
+        size=1050000,
+        block_count=1,
+        record_count=4000,
+        oldest_record=1000,
+        latest_record=5000,
+    )
+
+    assert [
+        (params["start"], params["stop"]) for params in split_query(entry, **kwargs)
+    ] == expected
+
+
+@pytest.mark.parametrize("slices", [1, 4])
+def test__split_query_latest_record(slices):
+    """Should include the latest record whatever the number of sub-ranges"""
+    entry = EntryInfo(
+        name="entry-1",
+        size=1050000,
+        block_count=1,
+        record_count=4000,
+        oldest_record=1000,
+        latest_record=5000,
+    )
+
+    parts = split_query(entry, start=None, stop=None, slices=slices)
+    assert len(parts) == slices
+    assert parts[-1]["stop"] == 5001
+    assert _query_params(entry, **parts[-1], **QUERY_KWARGS)[0]["stop"] == 5001
+    assert (
+        _query_params(entry, start=None, stop=None, **QUERY_KWARGS)[0]["stop"] == 5001
+    )
+
+
+@pytest.mark.asyncio
+async def test__read_records_with_progress_when(
+    entry, src_bucket, records, progress, default_kwargs
+):
+    """Should filter records on client side and count limit of matched records"""
+    records[0].labels["score"] = "0.5"
+    records[1].labels["score"] = "0.9"
+    result = [
+        record
+        async for record in read_records_with_progress(
+            entry,
+            src_bucket,
+            progress,
+            start="1000",
+            stop="5000000000",
+            when="score > 0.8",
+            limit=1,
+            **default_kwargs,
+        )
+    ]
+
+    assert [record.timestamp for record in result] == [5000000000]
+    assert "limit" not in src_bucket.query.call_args.kwargs
+    assert "when" not in src_bucket.query.call_args.kwargs
+
+
+@pytest.mark.asyncio
+async def test__read_records_with_progress_when_pushdown(
+    entry, src_bucket, progress, default_kwargs
+):
+    """Should send filter to server as condition of query"""
+    result = [
+        record
+        async for record in read_records_with_progress(
+            entry,
+            src_bucket,
+            progress,
+            start="1000",
+            stop="5000000000",
+            when="score > 0.8",
+            when_pushdown=True,
+            limit=1,
+            **default_kwargs,
+        )
+    ]
+
+    assert len(result) == 1
+    assert src_bucket.query.call_args.kwargs["when"] == {"&score": {"$gt": 0.8}}
+    assert src_bucket.query.call_args.kwargs["limit"] == 1
+
+
+@pytest.mark.asyncio
+async def test__read_records_with_progress_ranges(
+    mocker, entry, src_bucket, records, default_kwargs
+):
+    """Should query time ranges one after another and count limit in all of them"""
+    progress = mocker.Mock(spec=ExportProgress)
+    progress.add_task.return_value = ProgressTask("Entry 'entry-1'", 5999999000)
+    src_bucket.query.side_effect = lambda entry, start, stop, **_: AsyncIter(
+        [record for record in records if start <= record.timestamp < stop]
+    )
+    result = [
+        record
+        async for record in read_records_with_progress(
+            entry,
+            src_bucket,
+            progress,
+            start="1000",
+            stop="6000000000",
+            ranges=iter(
+                [(1000, 2000), (1000000000, 1000000001), (2000000000, 6000000000)]
+            ),
+            limit=2,
+            **default_kwargs,
+        )
+    ]
+
+    assert [record.timestamp for record in result] == [1000000000, 5000000000]
+    assert [call.kwargs["start"] for call in src_bucket.query.call_args_list] == [
+        1000,
+        1000000000,
+        2000000000,
+    ]
+    progress.add_task.assert_called_once()
+    assert progress.add_task.return_value.count == 2
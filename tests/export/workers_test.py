@@ -0,0 +1,185 @@
+"""Unit tests for export in worker processes"""
+import asyncio
+import json
+import os
+import signal
+from functools import partial
+
+import pytest
+from reduct import Bucket, Client, EntryInfo
+
+from reduct_cli.export_impl.workers import (
+    export_with_workers,
+    shard_entries,
+    WorkerError,
+)
+from reduct_cli.export_impl.query import signal_queue
+from reduct_cli.utils.pool import PooledClient, PoolSettings, PoolStats
+from reduct_cli.utils.progress import RUNNING, DONE
+
+
+def make_entry(name: str, size: int) -> EntryInfo:
+    """Make entry info with name and size"""
+    return EntryInfo(
+        name=name,
+        size=size,
+        block_count=1,
+        record_count=2,
+        oldest_record=1000,
+        latest_record=2000,
+    )
+
+
+def build_client() -> Client:
+    """Build client in worker process"""
+    return PooledClient("http://127.0.0.1:8383", PoolSettings(max_connections=2))
+
+
+async def fake_export(
+    client: PooledClient, progress, checkpoint, fail: bool = False, **kwargs
+):
+    """Export entries without server"""
+    async with progress:
+        for name in kwargs["entries"]:
+            client.stats.opened += 1
+            for params in checkpoint.split_query(make_entry(name, 10), **kwargs):
+                task = progress.add_task(f"Entry '{name}'", total=1000)
+                task.state = RUNNING
+                task.count, task.size = 2, 6
+                checkpoint.commit(name, params["range_id"], 1999)
+                task.state = DONE
+        if fail:
+            raise RuntimeError("Oops")
+
+
+async def waiting_export(client: PooledClient, progress, checkpoint, **kwargs):
+    """Export which waits for a stop signal without handling signals itself"""
+    async with progress:
+        while signal_queue.qsize() == 0:
+            await asyncio.sleep(0.01)
+        task = progress.add_task(f"Entry '{kwargs['entries'][0]}'", total=1000)
+        task.state = DONE
+        client.stats.opened += 1
+        checkpoint.flush()
+
+
+@pytest.fixture(name="parent_client")
+def _make_parent_client(mocker) -> Client:
+    bucket = mocker.Mock(spec=Bucket)
+    bucket.get_entry_list.return_value = [
+        make_entry("entry-1", 100),
+        make_entry("entry-2", 50),
+        make_entry("entry-3", 40),
+        make_entry("other", 10),
+    ]
+    client = mocker.MagicMock(spec=Client)
+    client.get_bucket.return_value = bucket
+    return client
+
+
+def test__shard_entries():
+    """Should assign the biggest entries first to the smallest shards"""
+    entries = [
+        make_entry("entry-1", 10),
+        make_entry("entry-2", 100),
+        make_entry("entry-3", 50),
+        make_entry("entry-4", 40),
+    ]
+    assert shard_entries(entries, 2) == [["entry-2"], ["entry-3", "entry-4", "entry-1"]]
+    assert shard_entries(entries[:1], 2) == [["entry-1"]]
+
+
+def test__export_with_workers(parent_client, tmp_path, capsys):
+    """Should export shards of entries in worker processes and
+    collect their progress, journal and pool usage"""
+    journal = tmp_path / "journal.json"
+    pools = asyncio.run(
+        export_with_workers(
+            parent_client,
+            "src_bucket",
+            fake_export,
+            {"client": build_client},
+            workers=2,
+            entries=["entry-*"],
+            start=None,
+            stop=None,
+            checkpoint_path=journal,
+            resume=False,
+            quiet=False,
+        )
+    )
+
+    assert pools == {"client": (PoolSettings(max_connections=2), PoolStats(opened=3))}
+    assert json.loads(journal.read_text()) == {
+        "entry-1": [{"start": 1000, "stop": 2001, "last": 1999}],
+        "entry-2": [{"start": 1000, "stop": 2001, "last": 1999}],
+        "entry-3": [{"start": 1000, "stop": 2001, "last": 1999}],
+    }
+    output = capsys.readouterr().out
+    assert "Entry 'entry-1' (copied 2 records (6 B)" in output
+    assert "Entry 'entry-3' (copied 2 records (6 B)" in output
+    assert "other" not in output
+
+
+def test__export_with_workers_error(parent_client):
+    """Should raise error of a worker after all workers are finished"""
+    with pytest.raises(WorkerError, match=r"\[RuntimeError\] Oops \(worker 1\)"):
+        asyncio.run(
+            export_with_workers(
+                parent_client,
+                "src_bucket",
+                partial(fake_export, fail=True),
+                {"client": build_client},
+                workers=1,
+                entries=[],
+                start=None,
+                stop=None,
+                checkpoint_path=None,
+                resume=False,
+                quiet=True,
+            )
+        )
+
+
+@pytest.mark.usefixtures("set_alias")
+def test__export_folder_workers(runner, conf, mocker, tmp_path):
+    """Should share parallel tasks between worker processes"""
+    export = mocker.patch("reduct_cli.export.export_with_workers")
+    export.return_value = {}
+
+    result = runner(
+        f"-c {conf} -p 8 export folder test/src_bucket {tmp_path} --workers 4"
+    )
+    assert result.exit_code == 0
+
+    kwargs = export.call_args.kwargs
+    assert kwargs["workers"] == 4
+    assert kwargs["parallel"] == 2
+    assert export.call_args.args[1] == "src_bucket"
+    assert list(export.call_args.args[3]) == ["client"]
+
+
+def test__export_with_workers_stop(parent_client):
+    """Should stop workers on Ctrl+C even before they start exporting"""
+
+    async def export():
+        asyncio.get_running_loop().call_later(0.2, os.kill, os.getpid(), signal.SIGINT)
+        return await asyncio.wait_for(
+            export_with_workers(
+                parent_client,
+                "src_bucket",
+                waiting_export,
+                {"client": build_client},
+                workers=2,
+                entries=["entry-*"],
+                start=None,
+                stop=None,
+                checkpoint_path=None,
+                resume=False,
+                quiet=True,
+            ),
+            30,
+        )
+
+    pools = asyncio.run(export())
+    assert pools["client"][1].opened == 2
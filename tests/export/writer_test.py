@@ -0,0 +1,58 @@
+"""Unit tests for buffered file writer"""
+import asyncio
+
+import pytest
+
+from reduct_cli.export_impl.writer import FileWriter
+
+
+@pytest.mark.asyncio
+async def test__write_files(tmp_path):
+    """Should write files in thread pool"""
+    async with FileWriter(workers=2, queue_size=2) as writer:
+        written = [
+            await writer.write(tmp_path / f"{i}.bin", f"data-{i}".encode())
+            for i in range(10)
+        ]
+        await asyncio.gather(*written)
+
+    for i in range(10):
+        assert (tmp_path / f"{i}.bin").read_bytes() == f"data-{i}".encode()
+
+
+@pytest.mark.asyncio
+async def test__write_stream(tmp_path):
+    """Should write file chunk by chunk"""
+
+    async def chunks():
+        yield b"chunk-1"
+        yield b"chunk-2"
+
+    async with FileWriter(workers=1, queue_size=1) as writer:
+        await writer.write_stream(tmp_path / "big.bin", chunks())
+
+    assert (tmp_path / "big.bin").read_bytes() == b"chunk-1chunk-2"
+
+
+@pytest.mark.asyncio
+async def test__write_error(tmp_path):
+    """Should pass error to the future of the file"""
+    async with FileWriter(workers=1, queue_size=1) as writer:
+        written = await writer.write(tmp_path / "no-folder" / "1.bin", b"data")
+        with pytest.raises(FileNotFoundError):
+            await written
+
+
+@pytest.mark.asyncio
+async def test__backpressure(tmp_path, mocker):
+    """Should wait for free space in the queue if it is full"""
+    blocker = asyncio.Event()
+    writer = FileWriter(workers=1, queue_size=1)
+    mocker.patch.object(writer, "_worker", side_effect=blocker.wait)
+
+    async with writer:
+        await writer.write(tmp_path / "1.bin", b"data")
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(writer.write(tmp_path / "2.bin", b"data"), 0.1)
+        blocker.set()
+        writer._queue.get_nowait()  # pylint: disable=protected-access
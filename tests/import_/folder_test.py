@@ -0,0 +1,208 @@
+"""Unit tests for import folder command"""
+import asyncio
+import io
+import json
+import tarfile
+from pathlib import Path
+from unittest.mock import call, ANY
+
+import pytest
+from reduct import Client, Bucket, ReductError
+
+
+@pytest.fixture(name="client")
+def _make_client(mocker, dest_bucket) -> Client:
+    kls = mocker.patch("reduct_cli.import_.build_client")
+    client = mocker.MagicMock(spec=Client)
+    client.get_bucket.return_value = dest_bucket
+    client.__aenter__.return_value = client
+
+    kls.return_value = client
+    return client
+
+
+@pytest.fixture(name="import_path")
+def _make_import_path(tmp_path) -> Path:
+    entry_path = tmp_path / "entry-1"
+    entry_path.mkdir()
+    (entry_path / "1000000000.png").write_bytes(b"Hey")
+    (entry_path / "1000000000.json").write_text(
+        json.dumps(
+            {
+                "timestamp": 1000000000,
+                "content_type": "image/png",
+                "size": 3,
+                "labels": {"label1": "value1"},
+            }
+        )
+    )
+    (entry_path / "5000000000.bin").write_bytes(b"Bye")
+
+    entry_path = tmp_path / "entry-2"
+    entry_path.mkdir()
+    (entry_path / "2000000000.txt").write_bytes(b"Hello")
+    return tmp_path
+
+
+def read_batch(bucket: Bucket, number: int):
+    """Read records from batch of write_batch call"""
+    batch = bucket.write_batch.await_args_list[number].args[1]
+
+    async def read():
+        return [
+            (timestamp, record.content_type, record.labels, await record.read_all())
+            for timestamp, record in batch.items()
+        ]
+
+    return asyncio.new_event_loop().run_until_complete(read())
+
+
+@pytest.mark.usefixtures("set_alias", "client")
+def test__import_folder_ok(runner, conf, import_path, dest_bucket):
+    """Should import files of each sub-folder to an entry"""
+    result = runner(f"-c {conf} import folder {import_path} test/dest_bucket")
+    assert "Entry 'entry-1' (copied 2 records (6 B)" in result.output
+    assert result.exit_code == 0
+
+    batches = {
+        args.args[0]: read_batch(dest_bucket, i)
+        for i, args in enumerate(dest_bucket.write_batch.await_args_list)
+    }
+    assert batches == {
+        "entry-1": [
+            (1000000000, "image/png", {}, b"Hey"),
+            (5000000000, "application/octet-stream", {}, b"Bye"),
+        ],
+        "entry-2": [(2000000000, "text/plain", {}, b"Hello")],
+    }
+
+
+@pytest.mark.usefixtures("set_alias", "client")
+def test__import_folder_with_metadata(runner, conf, import_path, dest_bucket):
+    """Should import content types and labels from metadata files"""
+    result = runner(
+        f"-c {conf} import folder {import_path} test/dest_bucket "
+        f"--with-metadata --entries entry-1"
+    )
+    assert result.exit_code == 0
+
+    assert read_batch(dest_bucket, 0) == [
+        (1000000000, "image/png", {"label1": "value1"}, b"Hey"),
+        (5000000000, "application/octet-stream", {}, b"Bye"),
+    ]
+
+
+@pytest.mark.usefixtures("set_alias", "client")
+def test__import_folder_big_records(runner, conf, import_path, dest_bucket):
+    """Should upload records bigger than batch size one by one"""
+    result = runner(
+        f"-c {conf} import folder {import_path} test/dest_bucket "
+        f"--entries entry-2 --batch-size 1B"
+    )
+    assert result.exit_code == 0
+
+    dest_bucket.write_batch.assert_not_called()
+    assert dest_bucket.write.await_args_list == [
+        call(
+            "entry-2",
+            data=ANY,
+            content_length=5,
+            timestamp=2000000000,
+            content_type="text/plain",
+            labels={},
+        )
+    ]
+
+
+@pytest.mark.usefixtures("set_alias", "client")
+@pytest.mark.parametrize("size", ["0B", "-8MB", "big"])
+def test__import_folder_invalid_batch_size(
+    runner, conf, import_path, dest_bucket, size
+):
+    """Should fail with a batch size which isn't positive"""
+    result = runner(
+        f"-c {conf} import folder {import_path} test/dest_bucket --batch-size {size}"
+    )
+    assert result.exit_code == 2
+    assert "must be a positive size in CI format" in result.output
+    dest_bucket.write_batch.assert_not_called()
+
+
+@pytest.mark.usefixtures("set_alias", "client")
+def test__import_folder_tar(runner, conf, tmp_path, dest_bucket):
+    """Should import tar segments with their indexes"""
+    entry_path = tmp_path / "entry-1"
+    entry_path.mkdir()
+    with tarfile.open(entry_path / "1000000000.tar", "w") as tar:
+        for name, data in [("1000000000.png", b"Hey"), ("5000000000.bin", b"Bye")]:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, fileobj=io.BytesIO(data))
+    (entry_path / "1000000000.index.json").write_text(
+        json.dumps(
+            {
+                "timestamp": [1000000000, 5000000000],
+                "name": ["1000000000.png", "5000000000.bin"],
+                "offset": [512, 1536],
+                "size": [3, 3],
+                "content_type": ["image/png", ""],
+                "labels": [{"label1": "value1"}, {}],
+            }
+        )
+    )
+
+    result = runner(f"-c {conf} import folder {tmp_path} test/dest_bucket")
+    assert result.exit_code == 0
+
+    assert read_batch(dest_bucket, 0) == [
+        (1000000000, "image/png", {"label1": "value1"}, b"Hey"),
+        (5000000000, "application/octet-stream", {}, b"Bye"),
+    ]
+
+
+@pytest.mark.usefixtures("set_alias")
+def test__import_folder_create_bucket(runner, conf, client, import_path, dest_bucket):
+    """Should create destination bucket if it doesn't exist"""
+    client.get_bucket.side_effect = ReductError(404, "Not found")
+    client.create_bucket.return_value = dest_bucket
+
+    result = runner(f"-c {conf} import folder {import_path} test/dest_bucket")
+    assert result.exit_code == 0
+    client.create_bucket.assert_called_with("dest_bucket")
+
+
+@pytest.mark.usefixtures("set_alias", "client")
+def test__import_folder_big_entry(runner, conf, tmp_path, dest_bucket):
+    """Should upload records of a big entry with several uploaders"""
+    entry_path = tmp_path / "entry-1"
+    entry_path.mkdir()
+    for timestamp in range(1, 2501):
+        (entry_path / f"{timestamp}.bin").write_bytes(b"x")
+
+    result = runner(
+        f"-c {conf} -p 4 import folder {tmp_path} test/dest_bucket --batch-records 10"
+    )
+    assert result.exit_code == 0
+
+    timestamps = [
+        timestamp
+        for batch in dest_bucket.write_batch.await_args_list
+        for timestamp, _ in batch.args[1].items()
+    ]
+    assert sorted(timestamps) == list(range(1, 2501))
+
+
+@pytest.mark.usefixtures("set_alias", "client")
+def test__import_folder_upload_error(runner, conf, tmp_path, dest_bucket):
+    """Should stop scanning if uploads fail"""
+    entry_path = tmp_path / "entry-1"
+    entry_path.mkdir()
+    for timestamp in range(1, 2501):
+        (entry_path / f"{timestamp}.bin").write_bytes(b"x")
+    dest_bucket.write_batch.side_effect = ReductError(500, "Oops")
+
+    result = runner(
+        f"-c {conf} -p 1 import folder {tmp_path} test/dest_bucket --batch-records 10"
+    )
+    assert result.exit_code == 1
+    assert "[ReductError] Status 500: Oops" in result.output
@@ -1,6 +1,79 @@
 """Main test"""
+import json
+import subprocess
+import sys
+from typing import Dict, Tuple, Set
+
+# dependencies of commands which talk to a server
+HEAVY_MODULES = ("reduct", "aiohttp", "rich.layout", "rich.progress")
+
+RUN_CLI = """
+import json
+import sys
+from reduct_cli import main
+
+sys.argv = ["rcli", *sys.argv[1:]]
+try:
+    main()
+except SystemExit:
+    pass
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+def run_cli(*args: str) -> Tuple[Set[str], Dict[str, int]]:
+    """Run CLI in a new interpreter
+
+    Returns:
+        imported modules and cumulative import times of modules
+        in microseconds
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", RUN_CLI, *args],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "cumulative" not in line:
+            _, cumulative, module = line.split("|")
+            times[module.strip()] = int(cumulative)
+    return set(json.loads(result.stdout.splitlines()[-1])), times
 
 
 def test__stub():
     """Should be always true"""
     assert True
+
+
+def test__lazy_commands(tmp_path):
+    """Should not import dependencies of commands which aren't invoked"""
+    modules, times = run_cli("-c", str(tmp_path / "config.toml"), "alias", "ls")
+    assert "reduct_cli.alias" in modules
+
+    heavy = {module: times.get(module) for module in HEAVY_MODULES if module in modules}
+    assert heavy == {}, f"Heavy modules are imported (cumulative us): {heavy}"
+
+
+def test__lazy_command_import(tmp_path):
+    """Should import a command and its dependencies when it is invoked"""
+    modules, _ = run_cli("-c", str(tmp_path / "config.toml"), "server", "--help")
+    assert "reduct_cli.server" in modules
+    assert "reduct" in modules
+    assert "reduct_cli.bucket" not in modules
+
+
+def test__bucket_without_export(tmp_path):
+    """Should not import export stack for bucket commands"""
+    modules, _ = run_cli("-c", str(tmp_path / "config.toml"), "bucket", "--help")
+    assert "reduct_cli.bucket" in modules
+    exported = {module for module in modules if module.startswith("reduct_cli.export")}
+    assert exported == set()
+
+
+def test__import_without_export_command(tmp_path):
+    """Should not import export command module for import commands"""
+    modules, _ = run_cli("-c", str(tmp_path / "config.toml"), "import", "--help")
+    assert "reduct_cli.import_" in modules
+    assert "reduct_cli.export" not in modules
@@ -282,3 +282,49 @@ def test_delete_error(runner, conf, client):
     result = runner(f"-c {conf} replication rm test test")
     assert result.exit_code == 1
     assert result.output == ("[RuntimeError] Oops\n" "Aborted!\n")
+
+
+@pytest.mark.skipif(
+    # pylint: disable-next=unsupported-membership-test
+    "when" not in ReplicationSettings.model_fields,
+    reason="--when requires reduct-py 1.15",
+)
+@pytest.mark.usefixtures("set_alias")
+@pytest.mark.parametrize("command", ["create", "update"])
+def test_when(runner, conf, client, command):
+    """Test replication with filter expression"""
+    result = runner(
+        f"-c {conf} replication {command} test test src_bucket dst_bucket http://test "
+        '--when \'score > 0.8 && camera in ["a", "b"]\''
+    )
+    assert result.exit_code == 0
+
+    settings = getattr(client, f"{command}_replication").call_args[0][1]
+    assert settings.when == {
+        "$and": [{"&score": {"$gt": 0.8}}, {"&camera": {"$in": ["a", "b"]}}]
+    }
+
+
+@pytest.mark.usefixtures("set_alias")
+@pytest.mark.parametrize("command", ["create", "update"])
+def test_when_not_supported(runner, conf, client, command):
+    """Test replication with filter expression which the server can't evaluate"""
+    result = runner(
+        f"-c {conf} replication {command} test test src_bucket dst_bucket http://test "
+        "--when 'camera =~ \"^a\"'"
+    )
+    assert result.exit_code == 2
+    assert "--when" in result.output
+    getattr(client, f"{command}_replication").assert_not_called()
+
+
+@pytest.mark.usefixtures("set_alias")
+def test_when_invalid(runner, conf, client):
+    """Test replication with invalid filter expression"""
+    result = runner(
+        f"-c {conf} replication create test test src_bucket dst_bucket http://test "
+        "--when 'score >'"
+    )
+    assert result.exit_code == 2
+    assert "Expected value, got end of 'score >'" in result.output
+    client.create_replication.assert_not_called()
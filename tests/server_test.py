@@ -1,7 +1,11 @@
 """Unit tests for server commands"""
+import asyncio
+from typing import Dict
+
 import pytest
 from reduct import Client, ServerInfo, BucketSettings
 from reduct.client import Defaults
+from rich.table import Table
 
 
 @pytest.fixture(name="client")
@@ -40,3 +44,67 @@ def test__get_error(runner, conf, client):
     result = runner(f"-c {conf} server status test")
     assert result.exit_code == 1
     assert result.output == "[RuntimeError] Oops\nAborted!\n"
+
+
+@pytest.fixture(name="fleet")
+def _make_fleet(mocker, runner, conf, url) -> Dict[str, Client]:
+    clients = {}
+    for name in ["edge-1", "edge-2", "cloud"]:
+        runner(f"-c {conf} alias add {name} -L {url} -t token")
+        clients[name] = mocker.Mock(spec=Client)
+        clients[name].info.return_value = ServerInfo(
+            version="1.0.0",
+            uptime=900,
+            usage=1000,
+            bucket_count=2,
+            oldest_record=0,
+            latest_record=100,
+            defaults=Defaults(bucket=BucketSettings()),
+        )
+
+    build_client = mocker.patch("reduct_cli.utils.fleet.build_client")
+    build_client.side_effect = lambda _path, alias, timeout: clients[alias]
+    return clients
+
+
+@pytest.fixture(name="table")
+def _patch_table(mocker) -> Table:
+    table_kls = mocker.patch("reduct_cli.server.Table")
+    table_kls.return_value = mocker.Mock(spec=Table)
+    mocker.patch("reduct_cli.server.console")
+    return table_kls.return_value
+
+
+def test__get_status_of_aliases(runner, conf, fleet, table):
+    """Should print status of aliases matching glob in one table"""
+    result = runner(f"-c {conf} server status edge-*")
+    assert result.exit_code == 0
+
+    assert [call[0] for call in table.add_row.call_args_list] == [
+        ("edge-1", "[green]Ok[/green]", "1.0.0", "15 minute(s)", "1000 B", "2"),
+        ("edge-2", "[green]Ok[/green]", "1.0.0", "15 minute(s)", "1000 B", "2"),
+        ("Total for 2 aliases", "2 ok, 0 failed", "", "", "2 KB", "4"),
+    ]
+    fleet["cloud"].info.assert_not_called()
+
+
+def test__get_status_of_group_with_errors(runner, conf, fleet, table):
+    """Should print errors and timeouts of aliases and exit with error"""
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    fleet["edge-1"].info.side_effect = RuntimeError("Oops")
+    fleet["edge-2"].info.side_effect = hang
+    runner(f"-c {conf} alias group add fleet cloud edge-*")
+
+    result = runner(f"-c {conf} server status --alias-timeout 0.1 @fleet")
+    assert result.exit_code == 1
+
+    rows = [call[0] for call in table.add_row.call_args_list]
+    assert rows[0][:2] == ("cloud", "[green]Ok[/green]")
+    assert rows[1][0] == "edge-1"
+    assert rows[1][1].plain == "[RuntimeError] Oops"
+    assert rows[2][0] == "edge-2"
+    assert rows[2][1].plain == "[TimeoutError] No response in 0.1 seconds"
+    assert rows[3][:2] == ("Total for 3 aliases", "1 ok, 2 failed")
@@ -0,0 +1,99 @@
+"""Unit tests for adaptive concurrency"""
+import asyncio
+
+import pytest
+
+from reduct_cli.utils.concurrency import AdaptiveConcurrency
+from tests.conftest import FakeClock
+
+
+def observe_window(
+    concurrency: AdaptiveConcurrency, clock: FakeClock, latency: float, error=False
+):
+    """Observe a request and close the window"""
+    concurrency.observe(latency, False)
+    clock.now += 1
+    concurrency.observe(latency, error)
+
+
+@pytest.mark.asyncio
+async def test__increase_if_saturated(clock):
+    """Should increase limit by one if all slots are used"""
+    concurrency = AdaptiveConcurrency(2, 1, 3, clock=clock)
+    async with concurrency, concurrency:
+        observe_window(concurrency, clock, 0.1)
+        assert concurrency.limit == 3
+
+        observe_window(concurrency, clock, 0.1)
+        assert concurrency.limit == 3
+
+
+@pytest.mark.asyncio
+async def test__keep_if_not_saturated(clock):
+    """Should not increase limit if there are free slots"""
+    concurrency = AdaptiveConcurrency(2, 1, 3, clock=clock)
+    async with concurrency:
+        observe_window(concurrency, clock, 0.1)
+        observe_window(concurrency, clock, 0.1)
+        assert concurrency.limit == 2
+
+
+def test__decrease_on_errors(clock):
+    """Should decrease limit multiplicatively if requests fail"""
+    concurrency = AdaptiveConcurrency(10, 2, 20, clock=clock)
+    observe_window(concurrency, clock, 0.1, error=True)
+    assert concurrency.limit == 7
+
+    for _ in range(10):
+        observe_window(concurrency, clock, 0.1, error=True)
+    assert concurrency.limit == 2
+
+
+def test__decrease_on_latency(clock):
+    """Should decrease limit if latency grows over tolerance"""
+    concurrency = AdaptiveConcurrency(10, 1, 20, clock=clock)
+    observe_window(concurrency, clock, 0.1)
+    assert concurrency.limit == 10
+
+    observe_window(concurrency, clock, 0.15)
+    assert concurrency.limit == 10
+
+    observe_window(concurrency, clock, 0.5)
+    assert concurrency.limit == 7
+
+
+def test__initial_limit_in_bounds():
+    """Should keep initial limit in bounds"""
+    assert AdaptiveConcurrency(10, 1, 4).limit == 4
+    assert AdaptiveConcurrency(1, 2, 4).limit == 2
+
+
+@pytest.mark.asyncio
+async def test__wait_for_slot(clock):
+    """Should wait for a free slot and wake up when limit increases"""
+    concurrency = AdaptiveConcurrency(1, 1, 2, clock=clock)
+    entered = []
+
+    async def task(name):
+        async with concurrency:
+            entered.append(name)
+            await asyncio.sleep(10)
+
+    tasks = [asyncio.create_task(task(i)) for i in range(3)]
+    await asyncio.sleep(0)
+    assert entered == [0]
+    assert concurrency.in_flight == 1
+
+    observe_window(concurrency, clock, 0.1)
+    await asyncio.sleep(0)
+    assert entered == [0, 1]
+
+    tasks[0].cancel()
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert entered == [0, 1, 2]
+
+    for waiting in tasks:
+        waiting.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    assert concurrency.in_flight == 0
@@ -0,0 +1,39 @@
+"""Unit tests for lazy command group"""
+import click
+import pytest
+from click.testing import CliRunner
+
+from reduct_cli.server import server
+from reduct_cli.utils.lazy import LazyGroup
+
+
+@click.group(cls=LazyGroup, lazy_commands={"server": "reduct_cli.server:server"})
+def group():
+    """Test group"""
+
+
+@click.group(cls=LazyGroup, lazy_commands={"wrong": "reduct_cli.cli:COMMANDS"})
+def wrong_group():
+    """Test group with wrong command"""
+
+
+def test__lazy_command():
+    """Should import command when it is invoked"""
+    runner = CliRunner()
+    assert group.commands == {}
+
+    result = runner.invoke(group, ["server", "--help"])
+    assert "Commands to manage server" in result.output
+    assert group.commands == {"server": server}
+
+
+def test__list_lazy_commands():
+    """Should list lazy commands in help"""
+    result = CliRunner().invoke(group, ["--help"], catch_exceptions=False)
+    assert "server" in result.output
+
+
+def test__lazy_not_command():
+    """Should fail if the import path isn't a command"""
+    with pytest.raises(TypeError, match="is not a click command"):
+        CliRunner().invoke(wrong_group, ["wrong"], catch_exceptions=False)
@@ -0,0 +1,42 @@
+"""Unit tests for rate limiter"""
+import asyncio
+
+from reduct_cli.utils.limiter import TokenBucket, RateLimiter
+
+
+def test__token_bucket_burst(clock):
+    """Should give tokens of burst without waiting"""
+    bucket = TokenBucket(rate=100, clock=clock)
+    assert bucket.reserve(60) == 0
+    assert bucket.reserve(40) == 0
+    assert bucket.reserve(50) == 0.5
+
+
+def test__token_bucket_refill(clock):
+    """Should refill tokens with rate up to burst"""
+    bucket = TokenBucket(rate=100, burst=50, clock=clock)
+    assert bucket.reserve(50) == 0
+
+    clock.now += 0.25
+    assert bucket.reserve(50) == 0.25
+
+    clock.now += 10
+    assert bucket.reserve(50) == 0
+    assert bucket.reserve(1) == 0.01
+
+
+def test__token_bucket_big_amount(clock):
+    """Should borrow tokens for amount bigger than burst"""
+    bucket = TokenBucket(rate=10, clock=clock)
+    assert bucket.reserve(30) == 2.0
+
+
+def test__rate_limiter_without_limits():
+    """Should not wait without limits"""
+    limiter = RateLimiter()
+
+    async def acquire():
+        await limiter.acquire_bytes(10**12)
+        await limiter.acquire_request()
+
+    asyncio.run(asyncio.wait_for(acquire(), 1))
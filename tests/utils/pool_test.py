@@ -0,0 +1,127 @@
+"""Unit tests for connection pool"""
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from reduct_cli.utils.helpers import build_client
+from reduct_cli.utils.limiter import RateLimiter
+from reduct_cli.utils.pool import PooledClient, PoolSettings
+
+
+async def _pong(_request):
+    return web.Response(text="pong")
+
+
+async def _send_requests(settings: PoolSettings, count: int, concurrently=False):
+    app = web.Application()
+    app.router.add_get("/api/v1/ping", _pong)
+    async with TestServer(app) as server:
+        client = PooledClient(str(server.make_url("/")), settings, timeout=5)
+        async with client:
+            requests = [
+                client._http.request_all(  # pylint: disable=protected-access
+                    "GET", "/ping"
+                )
+                for _ in range(count)
+            ]
+            if concurrently:
+                await asyncio.gather(*requests)
+            else:
+                for request in requests:
+                    await request
+        return client.stats
+
+
+def test__reuse_connections():
+    """Should keep connections alive and reuse them"""
+    stats = asyncio.run(_send_requests(PoolSettings(), 5))
+    assert (stats.opened, stats.reused, stats.queued) == (1, 4, 0)
+
+
+def test__no_keepalive():
+    """Should open a connection for each request if keep-alive is disabled"""
+    stats = asyncio.run(_send_requests(PoolSettings(keepalive=0), 5))
+    assert (stats.opened, stats.reused) == (5, 0)
+
+
+def test__max_connections():
+    """Should queue requests if the pool is full"""
+    stats = asyncio.run(
+        _send_requests(PoolSettings(max_connections=2), 6, concurrently=True)
+    )
+    assert stats.opened == 2
+    assert stats.queued > 0
+
+
+@pytest.mark.usefixtures("set_alias")
+def test__build_client_pool_settings(runner, conf, url):
+    """Should take pool settings from arguments, then alias, then default"""
+    runner(f"-c {conf} alias add pooled -L {url} -t token --keepalive 30")
+
+    client = build_client(conf, "test", timeout=5, default_max_connections=8)
+    assert client.pool == PoolSettings(max_connections=8)
+
+    client = build_client(
+        conf, "pooled", timeout=5, default_max_connections=8, max_connections=2
+    )
+    assert client.pool == PoolSettings(max_connections=2, keepalive=30)
+
+    client = build_client(conf, "pooled", timeout=5, keepalive=0)
+    assert client.pool == PoolSettings(keepalive=0)
+
+
+def test__request_limiter(mocker):
+    """Should wait for limiter before each request"""
+    limiter = RateLimiter(max_rps=1000)
+    acquire = mocker.patch.object(limiter, "acquire_request")
+
+    async def _send():
+        app = web.Application()
+        app.router.add_get("/api/v1/ping", _pong)
+        async with TestServer(app) as server:
+            client = PooledClient(
+                str(server.make_url("/")), PoolSettings(), limiter, timeout=5
+            )
+            async with client:
+                for _ in range(3):
+                    await client._http.request_all(  # pylint: disable=protected-access
+                        "GET", "/ping"
+                    )
+
+    asyncio.run(_send())
+    assert acquire.await_count == 3
+
+
+def test__get_bucket_full_info():
+    """Should get full information about bucket in one request"""
+    requests = []
+
+    async def get_bucket(request):
+        requests.append(request.path)
+        return web.json_response(
+            {
+                "info": {
+                    "name": "bucket-1",
+                    "entry_count": 0,
+                    "size": 0,
+                    "oldest_record": 0,
+                    "latest_record": 0,
+                },
+                "settings": {},
+                "entries": [],
+            }
+        )
+
+    async def get_full_info():
+        app = web.Application()
+        app.router.add_get("/api/v1/b/{name}", get_bucket)
+        async with TestServer(app) as server:
+            client = PooledClient(str(server.make_url("/")), PoolSettings(), timeout=5)
+            async with client:
+                return await client.get_bucket_full_info("bucket-1")
+
+    full_info = asyncio.run(get_full_info())
+    assert full_info.info.name == "bucket-1"
+    assert requests == ["/api/v1/b/bucket-1"]
@@ -0,0 +1,107 @@
+"""Unit tests for progress rendering"""
+import pytest
+from rich.progress import Progress
+
+from reduct_cli.utils.progress import ExportProgress, RUNNING, DONE, STOPPED
+
+
+@pytest.fixture(name="rich_progress")
+def _make_rich_progress(mocker) -> Progress:
+    kls = mocker.patch("reduct_cli.utils.progress.Progress")
+    kls.return_value = mocker.Mock(spec=Progress)
+    return kls.return_value
+
+
+@pytest.mark.asyncio
+async def test__render_waiting(rich_progress):
+    """Should render waiting task"""
+    async with ExportProgress() as progress:
+        progress.add_task("Entry 'entry-1'", total=100)
+
+    rich_progress.add_task.assert_called_with("Entry 'entry-1'", total=100)
+    rich_progress.update.assert_called_with(
+        rich_progress.add_task.return_value,
+        description="Entry 'entry-1' waiting",
+        completed=0,
+    )
+
+
+@pytest.mark.asyncio
+async def test__render_counters(rich_progress):
+    """Should render counters of running and finished tasks"""
+    async with ExportProgress() as progress:
+        task = progress.add_task("Entry 'entry-1'", total=100)
+        task.state = RUNNING
+        task.count = 10
+        task.size = 2000
+        task.completed = 50
+
+        progress.render()
+        rich_progress.update.assert_called_with(
+            rich_progress.add_task.return_value,
+            description="Entry 'entry-1' (copied 10 records (2 KB), speed ? B/s)",
+            completed=50,
+        )
+
+        task.state = DONE
+
+    rich_progress.update.assert_called_with(
+        rich_progress.add_task.return_value,
+        description="Entry 'entry-1' (copied 10 records (2 KB), speed ? B/s)",
+        total=1,
+        completed=1,
+    )
+
+
+@pytest.mark.asyncio
+async def test__render_stopped(rich_progress):
+    """Should render stopped task"""
+    async with ExportProgress() as progress:
+        task = progress.add_task("Entry 'entry-1'", total=100)
+        task.state = STOPPED
+
+    rich_progress.update.assert_called_with(
+        rich_progress.add_task.return_value,
+        description="Entry 'entry-1' (copied 0 records (0 B), stopped",
+        completed=0,
+    )
+
+
+@pytest.mark.asyncio
+async def test__render_only_changes(rich_progress):
+    """Should not update progress bar if counters haven't changed"""
+    async with ExportProgress() as progress:
+        progress.add_task("Entry 'entry-1'", total=100)
+        progress.render()
+        progress.render()
+
+    assert rich_progress.update.call_count == 1
+    assert rich_progress.refresh.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test__quiet(rich_progress):
+    """Should not render anything in quiet mode"""
+    async with ExportProgress(quiet=True) as progress:
+        task = progress.add_task("Entry 'entry-1'", total=100)
+        task.count = 1
+
+    rich_progress.start.assert_not_called()
+    rich_progress.update.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test__reuse_tasks(rich_progress):
+    """Should restart a task with the same name, if tasks are reused"""
+    async with ExportProgress(reuse_tasks=True) as progress:
+        task = progress.add_task("Entry 'entry-1'", total=100)
+        task.state = DONE
+        task.count = 10
+        task.completed = 100
+
+        assert progress.add_task("Entry 'entry-1'", total=50) is task
+        assert task.state != DONE
+        assert (task.total, task.completed, task.count) == (50, 0, 10)
+
+    rich_progress.add_task.assert_called_once_with("Entry 'entry-1'", total=100)
+    rich_progress.update.assert_any_call(rich_progress.add_task.return_value, total=50)
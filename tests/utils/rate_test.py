@@ -0,0 +1,45 @@
+"""Unit tests for rate meter"""
+import pytest
+
+from reduct_cli.utils.rate import RateMeter
+
+
+def test__no_rate_at_start(clock):
+    """Should return zero rates before the first time slot is over"""
+    meter = RateMeter(window=2, resolution=0.5, clock=clock)
+    meter.add(1000)
+
+    assert meter.bytes_per_second == 0
+    assert meter.records_per_second == 0
+    assert meter.average_bytes_per_second == 0
+
+
+def test__rates_in_window(clock):
+    """Should calculate rates in the sliding window"""
+    meter = RateMeter(window=2, resolution=0.5, clock=clock)
+    for _ in range(4):
+        meter.add(1000, 10)
+        clock.now += 0.5
+
+    assert meter.bytes_per_second == 2000
+    assert meter.records_per_second == 20
+
+    clock.now += 1.0
+    assert meter.bytes_per_second == pytest.approx(1000 / 1.5)
+    assert meter.records_per_second == pytest.approx(10 / 1.5)
+
+    assert meter.average_bytes_per_second == pytest.approx(4000 / 3)
+    assert meter.average_records_per_second == pytest.approx(40 / 3)
+
+
+def test__rates_after_idle(clock):
+    """Should drop old samples after idle time longer than window"""
+    meter = RateMeter(window=2, resolution=0.5, clock=clock)
+    meter.add(1000)
+    clock.now += 60
+
+    assert meter.bytes_per_second == 0
+    meter.add(500)
+    clock.now += 0.25
+    assert meter.bytes_per_second == pytest.approx(500 / 1.75)
+    assert meter.average_bytes_per_second == pytest.approx(1500 / 60.25)
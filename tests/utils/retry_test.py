@@ -0,0 +1,101 @@
+"""Unit tests for retry policy"""
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from aiohttp import ClientPayloadError
+from reduct import Bucket, ReductError
+
+from reduct_cli.utils.retry import RetryPolicy, MAX_BACKOFF, retrying_record
+from reduct_cli.utils.stats import EntryStats
+
+
+def run(coroutine):
+    """Run coroutine in a new event loop and close it"""
+    return asyncio.run(coroutine)
+
+
+def test__is_transient():
+    """Should retry statuses of the policy, timeouts and connection errors"""
+    policy = RetryPolicy(statuses=frozenset({503}))
+    assert policy.is_transient(ReductError(503, "Unavailable"))
+    assert not policy.is_transient(ReductError(500, "Oops"))
+    assert policy.is_transient(asyncio.TimeoutError())
+    assert policy.is_transient(ClientPayloadError("Broken"))
+    assert not policy.is_transient(RuntimeError("Oops"))
+
+
+def test__delay():
+    """Should double delay for each retry with jitter up to the limit"""
+    policy = RetryPolicy(backoff=1.0, jitter=0)
+    assert [policy.delay(retry) for retry in range(1, 5)] == [1, 2, 4, 8]
+    assert policy.delay(100) == MAX_BACKOFF
+
+    policy = RetryPolicy(backoff=1.0, jitter=0.5)
+    assert all(1 <= policy.delay(2) <= 2 for _ in range(100))
+
+
+def test__call_retries():
+    """Should retry transient errors and count retries"""
+    results = [ReductError(503, "Unavailable"), asyncio.TimeoutError(), "ok"]
+
+    async def request():
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    stats = EntryStats()
+    assert run(RetryPolicy(backoff=0).call(request, stats)) == "ok"
+    assert stats.retries == 2
+
+
+def test__call_gives_up():
+    """Should raise the error, if attempts are over or it isn't transient"""
+    calls = []
+
+    async def request(err):
+        calls.append(err)
+        raise err
+
+    policy = RetryPolicy(attempts=3, backoff=0)
+    with pytest.raises(ReductError):
+        run(policy.call(lambda: request(ReductError(503, "Unavailable"))))
+    assert len(calls) == 3
+
+    calls.clear()
+    with pytest.raises(RuntimeError):
+        run(policy.call(lambda: request(RuntimeError("Oops"))))
+    assert len(calls) == 1
+
+
+def test__retrying_record_read_again(mocker, records):
+    """Should read contents of record with separate request after failure"""
+    record = records[0]
+
+    async def broken_read(_n):
+        yield b"H"
+        raise ClientPayloadError("Broken")
+
+    record.read = broken_read
+
+    async def read_again(_n):
+        yield b"He"
+        yield b"y"
+
+    @asynccontextmanager
+    async def read(_entry_name, _timestamp):
+        yield mocker.Mock(read=read_again)
+
+    bucket = mocker.Mock(spec=Bucket)
+    bucket.read = read
+    stats = EntryStats()
+
+    async def read_chunks():
+        retrying = retrying_record(
+            record, bucket, "entry-1", RetryPolicy(backoff=0), stats
+        )
+        return [chunk async for chunk in retrying.read(2)]
+
+    assert run(read_chunks()) == [b"H", b"e", b"y"]
+    assert stats.retries == 1
@@ -0,0 +1,91 @@
+"""Unit tests for export statistics"""
+import json
+
+from reduct_cli.utils.stats import (
+    EntryStats,
+    ExportStats,
+    MAX_LATENCY_SAMPLES,
+    _percentile,
+)
+
+
+def test__percentile():
+    """Should return nearest-rank percentiles of sorted values"""
+    values = [float(i) for i in range(1, 101)]
+    assert _percentile(values, 50) == 50.0
+    assert _percentile(values, 95) == 95.0
+    assert _percentile(values, 99) == 99.0
+    assert _percentile([7.0], 99) == 7.0
+    assert _percentile([], 50) == 0.0
+
+
+def test__entry_stats_latency_reservoir():
+    """Should keep a limited sample of latencies but count all records"""
+    stats = EntryStats()
+    for i in range(MAX_LATENCY_SAMPLES * 2):
+        stats.add_record(10, i / 1000)
+
+    assert stats.records == MAX_LATENCY_SAMPLES * 2
+    assert stats.bytes == MAX_LATENCY_SAMPLES * 20
+    assert len(stats.latencies) == MAX_LATENCY_SAMPLES
+
+
+def test__entry_stats_measure():
+    """Should add time of block to phase even if it fails"""
+    stats = EntryStats()
+    try:
+        with stats.measure("disk"):
+            raise RuntimeError()
+    except RuntimeError:
+        pass
+
+    assert stats.phases["disk"] > 0
+    assert stats.phases["network"] == 0
+
+
+def test__export_stats_to_dict(tmp_path):
+    """Should report statistics of each entry and in total"""
+    stats = ExportStats()
+    entry = stats.entry("entry-1")
+    entry.start()
+    entry.add_record(100, 0.1)
+    entry.add_record(200, 0.3)
+    entry.finish()
+    entry.skipped = 1
+
+    other = ExportStats()
+    other.entry("entry-2").add_record(50, 0.2)
+    other.entry("entry-2").retries = 2
+    stats.merge(other)
+
+    path = tmp_path / "stats" / "stats.json"
+    stats.write(path)
+    report = json.loads(path.read_text())
+
+    assert report["entries"]["entry-1"]["records"] == 2
+    assert report["entries"]["entry-1"]["bytes"] == 300
+    assert report["entries"]["entry-1"]["latency"] == {
+        "p50": 0.1,
+        "p95": 0.3,
+        "p99": 0.3,
+    }
+    assert report["entries"]["entry-1"]["wall_time"] >= 0
+    assert report["entries"]["entry-2"]["retries"] == 2
+
+    total = report["total"]
+    assert total["records"] == 3
+    assert total["bytes"] == 350
+    assert total["latency"]["p50"] == 0.2
+    assert total["retries"] == 2
+    assert total["skipped"] == 1
+    assert set(total) == {
+        "records",
+        "bytes",
+        "wall_time",
+        "network_time",
+        "disk_time",
+        "destination_time",
+        "latency",
+        "retries",
+        "skipped",
+    }
@@ -0,0 +1,130 @@
+"""Unit tests for filter expressions"""
+import re
+
+import pytest
+from reduct import Client, ServerInfo
+
+from reduct_cli.utils import when as when_module
+from reduct_cli.utils.when import (
+    And,
+    Compare,
+    Not,
+    Or,
+    compile_when,
+    parse_when,
+    supports_conditional_query,
+    to_condition,
+)
+
+
+def test__parse():
+    """Should parse expression with precedence of operators"""
+    assert parse_when('a > 1 || b == "x" && !(c in [1, 2.5, true])') == Or(
+        (
+            Compare("a", ">", 1),
+            And(
+                (
+                    Compare("b", "==", "x"),
+                    Not(Compare("c", "in", (1, 2.5, True))),
+                )
+            ),
+        )
+    )
+
+
+def test__parse_not_in_and_regex():
+    """Should parse not in and =~ comparisons"""
+    assert parse_when('camera not in ["a", "b\\"c"] && id =~ "^x-"') == And(
+        (Compare("camera", "not in", ("a", 'b"c')), Compare("id", "=~", "^x-"))
+    )
+
+
+@pytest.mark.parametrize(
+    "text,message",
+    [
+        ("score >", "Expected value, got end of 'score >'"),
+        ("score > 1 y", "Unexpected 'y' at 10 in 'score > 1 y'"),
+        ("score ? 1", "Unexpected '?' at 6 in 'score ? 1'"),
+        ("(score > 1", "Expected ), got end of '(score > 1'"),
+        ("score ( 1", "Expected comparison, got '(' at 6 in 'score ( 1'"),
+        ('id =~ "["', "Invalid regex '['"),
+    ],
+)
+def test__parse_error(text, message):
+    """Should raise ValueError with position of error"""
+    with pytest.raises(ValueError, match=re.escape(message)):
+        parse_when(text)
+
+
+def test__to_condition():
+    """Should convert expression into condition of conditional query"""
+    assert to_condition(parse_when('a >= 1 && (b != "x" || c not in [1, 2])')) == {
+        "$and": [
+            {"&a": {"$gte": 1}},
+            {"$or": [{"&b": {"$ne": "x"}}, {"&c": {"$nin": [1, 2]}}]},
+        ]
+    }
+
+
+@pytest.mark.parametrize("text", ['a > 1 && b =~ "x"', "!(a > 1)"])
+def test__to_condition_not_supported(text):
+    """Should return None, if server can't evaluate expression"""
+    assert to_condition(parse_when(text)) is None
+
+
+@pytest.mark.parametrize(
+    "text,labels,expected",
+    [
+        ("score > 0.8", {"score": "0.9"}, True),
+        ("score > 0.8", {"score": "0.7"}, False),
+        ("score > 0.8", {"score": "high"}, False),
+        ("score > 0.8", {}, False),
+        ("score <= 10", {"score": "9"}, True),
+        ('camera == "a"', {"camera": "a"}, True),
+        ('camera != "a"', {"camera": "b"}, True),
+        ('camera != "a"', {}, False),
+        ("flag == true", {"flag": "True"}, True),
+        ("flag == true", {"flag": "yes"}, False),
+        ('camera in ["a", "b"]', {"camera": "b"}, True),
+        ("id in [1, 2]", {"id": "2.0"}, True),
+        ('camera not in ["a", "b"]', {"camera": "c"}, True),
+        ('camera not in ["a", "b"]', {}, False),
+        ('camera =~ "^cam-"', {"camera": "cam-1"}, True),
+        ('!(camera == "a")', {"camera": "b"}, True),
+        ("a == 1 || b == 2 && c == 3", {"a": "1"}, True),
+        ("(a == 1 || b == 2) && c == 3", {"a": "1"}, False),
+    ],
+)
+def test__predicate(text, labels, expected):
+    """Should filter labels by compiled predicate"""
+    assert compile_when(text).predicate(labels) is expected
+
+
+def test__compile_cached():
+    """Should compile expression once"""
+    assert compile_when("a > 1") is compile_when("a > 1")
+
+
+@pytest.mark.parametrize(
+    "version,has_when,expected",
+    [("1.13.2", True, True), ("1.12.0", True, False), ("1.13.0", False, False)],
+)
+@pytest.mark.asyncio
+async def test__supports_conditional_query(
+    mocker, version, has_when, expected
+):  # pylint: disable=too-many-arguments
+    """Should check versions of client library and server"""
+
+    async def query(_self, _entry, when=None):
+        yield when
+
+    async def query_without_when(_self, _entry):
+        yield None
+
+    mocker.patch.object(
+        when_module.Bucket, "query", query if has_when else query_without_when
+    )
+    client = mocker.Mock(spec=Client)
+    client.info.return_value = mocker.Mock(spec=ServerInfo, version=version)
+
+    assert await supports_conditional_query(client) is expected